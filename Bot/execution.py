@@ -0,0 +1,217 @@
+"""
+Smart limit-order execution
+
+Instead of crossing the spread with a market order, an order is worked as
+a post-only limit at the touch (best bid for buys, best ask for sells),
+repriced to the new touch on a short timer, and whatever is still unfilled
+at the deadline is sent as a market order. Every execution reports its
+average price against the mid at arrival.
+"""
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FILLED_STATES = ('closed', 'filled')
+TERMINAL_STATES = FILLED_STATES + ('cancelled', 'rejected')
+
+
+class ExecutionEngine:
+    """
+    Work orders passively with a market fallback
+
+    Args:
+        client: DeltaAPI (place_limit_order, cancel_order, get_order_by_id,
+                place_market_order, get_order_book)
+        books: Optional {symbol: OrderBookFeed} for a live book; REST snapshots otherwise
+        reprice_sec: Time an order rests before it is moved to the new touch
+        deadline_sec: Time after which the rest is sent as a market order
+        poll_sec: Order status polling period
+        settle_sec: How long the market fallback is polled for a terminal state
+        cancel_retries: Cancel attempts before a still-open order aborts the execution
+        clock: Monotonic clock (injectable for simulation)
+        sleep: Sleep function (injectable for simulation)
+    """
+
+    def __init__(self, client, books: Optional[Dict] = None, reprice_sec: float = 2.0,
+                 deadline_sec: float = 20.0, poll_sec: float = 0.5, settle_sec: float = 10.0,
+                 cancel_retries: int = 3,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.client = client
+        self.books = books or {}
+        self.reprice_sec = reprice_sec
+        self.deadline_sec = deadline_sec
+        self.poll_sec = poll_sec
+        self.settle_sec = settle_sec
+        self.cancel_retries = cancel_retries
+        self.clock = clock
+        self.sleep = sleep
+
+    # ==================== Helpers ====================
+
+    def _book(self, symbol: str):
+        feed = self.books.get(symbol)
+        if feed is not None and feed.wait_ready(0):
+            return feed.snapshot()
+        return self.client.get_order_book(symbol, depth=5)
+
+    @staticmethod
+    def _result(response) -> Dict:
+        return (response or {}).get('result', response or {})
+
+    @staticmethod
+    def _filled(order: Dict) -> float:
+        return float(order.get('size', 0)) - float(order.get('unfilled_size') or 0)
+
+    def _settle(self, order: Dict) -> Dict:
+        """Poll an order until it is filled, cancelled or rejected (or settle_sec passes)"""
+        until = self.clock() + self.settle_sec
+        while order.get('state') not in TERMINAL_STATES and self.clock() < until:
+            self.sleep(self.poll_sec)
+            order = self._result(self.client.get_order_by_id(order['id']))
+        return order
+
+    def _cancel(self, order: Dict, product_id: int) -> Dict:
+        """
+        Cancel a resting order and confirm it from the order status
+
+        A failed cancel is only trusted once get_order_by_id shows the order
+        filled or cancelled; otherwise the cancel is retried.
+
+        Returns:
+            Latest order state (still open if every attempt failed)
+        """
+        for attempt in range(1, self.cancel_retries + 1):
+            try:
+                self.client.cancel_order(order['id'], product_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Cancel of order {order['id']} failed "
+                               f"({attempt}/{self.cancel_retries}): {e}")
+            order = self._result(self.client.get_order_by_id(order['id']))
+            if order.get('state') in TERMINAL_STATES:
+                break
+            if attempt < self.cancel_retries:
+                self.sleep(self.poll_sec)
+        return order
+
+    def _touch(self, symbol: str, side: str) -> Optional[float]:
+        book = self._book(symbol)
+        return book.best_bid if side == 'buy' else book.best_ask
+
+    # ==================== Execution ====================
+
+    def execute(self, symbol: str, product_id: int, side: str, size: float,
+                reduce_only: bool = False) -> Dict:
+        """
+        Fill `size` contracts, passively first
+
+        Args:
+            symbol: Trading pair
+            product_id: Product ID
+            side: 'buy' or 'sell'
+            size: Order size in contracts
+            reduce_only: Only reduce an existing position
+
+        Returns:
+            Report dict: side, size, filled_size, avg_price, arrival_mid,
+            slippage_bps (positive = worse than arrival mid), maker_size,
+            taker_size, reprices, market_fallback, elapsed_sec, orders
+            (final state of every child order that filled), open_order
+            (a child order that could not be cancelled, else None)
+        """
+        start = self.clock()
+        deadline = start + self.deadline_sec
+        arrival_mid = self._book(symbol).mid
+
+        remaining = size
+        notional = 0.0
+        maker_size = 0.0
+        reprices = 0
+        orders: List[Dict] = []
+        open_order: Optional[Dict] = None
+
+        def record(order: Dict, fallback_price: Optional[float]) -> float:
+            nonlocal notional
+            filled = self._filled(order)
+            if filled > 0:
+                price = float(order.get('average_fill_price') or fallback_price)
+                notional += filled * price
+                orders.append(order)
+            return filled
+
+        while remaining > 0 and self.clock() < deadline:
+            price = self._touch(symbol, side)
+            if price is None:
+                break
+            order = self._result(self.client.place_limit_order(
+                product_id, remaining, side, price, post_only=True, reduce_only=reduce_only))
+
+            if order.get('state') == 'cancelled':
+                # Post-only would have crossed: the touch moved, look again shortly
+                self.sleep(self.poll_sec)
+                continue
+
+            # Rest; move only when the touch has moved away from our price
+            while True:
+                rest_until = min(self.clock() + self.reprice_sec, deadline)
+                while order.get('state') not in FILLED_STATES and self.clock() < rest_until:
+                    self.sleep(self.poll_sec)
+                    order = self._result(self.client.get_order_by_id(order['id']))
+                if (order.get('state') in FILLED_STATES or self.clock() >= deadline
+                        or self._touch(symbol, side) != price):
+                    break
+
+            if order.get('state') not in FILLED_STATES:
+                order = self._cancel(order, product_id)
+                if order.get('state') not in TERMINAL_STATES:
+                    # Still resting: anything placed now could fill on top of it
+                    open_order = order
+                    logger.error(f"❌ Order {order['id']} could not be cancelled; "
+                                 f"aborting {side} {symbol} with it still open")
+                elif self.clock() < deadline:
+                    reprices += 1
+
+            filled = record(order, price)
+            maker_size += filled
+            remaining -= filled
+            if open_order is not None:
+                break
+
+        market_fallback = open_order is None and remaining > 1e-12
+        if market_fallback:
+            order = self._settle(self._result(self.client.place_market_order(
+                product_id, remaining, side, reduce_only=reduce_only)))
+            remaining -= record(order, self._touch(symbol, 'sell' if side == 'buy' else 'buy'))
+
+        filled_size = size - max(remaining, 0.0)
+        avg_price = notional / filled_size if filled_size else None
+        slippage_bps = None
+        if avg_price is not None and arrival_mid:
+            direction = 1 if side == 'buy' else -1
+            slippage_bps = round((avg_price - arrival_mid) / arrival_mid * 1e4 * direction, 3)
+
+        report = {
+            'symbol': symbol,
+            'side': side,
+            'size': size,
+            'filled_size': filled_size,
+            'avg_price': avg_price,
+            'arrival_mid': arrival_mid,
+            'slippage_bps': slippage_bps,
+            'maker_size': maker_size,
+            'taker_size': filled_size - maker_size,
+            'reprices': reprices,
+            'market_fallback': market_fallback,
+            'elapsed_sec': round(self.clock() - start, 3),
+            'orders': orders,
+            'open_order': open_order,
+        }
+        logger.info(
+            f"⚡ {side.upper()} {filled_size}/{size} {symbol} @ {avg_price} | "
+            f"arrival mid {arrival_mid} | {slippage_bps} bps | maker {maker_size} | "
+            f"reprices {reprices}{' | market fallback' if market_fallback else ''}",
+            extra={k: v for k, v in report.items() if k not in ('orders', 'open_order')},
+        )
+        return report
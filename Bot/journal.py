@@ -0,0 +1,349 @@
+"""
+Append-only trade journal with batched fsync and crash recovery
+
+Every signal, order, fill, stop-loss placement and exchange position sync
+is appended as one JSON line. Writes are buffered and made durable by a
+background flusher (one fsync per batch); `sync=True` forces a group
+commit before returning, for events that must survive a crash such as
+order placement.
+
+On open the journal is scanned once: a torn last line is truncated, a
+time/symbol index of byte offsets is built, and bot state (positions,
+stops, open orders, last signals, closed trades) is rebuilt by replay.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+from utils.json_export import dumps
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('signal', 'order', 'fill', 'stop_loss', 'cancel', 'position_sync')
+
+
+class JournalState:
+    """Bot state rebuilt by replaying journal events"""
+
+    def __init__(self):
+        self.positions: Dict[str, Dict] = {}
+        self.orders: Dict = {}
+        self.last_signal: Dict[str, Dict] = {}
+        self.trades: List[Dict] = []
+        self.last_seq = 0
+
+    def position(self, symbol: str) -> Dict:
+        return self.positions.setdefault(symbol, {
+            'size': 0.0, 'entry_price': None, 'entry_time': None, 'stop_loss': None,
+            'take_profit': None,
+        })
+
+    def side(self, symbol: str):
+        """(side, size) in the same form as the runtime's get_current_position"""
+        size = self.positions.get(symbol, {}).get('size', 0.0)
+        if size > 0:
+            return 'long', size
+        if size < 0:
+            return 'short', abs(size)
+        return None, 0
+
+    def apply(self, event: Dict):
+        kind = event['type']
+        symbol = event.get('symbol')
+        self.last_seq = max(self.last_seq, event.get('seq', 0))
+
+        if kind == 'signal':
+            self.last_signal[symbol] = event
+        elif kind == 'order':
+            if event.get('order_id') is not None:
+                self.orders[event['order_id']] = event
+        elif kind == 'cancel':
+            self.orders.pop(event.get('order_id'), None)
+        elif kind == 'stop_loss':
+            pos = self.position(symbol)
+            pos['stop_loss'] = event.get('stop_price')
+            pos['take_profit'] = event.get('take_profit')
+            if event.get('order_id') is not None:
+                self.orders[event['order_id']] = event
+        elif kind == 'fill':
+            self.orders.pop(event.get('order_id'), None)
+            self._apply_fill(symbol, event)
+        elif kind == 'position_sync':
+            pos = self.position(symbol)
+            size = float(event.get('size', 0))
+            delta = size - pos['size']
+            if delta and event.get('price') is not None:
+                # Fills the journal never saw (exchange-side stop / bracket legs)
+                self._apply_fill(symbol, {'side': 'buy' if delta > 0 else 'sell',
+                                          'size': abs(delta), 'price': event['price'],
+                                          'ts': event['ts']})
+            pos['size'] = size
+            if event.get('entry_price') is not None:
+                pos['entry_price'] = event['entry_price']
+            if pos['size'] == 0:
+                pos['entry_price'] = pos['entry_time'] = None
+                pos['stop_loss'] = pos['take_profit'] = None
+
+    def _apply_fill(self, symbol: str, event: Dict):
+        """Position accounting; closing fills produce round-trip trades"""
+        pos = self.position(symbol)
+        price = float(event['price'])
+        signed = float(event['size']) if event['side'] == 'buy' else -float(event['size'])
+        old = pos['size']
+        new = old + signed
+
+        if old == 0 or (old > 0) == (signed > 0):
+            total = abs(old) + abs(signed)
+            prev_entry = pos['entry_price'] or price
+            pos['entry_price'] = (prev_entry * abs(old) + price * abs(signed)) / total
+            if old == 0:
+                pos['entry_time'] = event['ts']
+        else:
+            closed = min(abs(old), abs(signed))
+            side = 'long' if old > 0 else 'short'
+            direction = 1 if old > 0 else -1
+            entry = pos['entry_price']
+            pnl = (price - entry) * direction
+            self.trades.append({
+                'symbol': symbol,
+                'side': side,
+                'size': closed,
+                'entry_time': pos['entry_time'],
+                'exit_time': event['ts'],
+                'entry_price': entry,
+                'exit_price': price,
+                'pnl': round(pnl, 8),
+                'pnl_pct': round(pnl / entry * 100, 6),
+            })
+            if new == 0:
+                pos['entry_price'] = pos['entry_time'] = None
+                pos['stop_loss'] = pos['take_profit'] = None
+            elif (new > 0) != (old > 0):
+                pos['entry_price'] = price
+                pos['entry_time'] = event['ts']
+                pos['stop_loss'] = pos['take_profit'] = None
+        pos['size'] = new
+
+
+class TradeJournal:
+    """
+    Append-only JSON-lines journal
+
+    Args:
+        path: Journal file
+        flush_interval: Seconds between background fsyncs
+        batch_size: Buffered events that trigger an early flush
+    """
+
+    def __init__(self, path: str = 'trade_journal.jsonl', flush_interval: float = 0.2,
+                 batch_size: int = 64):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self.state = JournalState()
+        self._times: List[float] = []
+        self._offsets: List[int] = []
+        self._by_symbol: Dict[str, tuple] = {}
+
+        self._buffer: List[bytes] = []
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+        start = time.perf_counter()
+        recovered = self._recover()
+        logger.info(f"Journal {path}: {recovered} events replayed in "
+                    f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+        self._file = open(path, 'ab')
+        self._size = os.path.getsize(path)
+        self._flusher = threading.Thread(target=self._flush_loop, name='journal-flush', daemon=True)
+        self._flusher.start()
+
+    # ==================== Recovery ====================
+
+    def _recover(self) -> int:
+        """Replay the journal, truncating a torn tail, and build the index"""
+        if not os.path.exists(self.path):
+            return 0
+
+        good = 0
+        count = 0
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break
+                self._index(event, offset)
+                self.state.apply(event)
+                offset += len(line)
+                good = offset
+                count += 1
+
+        if good < os.path.getsize(self.path):
+            logger.warning(f"⚠ Journal {self.path}: truncating torn tail at byte {good}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(good)
+        return count
+
+    def _index(self, event: Dict, offset: int):
+        position = len(self._offsets)
+        self._times.append(event['ts'])
+        self._offsets.append(offset)
+        symbol = event.get('symbol')
+        if symbol:
+            times, positions = self._by_symbol.setdefault(symbol, ([], []))
+            times.append(event['ts'])
+            positions.append(position)
+
+    # ==================== Writing ====================
+
+    def append(self, kind: str, symbol: Optional[str] = None, sync: bool = False, **fields) -> Dict:
+        """
+        Append one event and apply it to the in-memory state
+
+        Args:
+            kind: One of EVENT_TYPES
+            symbol: Trading pair
+            sync: Wait until the event is fsynced
+            fields: Event payload
+
+        Returns:
+            The journaled event
+        """
+        if kind not in EVENT_TYPES:
+            raise ValueError(f"Unknown journal event type: {kind}")
+
+        with self._lock:
+            event = {'seq': self.state.last_seq + 1, 'ts': time.time(), 'type': kind}
+            if symbol:
+                event['symbol'] = symbol
+            event.update(fields)
+            line = dumps(event) + b'\n'
+
+            self._index(event, self._size)
+            self._size += len(line)
+            self._buffer.append(line)
+            self.state.apply(event)
+            pending = len(self._buffer)
+
+        if sync:
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wake.set()
+        return event
+
+    def sync_position(self, symbol: str, size: float, price: float,
+                      entry_price: Optional[float] = None) -> Dict:
+        """
+        Reconcile the journal with the exchange position
+
+        A size the journal did not record (a stop or bracket leg filled on
+        the exchange) is booked as a fill. Its price is the recorded stop or
+        target nearer to `price`, or `price` itself when neither is set.
+
+        Args:
+            symbol: Trading pair
+            size: Signed exchange position size (negative = short)
+            price: Current market price
+            entry_price: Exchange entry price, if known
+
+        Returns:
+            The journaled position_sync event
+        """
+        pos = self.state.position(symbol)
+        fill_price = price
+        if size != pos['size']:
+            levels = [lvl for lvl in (pos['stop_loss'], pos['take_profit']) if lvl is not None]
+            if levels and abs(size) < abs(pos['size']):
+                fill_price = min(levels, key=lambda lvl: abs(lvl - price))
+            logger.warning(f"⚠ {symbol} exchange position {size} != journal {pos['size']}; "
+                           f"booking the difference at {fill_price}")
+        return self.append('position_sync', symbol, sync=size != pos['size'],
+                           size=size, previous_size=pos['size'], price=fill_price,
+                           entry_price=entry_price)
+
+    def flush(self):
+        """Write buffered events and fsync once for the whole batch"""
+        with self._io_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            self._file.write(b''.join(batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except (OSError, ValueError) as e:
+                logger.error(f"✗ Journal flush failed: {e}")
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ==================== Queries ====================
+
+    def query(self, symbol: Optional[str] = None, start: Optional[float] = None,
+              end: Optional[float] = None, types: Optional[tuple] = None) -> List[Dict]:
+        """
+        Events by symbol and time range, read through the offset index
+
+        Args:
+            symbol: Only this symbol
+            start: Epoch seconds (inclusive)
+            end: Epoch seconds (inclusive)
+            types: Only these event types
+        """
+        self.flush()
+        if symbol is not None:
+            times, positions = self._by_symbol.get(symbol, ([], []))
+        else:
+            positions = range(len(self._offsets))
+            times = self._times
+
+        lo = bisect_left(times, start) if start is not None else 0
+        hi = bisect_right(times, end) if end is not None else len(times)
+
+        events = []
+        with open(self.path, 'rb') as f:
+            for p in positions[lo:hi]:
+                f.seek(self._offsets[p])
+                event = json.loads(f.readline())
+                if types is None or event['type'] in types:
+                    events.append(event)
+        return events
+
+    def closed_trades(self, symbol: Optional[str] = None) -> List[Dict]:
+        """Round-trip trades in the backtest trade layout (for compute_metrics)"""
+        trades = self.state.trades
+        return [t for t in trades if symbol is None or t['symbol'] == symbol]
+
+    def metrics(self, symbol: Optional[str] = None, capital: float = 5000) -> Dict:
+        """Performance report of journaled live trades"""
+        from backtest.metrics import compute_metrics
+        return compute_metrics(self.closed_trades(symbol), capital=capital)
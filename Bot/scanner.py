@@ -0,0 +1,356 @@
+"""
+Market scanner: SuperTrend for every perpetual, ranked by fresh trend flips
+
+All symbols share one SupertrendBatchTracker, so a candle close is a single
+vectorized step over the universe. The tracker is only ever fed real closed
+candles: history seeds it, and at every candle boundary the candles that
+closed are read from the AnalyticsStore or fetched per symbol from the
+history endpoint (workers threads, all through the client's market-data
+rate limiter, so order placement keeps its own tokens) and stored.
+
+Between boundaries, all-tickers snapshots (one /v2/tickers request for the
+whole universe, DataFetcher.get_ticker_table) keep an intrabar view of the
+candle still forming. Samples never become closed candles.
+"""
+import logging
+import math
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from api.candles import CandleColumns
+from api.resample import resolution_seconds
+from Indicators.SuperTrend.batch import SupertrendBatchTracker
+
+logger = logging.getLogger(__name__)
+
+
+class MarketScanner:
+    """
+    Rank perpetuals by fresh SuperTrend flips
+
+    Args:
+        fetcher: DataFetcher (its client's requests go through the shared rate limiter)
+        resolution: Candle timeframe to scan
+        period: ATR period
+        multiplier: ATR multiplier
+        history_candles: Candles used to seed the tracker
+        fresh_bars: A flip is fresh for this many closed candles after it
+        workers: Concurrent history requests while seeding
+        store: Optional utils.analytics_store.AnalyticsStore used as candle store
+        asset_type: Product contract_type to scan
+        sample_sec: Ticker sampling period (boundary checks and forming-bar view)
+        price_field: TickerTable column sampled ('last_price' or 'mark_price')
+    """
+
+    def __init__(self, fetcher, resolution: str = '5m', period: int = 10, multiplier: float = 3,
+                 history_candles: int = 200, fresh_bars: int = 1, workers: int = 4,
+                 store=None, asset_type: str = 'perpetual_futures', sample_sec: float = 5.0,
+                 price_field: str = 'last_price'):
+        self.fetcher = fetcher
+        self.resolution = resolution
+        self.tf_sec = resolution_seconds(resolution)
+        self.period = period
+        self.multiplier = multiplier
+        self.history_candles = history_candles
+        self.fresh_bars = fresh_bars
+        self.workers = workers
+        self.store = store
+        self.asset_type = asset_type
+        self.sample_sec = sample_sec
+        self.price_field = price_field
+
+        self.symbols: List[str] = []
+        self.tracker: Optional[SupertrendBatchTracker] = None
+        self.ranked: List[Dict] = []
+        self._store_lock = threading.Lock()
+        self._reset_state()
+
+    def _reset_state(self):
+        n = len(self.symbols)
+        self.tracker = None
+        self.last_time: Optional[int] = None     # open time of the last closed candle
+        self.close = [math.nan] * n
+        self.flip_time: List[Optional[int]] = [None] * n
+        self.flip_signal: List[Optional[str]] = [None] * n
+        self.bars_since_flip: List[Optional[int]] = [None] * n
+        # Ticker-sampled view of the candle still forming
+        self.bar_time: Optional[int] = None
+        self.bar_high = [math.nan] * n
+        self.bar_low = [math.nan] * n
+        self.bar_close = [math.nan] * n
+
+    # ==================== Universe ====================
+
+    def refresh_universe(self, symbols: Optional[List[str]] = None) -> List[str]:
+        """
+        Sync scanned symbols with the product catalog (or an explicit list)
+
+        A changed universe is re-seeded on the next update.
+
+        Returns:
+            Symbols being scanned
+        """
+        if symbols is None:
+            symbols = self.fetcher.get_available_symbols(self.asset_type)
+        symbols = list(dict.fromkeys(symbols))
+        if symbols != self.symbols:
+            self.symbols = symbols
+            self._reset_state()
+        logger.info(f"🔭 Scanning {len(self.symbols)} symbols on {self.resolution}")
+        return list(self.symbols)
+
+    # ==================== Seeding ====================
+
+    def _last_closed(self, now: float) -> int:
+        """Open time of the last fully closed candle"""
+        return int(now) // self.tf_sec * self.tf_sec - self.tf_sec
+
+    def _history(self, symbol: str, start: int, last_closed: int) -> CandleColumns:
+        """Closed candles in [start, last_closed]: stored ones plus the fetched gap"""
+        candles = CandleColumns()
+        if self.store is not None:
+            with self._store_lock:
+                candles = self.store.candle_columns(symbol, self.resolution, start, last_closed)
+        since = candles.time[-1] + self.tf_sec if len(candles) else start
+        if since <= last_closed:
+            fetched = self.fetcher.client.get_candle_columns(
+                symbol, self.resolution, since, last_closed + self.tf_sec - 1)
+            # Drop the candle still forming
+            fetched = fetched[:bisect_right(fetched.time, last_closed)]
+            if self.store is not None and len(fetched):
+                with self._store_lock:
+                    self.store.insert_candles(symbol, self.resolution, fetched)
+            candles = CandleColumns.concat([candles, fetched])
+        return candles
+
+    def seed(self, now: Optional[float] = None) -> int:
+        """
+        Fetch history for every symbol and warm the tracker up to the last closed candle
+
+        Histories are aligned on one time grid; gaps are forward-filled with
+        flat candles at the previous close (back-filled before a listing).
+        Symbols without any history are dropped.
+
+        Returns:
+            Number of candles per symbol fed to the tracker
+        """
+        if not self.symbols:
+            self.refresh_universe()
+        last_closed = self._last_closed(time.time() if now is None else now)
+        start = last_closed - (self.history_candles - 1) * self.tf_sec
+
+        histories = self._fetch_histories(start, last_closed)
+        empty = [s for s, h in zip(self.symbols, histories) if not len(h)]
+        if empty:
+            logger.warning(f"⚠ No history for {', '.join(empty)}; not scanned")
+            histories = [h for h in histories if len(h)]
+            self.symbols = [s for s in self.symbols if s not in set(empty)]
+        self._reset_state()
+
+        times = range(start, last_closed + 1, self.tf_sec)
+        self.tracker = SupertrendBatchTracker(len(self.symbols), self.period, self.multiplier)
+        self._feed(times, histories, [h.close[0] for h in histories])
+        logger.info(f"🔭 Seeded {len(self.symbols)} symbols with {len(times)} candles")
+        return len(times)
+
+    def _fetch_histories(self, start: int, last_closed: int) -> List[CandleColumns]:
+        """Closed candles in [start, last_closed] for every symbol (empty on failure)"""
+        def work(symbol):
+            try:
+                return self._history(symbol, start, last_closed)
+            except Exception as e:
+                logger.error(f"✗ Scanner history failed for {symbol}: {e}")
+                return CandleColumns()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(work, self.symbols))
+
+    def _feed(self, times, histories: List[CandleColumns], prev_close: List[float]):
+        """
+        Feed candles on the `times` grid to the tracker
+
+        A missing candle (no trades, or a failed fetch) is filled flat at
+        the symbol's previous close.
+        """
+        highs, lows, closes = [], [], []
+        for candles, prev in zip(histories, prev_close):
+            by_time = {t: i for i, t in enumerate(candles.time)}
+            high, low, close = [], [], []
+            for t in times:
+                i = by_time.get(t)
+                if i is None:
+                    high.append(prev)
+                    low.append(prev)
+                    close.append(prev)
+                else:
+                    prev = candles.close[i]
+                    high.append(candles.high[i])
+                    low.append(candles.low[i])
+                    close.append(prev)
+            highs.append(high)
+            lows.append(low)
+            closes.append(close)
+
+        for k, t in enumerate(times):
+            self._close_candle(t, [h[k] for h in highs], [l[k] for l in lows],
+                               [c[k] for c in closes])
+
+    # ==================== Updates ====================
+
+    def _close_candle(self, t: int, high, low, close):
+        """Feed one closed candle for every symbol and track flips"""
+        tracker = self.tracker
+        tracker.update(high, low, close)
+        bars = self.bars_since_flip
+        for s, b in enumerate(bars):
+            if b is not None:
+                bars[s] = b + 1
+        for s, signal in tracker.signals():
+            self.flip_time[s] = t
+            self.flip_signal[s] = signal
+            bars[s] = 0
+        self.close = list(close)
+        self.last_time = t
+
+    def close_candles(self, now: Optional[float] = None) -> int:
+        """
+        Feed every candle that closed since the last one seen
+
+        The closed candles come from the store or the history endpoint,
+        never from ticker samples.
+
+        Returns:
+            Number of candles closed
+        """
+        now = time.time() if now is None else now
+        last_closed = self._last_closed(now)
+        if self.last_time is None or last_closed <= self.last_time:
+            return 0
+        start = self.last_time + self.tf_sec
+        histories = self._fetch_histories(start, last_closed)
+        missing = [s for s, h in zip(self.symbols, histories) if not len(h)]
+        if missing:
+            logger.warning(f"⚠ No closed candle for {', '.join(missing)}; filled flat")
+        times = range(start, last_closed + 1, self.tf_sec)
+        self._feed(times, histories, self.close)
+        return len(times)
+
+    def sample(self, now: Optional[float] = None):
+        """Take one all-tickers snapshot into the forming candle"""
+        now = time.time() if now is None else now
+        bar_time = int(now) // self.tf_sec * self.tf_sec
+        table = self.fetcher.get_ticker_table(max_age=0)
+
+        if self.bar_time != bar_time:
+            self.bar_time = bar_time
+            self.bar_high = [math.nan] * len(self.symbols)
+            self.bar_low = [math.nan] * len(self.symbols)
+            self.bar_close = list(self.close)
+
+        high, low, last = self.bar_high, self.bar_low, self.bar_close
+        for s, symbol in enumerate(self.symbols):
+            price = table.price(symbol, self.price_field)
+            if not price:
+                price = last[s]
+            if not (high[s] >= price):
+                high[s] = price
+            if not (low[s] <= price):
+                low[s] = price
+            last[s] = price
+
+    def forming(self) -> Dict[str, Dict]:
+        """Sampled high/low/last of the candle still forming, per symbol"""
+        return {symbol: {'time': self.bar_time, 'high': self.bar_high[s],
+                         'low': self.bar_low[s], 'close': self.bar_close[s]}
+                for s, symbol in enumerate(self.symbols)}
+
+    def update(self, now: Optional[float] = None) -> List[Dict]:
+        """
+        Close finished candles (seeding first if needed), sample the tickers
+        and re-rank
+
+        Args:
+            now: Epoch seconds (default: wall clock)
+
+        Returns:
+            Ranked fresh flips (see rank)
+        """
+        now = time.time() if now is None else now
+        if self.tracker is None:
+            self.seed(now)
+        start = time.perf_counter()
+        closed = self.close_candles(now)
+        self.sample(now)
+        if closed:
+            self.ranked = self.rank()
+            logger.info(
+                f"🔭 Scan {self.resolution} @ {self.last_time}: {len(self.ranked)} fresh flips "
+                f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+        return self.ranked
+
+    # ==================== Ranking ====================
+
+    def rank(self) -> List[Dict]:
+        """
+        Fresh flips ordered by ATR-normalized strength
+
+        strength = |close - supertrend| / atr on the latest closed candle:
+        how far price has already moved away from the flipped line, in ATRs.
+
+        Returns:
+            List of dicts: symbol, signal, flip_time, bars_since_flip, time,
+            close, supertrend, atr, strength
+        """
+        if self.tracker is None:
+            return []
+        atrs, lines = self.tracker.atr, self.tracker.supertrend
+        out = []
+        for s, symbol in enumerate(self.symbols):
+            bars = self.bars_since_flip[s]
+            atr = float(atrs[s])
+            if bars is None or bars >= self.fresh_bars or not atr > 0:
+                continue
+            close, line = float(self.close[s]), float(lines[s])
+            out.append({
+                'symbol': symbol,
+                'signal': self.flip_signal[s],
+                'flip_time': self.flip_time[s],
+                'bars_since_flip': bars,
+                'time': self.last_time,
+                'close': close,
+                'supertrend': line,
+                'atr': atr,
+                'strength': round(abs(close - line) / atr, 4),
+            })
+        out.sort(key=lambda r: (r['bars_since_flip'], -r['strength']))
+        return out
+
+    def publish(self, filename: str = 'scanner_flips.json'):
+        """Export the latest ranking in the background"""
+        self.fetcher.export_to_json(self.ranked, filename, background=True)
+
+    def run(self, iterations: Optional[int] = None,
+            publish_file: Optional[str] = 'scanner_flips.json'):
+        """
+        Sample every sample_sec and re-rank after every candle close
+
+        Args:
+            iterations: Stop after this many candle closes (None runs forever)
+            publish_file: JSON file for the ranking (None to skip)
+        """
+        done = 0
+        while iterations is None or done < iterations:
+            last_time = self.last_time
+            self.update()
+            if self.last_time != last_time and last_time is not None:
+                if publish_file:
+                    self.publish(publish_file)
+                for flip in self.ranked[:10]:
+                    logger.info(f"  {flip['signal'].upper():4} {flip['symbol']:12} "
+                                f"strength {flip['strength']:.2f} ATR @ {flip['close']}")
+                done += 1
+            time.sleep(self.sample_sec)
@@ -0,0 +1,181 @@
+"""
+Supertrend trading strategy shared by the live runtime and the event-driven backtester
+"""
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def calculate_stop_loss(price, supertrend_value, side, fallback_pct=0.02):
+    """
+    Calculate stop loss using SuperTrend value with fallback
+
+    Args:
+        price: Current market price
+        supertrend_value: SuperTrend indicator value
+        side: 'long' or 'short'
+        fallback_pct: Fallback percentage if SuperTrend is invalid
+
+    Returns:
+        Stop loss price
+    """
+    if side == "long":
+        # For longs, SuperTrend should be below price (support)
+        if supertrend_value and supertrend_value < price:
+            return supertrend_value
+        sl_price = price * (1 - fallback_pct)
+    else:
+        # For shorts, SuperTrend should be above price (resistance)
+        if supertrend_value and supertrend_value > price:
+            return supertrend_value
+        sl_price = price * (1 + fallback_pct)
+
+    logger.info(
+        f"⚠ Using fallback SL: {sl_price} ({fallback_pct*100}%) | "
+        f"supertrend_value={supertrend_value}, price={price}"
+    )
+    return sl_price
+
+
+def build_order_plan(side: str, size: float, price: float, stop_loss: float,
+                     take_profit: Optional[float] = None) -> Dict:
+    """
+    Ready-to-submit order plan for an entry
+
+    Args:
+        side: 'long' or 'short'
+        size: Order size in contracts
+        price: Reference entry price (signal candle close)
+        stop_loss: Stop loss trigger price
+        take_profit: Take profit trigger price (None for no target)
+
+    Returns:
+        Dict with side, entry_side, size, entry_price, stop_loss, take_profit,
+        risk_reward_ratio and legs (entry, then the reduce-only exit legs)
+    """
+    entry_side = "buy" if side == "long" else "sell"
+    exit_side = "sell" if side == "long" else "buy"
+    risk = abs(price - stop_loss)
+    risk_reward = None
+    if take_profit is not None and risk > 0:
+        risk_reward = round(abs(take_profit - price) / risk, 2)
+
+    legs = [
+        {'role': 'entry', 'side': entry_side, 'size': size,
+         'order_type': 'market_order', 'reduce_only': False},
+        {'role': 'stop_loss', 'side': exit_side, 'size': size,
+         'stop_price': stop_loss, 'reduce_only': True},
+    ]
+    if take_profit is not None:
+        legs.append({'role': 'take_profit', 'side': exit_side, 'size': size,
+                     'stop_price': take_profit, 'reduce_only': True})
+
+    return {
+        'side': side,
+        'entry_side': entry_side,
+        'size': size,
+        'entry_price': price,
+        'stop_loss': stop_loss,
+        'take_profit': take_profit,
+        'risk_reward_ratio': risk_reward,
+        'legs': legs
+    }
+
+
+class SupertrendStrategy:
+    """
+    Decision logic for one Supertrend cycle
+
+    Given the last two Supertrend rows and the current position side it
+    returns what the runtime must do: force exit on a trend flip against the
+    position, close-then-open on an entry signal, or hold.
+    """
+
+    def __init__(self, sl_pct: float = 0.02, size: Optional[float] = None,
+                 target_atr: Optional[float] = None):
+        """
+        Initialize SupertrendStrategy
+
+        Args:
+            sl_pct: Fallback stop loss percentage (0.02 = 2%)
+            size: Order size in contracts; when set, entry decisions carry an order plan
+            target_atr: Take profit distance in ATRs from the entry (None for no target)
+        """
+        self.sl_pct = sl_pct
+        self.size = size
+        self.target_atr = target_atr
+
+    @staticmethod
+    def signal(prev: Dict, curr: Dict):
+        """
+        Supertrend flip signal from two consecutive rows
+
+        Returns:
+            tuple: (signal, price, trend, supertrend) with signal 'buy', 'sell' or 'hold'
+        """
+        trend = curr["trend"]
+        if (not trend or not prev["trend"] or
+                curr["supertrend"] is None or prev["supertrend"] is None):
+            return 'hold', curr["close"], trend, curr["supertrend"]
+
+        if prev["trend"] == "down" and trend == "up":
+            return 'buy', curr["close"], trend, curr["supertrend"]
+        if prev["trend"] == "up" and trend == "down":
+            return 'sell', curr["close"], trend, curr["supertrend"]
+        return 'hold', curr["close"], trend, curr["supertrend"]
+
+    def decide(self, prev: Dict, curr: Dict, current_side: Optional[str]) -> Dict:
+        """
+        Decide the action for this cycle
+
+        Args:
+            prev: Previous Supertrend row
+            curr: Latest closed Supertrend row
+            current_side: 'long', 'short' or None
+
+        Returns:
+            Dict with action ('exit' | 'enter' | 'hold'), side, close_first,
+            signal, price, trend, supertrend, stop_loss, take_profit and plan
+            (build_order_plan layout, entries only, when the strategy has a size)
+        """
+        signal, price, trend, supertrend_value = self.signal(prev, curr)
+        decision = {
+            'action': 'hold',
+            'side': None,
+            'close_first': False,
+            'signal': signal,
+            'price': price,
+            'trend': trend,
+            'supertrend': supertrend_value,
+            'stop_loss': None,
+            'take_profit': None,
+            'plan': None
+        }
+
+        # Force exit on trend flip against the open position
+        if (current_side == "long" and trend == "down") or \
+                (current_side == "short" and trend == "up"):
+            decision['action'] = 'exit'
+            decision['side'] = current_side
+            return decision
+
+        if signal == "buy" and current_side != "long":
+            side = "long"
+        elif signal == "sell" and current_side != "short":
+            side = "short"
+        else:
+            return decision
+
+        decision['action'] = 'enter'
+        decision['side'] = side
+        decision['close_first'] = current_side is not None
+        decision['stop_loss'] = calculate_stop_loss(price, supertrend_value, side, self.sl_pct)
+        atr = curr.get("atr")
+        if self.target_atr and atr:
+            offset = self.target_atr * atr
+            decision['take_profit'] = price + offset if side == "long" else price - offset
+        if self.size:
+            decision['plan'] = build_order_plan(side, self.size, price,
+                                                decision['stop_loss'], decision['take_profit'])
+        return decision
@@ -1,54 +1,150 @@
 """
 High-level trading bot with automated operations
 """
+import logging
 from api import DeltaAPI
-from typing import Optional
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
 
 
 class TradingBot:
     """Automated trading bot for Delta Exchange"""
     
-    def __init__(self, client: Optional[DeltaAPI] = None):
+    def __init__(self, client: Optional[DeltaAPI] = None, journal=None, execution=None):
         self.client = client or DeltaAPI()
+        self.journal = journal
+        self.execution = execution  # Optional Bot.execution.ExecutionEngine
         self.running = False
+        self._product_ids: Dict[str, int] = {}
+
+    def _journal_order(self, symbol: str, order: Optional[Dict], kind: str = 'order', **fields):
+        """Journal an order response, plus its fill when it executed immediately"""
+        if self.journal is None or not order:
+            return
+        result = order.get('result', order)
+        self.journal.append(kind, symbol, sync=True,
+                            order_id=result.get('id'),
+                            side=result.get('side', fields.get('side')),
+                            size=result.get('size', fields.get('size')),
+                            order_type=result.get('order_type'),
+                            state=result.get('state'),
+                            **{k: v for k, v in fields.items() if k not in ('side', 'size')})
+        fill_price = result.get('average_fill_price')
+        if fill_price and result.get('state') in ('closed', 'filled'):
+            self.journal.append('fill', symbol, sync=True,
+                                order_id=result.get('id'),
+                                side=result['side'],
+                                size=float(result['size']) - float(result.get('unfilled_size') or 0),
+                                price=float(fill_price))
     
+    def _execute(self, symbol: str, product_id: int, side: str, size: float,
+                 reduce_only: bool = False) -> Optional[Dict]:
+        """Work an order through the execution engine and journal its child orders"""
+        report = self.execution.execute(symbol, product_id, side, size, reduce_only=reduce_only)
+        for child in report['orders']:
+            self._journal_order(symbol, child, side=side, size=size, reduce_only=reduce_only,
+                                execution='smart')
+        return report if report['filled_size'] > 0 else None
+
     def get_product_id(self, symbol: str) -> Optional[int]:
-        """Get product ID from symbol"""
+        """Get product ID from symbol (cached; product IDs do not change)"""
+        if symbol in self._product_ids:
+            return self._product_ids[symbol]
         products = self.client.get_products()
         for product in products.get('result', []):
-            if product['symbol'] == symbol:
-                return product['id']
-        return None
+            self._product_ids[product['symbol']] = product['id']
+        return self._product_ids.get(symbol)
     
     def execute_simple_trade(self, symbol: str, side: str, size: float):
         """Execute a simple market order trade"""
-        print(f"\n=== Executing {side.upper()} order for {symbol} ===")
+        logger.info(f"\n=== Executing {side.upper()} order for {symbol} ===")
         
         product_id = self.get_product_id(symbol)
         if not product_id:
-            print(f"Error: Product {symbol} not found")
+            logger.error(f"Error: Product {symbol} not found")
             return None
         
         try:
+            if self.execution is not None:
+                return self._execute(symbol, product_id, side, size)
             order = self.client.place_market_order(
                 product_id=product_id,
                 size=size,
                 side=side
             )
-            print(f"Order placed successfully: {order}")
+            logger.info(f"Order placed successfully: {order}",
+                        extra={'symbol': symbol, 'side': side, 'size': size})
+            self._journal_order(symbol, order, side=side, size=size)
             return order
         except Exception as e:
-            print(f"Error placing order: {e}")
+            logger.error(f"Error placing order: {e}")
             return None
     
+    def submit_plan(self, symbol: str, plan: Dict):
+        """
+        Submit a precomputed order plan (Bot.strategy.build_order_plan)
+
+        The entry goes out as one bracket order carrying its stop loss and
+        take profit, so nothing is computed or awaited after the fill. With an
+        execution engine the entry is worked passively and the exit legs are
+        attached to the resulting position right after.
+        """
+        side, size = plan['entry_side'], plan['size']
+        logger.info(f"\n=== Submitting {side.upper()} plan for {symbol} ===")
+
+        product_id = self.get_product_id(symbol)
+        if not product_id:
+            logger.error(f"Error: Product {symbol} not found")
+            return None
+
+        legs = {leg['role']: leg for leg in plan['legs']}
+        stop_loss = legs['stop_loss']['stop_price'] if 'stop_loss' in legs else None
+        take_profit = legs['take_profit']['stop_price'] if 'take_profit' in legs else None
+
+        protected = size
+        try:
+            if self.execution is not None:
+                order = self._execute(symbol, product_id, side, size)
+                if order:
+                    # The bracket covers the position, i.e. whatever actually filled
+                    protected = order['filled_size']
+                    try:
+                        self.client.place_position_bracket(product_id, stop_loss, take_profit)
+                    except Exception as e:
+                        # The entry filled: report it, the position is just unprotected
+                        logger.error(f"Error attaching stop loss / take profit: {e}")
+                        stop_loss = None
+            else:
+                order = self.client.place_bracket_order(
+                    product_id=product_id,
+                    size=size,
+                    side=side,
+                    stop_loss_price=stop_loss,
+                    take_profit_price=take_profit
+                )
+                self._journal_order(symbol, order, side=side, size=size,
+                                    stop_loss=stop_loss, take_profit=take_profit)
+            logger.info(f"Plan submitted: {order}",
+                        extra={'symbol': symbol, 'side': side, 'size': size,
+                               'stop_loss': stop_loss, 'take_profit': take_profit})
+            if order and self.journal is not None and stop_loss is not None:
+                self.journal.append('stop_loss', symbol, sync=True,
+                                    side=legs['stop_loss']['side'], size=protected,
+                                    stop_price=stop_loss, take_profit=take_profit, bracket=True)
+            return order
+        except Exception as e:
+            logger.error(f"Error submitting order plan: {e}")
+            return None
+
     def execute_limit_trade(self, symbol: str, side: str, size: float, 
                            limit_price: float):
         """Execute a limit order trade"""
-        print(f"\n=== Executing {side.upper()} limit order for {symbol} ===")
+        logger.info(f"\n=== Executing {side.upper()} limit order for {symbol} ===")
         
         product_id = self.get_product_id(symbol)
         if not product_id:
-            print(f"Error: Product {symbol} not found")
+            logger.error(f"Error: Product {symbol} not found")
             return None
         
         try:
@@ -58,19 +154,21 @@ class TradingBot:
                 side=side,
                 limit_price=limit_price
             )
-            print(f"Limit order placed: {order}")
+            logger.info(f"Limit order placed: {order}",
+                        extra={'symbol': symbol, 'side': side, 'size': size, 'limit_price': limit_price})
+            self._journal_order(symbol, order, side=side, size=size, limit_price=limit_price)
             return order
         except Exception as e:
-            print(f"Error placing limit order: {e}")
+            logger.error(f"Error placing limit order: {e}")
             return None
     
     def set_stop_loss(self, symbol: str, side: str, size: float, stop_price: float):
         """Set a stop loss order"""
-        print(f"\n=== Setting stop loss for {symbol} ===")
+        logger.info(f"\n=== Setting stop loss for {symbol} ===")
         
         product_id = self.get_product_id(symbol)
         if not product_id:
-            print(f"Error: Product {symbol} not found")
+            logger.error(f"Error: Product {symbol} not found")
             return None
         
         try:
@@ -80,41 +178,46 @@ class TradingBot:
                 side=side,
                 stop_price=stop_price
             )
-            print(f"Stop loss set: {order}")
+            logger.info(f"Stop loss set: {order}",
+                        extra={'symbol': symbol, 'side': side, 'size': size, 'stop_price': stop_price})
+            self._journal_order(symbol, order, kind='stop_loss', side=side, size=size,
+                                stop_price=stop_price)
             return order
         except Exception as e:
-            print(f"Error setting stop loss: {e}")
+            logger.error(f"Error setting stop loss: {e}")
             return None
     
     def exit_position(self, symbol: str, percentage: float = 100.0):
         """Exit a position (partial or full)"""
-        print(f"\n=== Exiting {percentage}% of {symbol} position ===")
+        logger.info(f"\n=== Exiting {percentage}% of {symbol} position ===")
         
         product_id = self.get_product_id(symbol)
         if not product_id:
-            print(f"Error: Product {symbol} not found")
+            logger.error(f"Error: Product {symbol} not found")
             return None
         
         try:
             position_data = self.client.get_position(product_id)
             
             if not position_data or 'result' not in position_data:
-                print("No position found to exit")
+                logger.warning("No position found to exit")
                 return None
             
             position = position_data['result']
             current_size = float(position.get('size', 0))
             
             if current_size == 0:
-                print("No open position to close")
+                logger.warning("No open position to close")
                 return None
             
             close_size = abs(current_size * (percentage / 100.0))
             close_side = 'sell' if current_size > 0 else 'buy'
             
-            print(f"Current position size: {current_size}")
-            print(f"Closing {close_size} contracts ({percentage}%)")
+            logger.info(f"Current position size: {current_size}")
+            logger.info(f"Closing {close_size} contracts ({percentage}%)")
             
+            if self.execution is not None:
+                return self._execute(symbol, product_id, close_side, close_size, reduce_only=True)
             order = self.client.place_market_order(
                 product_id=product_id,
                 size=close_size,
@@ -122,22 +225,23 @@ class TradingBot:
                 reduce_only=True
             )
             
-            print(f"Exit order placed successfully: {order}")
+            logger.info(f"Exit order placed successfully: {order}")
+            self._journal_order(symbol, order, side=close_side, size=close_size, reduce_only=True)
             return order
             
         except Exception as e:
-            print(f"Error exiting position: {e}")
+            logger.error(f"Error exiting position: {e}")
             return None
     
     def exit_all_positions(self):
         """Exit all open positions"""
-        print("\n=== Exiting ALL positions ===")
+        logger.info("\n=== Exiting ALL positions ===")
         
         try:
             positions = self.client.get_positions()
             
             if not positions or 'result' not in positions:
-                print("No positions to exit")
+                logger.info("No positions to exit")
                 return []
             
             result = positions.get('result', [])
@@ -152,7 +256,7 @@ class TradingBot:
                     symbol = position.get('product_symbol')
                     product_id = position.get('product_id')
                     
-                    print(f"\nClosing position: {symbol}")
+                    logger.info(f"\nClosing position: {symbol}")
                     
                     close_side = 'sell' if size > 0 else 'buy'
                     close_size = abs(size)
@@ -164,20 +268,22 @@ class TradingBot:
                             side=close_side,
                             reduce_only=True
                         )
-                        print(f"✓ Closed {symbol}: {order}")
+                        logger.info(f"✓ Closed {symbol}: {order}")
+                        self._journal_order(symbol, order, side=close_side, size=close_size,
+                                            reduce_only=True)
                         closed_positions.append(order)
                     except Exception as e:
-                        print(f"✗ Failed to close {symbol}: {e}")
+                        logger.error(f"✗ Failed to close {symbol}: {e}")
             
             if closed_positions:
-                print(f"\n✓ Successfully closed {len(closed_positions)} position(s)")
+                logger.info(f"\n✓ Successfully closed {len(closed_positions)} position(s)")
             else:
-                print("\nNo positions were closed")
+                logger.info("\nNo positions were closed")
             
             return closed_positions
             
         except Exception as e:
-            print(f"Error exiting all positions: {e}")
+            logger.error(f"Error exiting all positions: {e}")
             return []
     
     def monitor_positions(self, underlying_asset: Optional[str] = None):
@@ -185,10 +291,10 @@ class TradingBot:
         try:
             positions = self.client.get_positions(underlying_asset=underlying_asset)
             
-            print("\n=== Current Positions ===")
+            logger.info("\n=== Current Positions ===")
             
             if not positions or 'result' not in positions:
-                print("No positions found or error retrieving positions")
+                logger.info("No positions found or error retrieving positions")
                 return
             
             result = positions.get('result', [])
@@ -197,34 +303,34 @@ class TradingBot:
                 result = [result]
             
             if not result or len(result) == 0:
-                print("No open positions")
+                logger.info("No open positions")
                 return
             
             for position in result:
                 size = float(position.get('size', 0))
                 if size != 0:
-                    print(f"Symbol: {position.get('product_symbol', 'N/A')}")
-                    print(f"  Size: {position.get('size', 0)}")
-                    print(f"  Entry Price: {position.get('entry_price', 'N/A')}")
-                    print(f"  Mark Price: {position.get('mark_price', 'N/A')}")
-                    print(f"  Unrealized PnL: {position.get('unrealized_pnl', 'N/A')}")
-                    print(f"  Realized PnL: {position.get('realized_pnl', 'N/A')}")
-                    print(f"  Leverage: {position.get('leverage', 'N/A')}")
-                    print("---")
+                    logger.info(f"Symbol: {position.get('product_symbol', 'N/A')}")
+                    logger.info(f"  Size: {position.get('size', 0)}")
+                    logger.info(f"  Entry Price: {position.get('entry_price', 'N/A')}")
+                    logger.info(f"  Mark Price: {position.get('mark_price', 'N/A')}")
+                    logger.info(f"  Unrealized PnL: {position.get('unrealized_pnl', 'N/A')}")
+                    logger.info(f"  Realized PnL: {position.get('realized_pnl', 'N/A')}")
+                    logger.info(f"  Leverage: {position.get('leverage', 'N/A')}")
+                    logger.info("---")
             
             if all(float(p.get('size', 0)) == 0 for p in result):
-                print("No open positions")
+                logger.info("No open positions")
                 
         except Exception as e:
-            print(f"Error monitoring positions: {e}")
+            logger.error(f"Error monitoring positions: {e}")
     
     def display_balance(self):
         """Display account balance"""
         balance = self.client.get_balance()
         
-        print("\n=== Account Balance ===")
+        logger.info("\n=== Account Balance ===")
         for wallet in balance.get('result', []):
-            print(f"Asset: {wallet['asset_symbol']}")
-            print(f"  Balance: {wallet['balance']}")
-            print(f"  Available: {wallet['available_balance']}")
-            print("---")
\ No newline at end of file
+            logger.info(f"Asset: {wallet['asset_symbol']}")
+            logger.info(f"  Balance: {wallet['balance']}")
+            logger.info(f"  Available: {wallet['available_balance']}")
+            logger.info("---")
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""
+SuperTrend for many symbols at once
+
+Inputs are aligned 2-D arrays (symbols × time): row s holds one symbol's
+candles, column t the same candle close for every symbol. The recursion
+stays sequential in time but each step updates all symbols together, as
+numpy vector operations when numpy is installed and as a flat loop over
+the symbols otherwise. Values match calculate_supertrend per symbol.
+
+Usage:
+    st = supertrend_batch(highs, lows, closes)            # history screen
+    tracker = SupertrendBatchTracker(len(symbols))
+    tracker.seed(highs, lows, closes)
+    trend = tracker.update(high_now, low_now, close_now)  # one candle close
+    for s, signal in tracker.signals():
+        ...
+"""
+import math
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+
+class SupertrendBatchTracker:
+    """
+    Incremental SuperTrend state for a fixed set of symbols
+
+    Every update() takes one closed candle per symbol; all symbols must share
+    the same candle times (align or forward-fill before feeding).
+    """
+
+    def __init__(self, n_symbols: int, period: int = 10, multiplier: float = 3):
+        self.n_symbols = n_symbols
+        self.period = period
+        self.multiplier = multiplier
+        self.reset()
+
+    def reset(self):
+        """Reset state to recalculate from scratch"""
+        n = self.n_symbols
+        self.count = 0
+        self.prev_close = None
+        self.tr_sum = _full(n, 0.0)
+        self.atr = _full(n, math.nan)
+        self.final_upper = _full(n, math.nan)
+        self.final_lower = _full(n, math.nan)
+        self.supertrend = _full(n, math.nan)
+        self.trend = _full(n, 0, int)
+        self.prev_trend = _full(n, 0, int)
+
+    def update(self, high, low, close):
+        """
+        Update every symbol with its next closed candle
+
+        Args:
+            high, low, close: One value per symbol
+
+        Returns:
+            Trend codes per symbol (1 up, -1 down, 0 warm-up)
+        """
+        if HAVE_NUMPY:
+            high = np.asarray(high, dtype=np.float64)
+            low = np.asarray(low, dtype=np.float64)
+            close = np.asarray(close, dtype=np.float64)
+            step = self._step_numpy
+        else:
+            step = self._step_python
+
+        i = self.count
+        self.count += 1
+        prev_close = self.prev_close
+        self.prev_close = close
+        self.prev_trend = self.trend
+        if i == 0:
+            return self.trend
+        return step(i, high, low, close, prev_close)
+
+    def _step_numpy(self, i, high, low, close, prev_close):
+        period = self.period
+        tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+        if i < period:
+            self.tr_sum += tr
+            return self.trend
+        elif i == period:
+            atr = (self.tr_sum + tr) / period
+        else:
+            atr = (self.atr * (period - 1) + tr) / period
+
+        mid = (high + low) / 2
+        basic_upper = mid + self.multiplier * atr
+        basic_lower = mid - self.multiplier * atr
+
+        if i == period:
+            final_upper = basic_upper
+            final_lower = basic_lower
+            trend = np.ones(self.n_symbols, dtype=np.int64)
+        else:
+            prev_upper = self.final_upper
+            prev_lower = self.final_lower
+            final_upper = np.where((basic_upper < prev_upper) | (prev_close > prev_upper),
+                                   basic_upper, prev_upper)
+            final_lower = np.where((basic_lower > prev_lower) | (prev_close < prev_lower),
+                                   basic_lower, prev_lower)
+            trend = np.where(self.trend == 1,
+                             np.where(close > final_lower, 1, -1),
+                             np.where(close < final_upper, -1, 1))
+
+        self.atr = atr
+        self.final_upper = final_upper
+        self.final_lower = final_lower
+        self.supertrend = np.where(trend == 1, final_lower, final_upper)
+        self.trend = trend
+        return trend
+
+    def _step_python(self, i, high, low, close, prev_close):
+        period = self.period
+        multiplier = self.multiplier
+        n = self.n_symbols
+        tr = [max(high[s] - low[s], abs(high[s] - prev_close[s]), abs(low[s] - prev_close[s]))
+              for s in range(n)]
+        if i < period:
+            self.tr_sum = [a + b for a, b in zip(self.tr_sum, tr)]
+            return self.trend
+
+        atr = [0.0] * n
+        final_upper = [0.0] * n
+        final_lower = [0.0] * n
+        supertrend = [0.0] * n
+        trend = [0] * n
+        for s in range(n):
+            if i == period:
+                a = (self.tr_sum[s] + tr[s]) / period
+            else:
+                a = (self.atr[s] * (period - 1) + tr[s]) / period
+            mid = (high[s] + low[s]) / 2
+            basic_upper = mid + multiplier * a
+            basic_lower = mid - multiplier * a
+            pc = prev_close[s]
+            c = close[s]
+
+            if i == period:
+                fu, fl, t = basic_upper, basic_lower, 1
+            else:
+                prev_upper = self.final_upper[s]
+                prev_lower = self.final_lower[s]
+                fu = basic_upper if basic_upper < prev_upper or pc > prev_upper else prev_upper
+                fl = basic_lower if basic_lower > prev_lower or pc < prev_lower else prev_lower
+                if self.trend[s] == 1:
+                    t = 1 if c > fl else -1
+                else:
+                    t = -1 if c < fu else 1
+
+            atr[s] = a
+            final_upper[s] = fu
+            final_lower[s] = fl
+            supertrend[s] = fl if t == 1 else fu
+            trend[s] = t
+
+        self.atr = atr
+        self.final_upper = final_upper
+        self.final_lower = final_lower
+        self.supertrend = supertrend
+        self.trend = trend
+        return trend
+
+    def seed(self, high, low, close):
+        """
+        Warm the state up on aligned history (symbols × time)
+
+        Returns:
+            Trend codes per symbol after the last candle
+        """
+        for t in range(len(close[0]) if len(close) else 0):
+            self.update(_column(high, t), _column(low, t), _column(close, t))
+        return self.trend
+
+    def signals(self) -> List[Tuple[int, str]]:
+        """
+        Symbols whose trend flipped on the last update
+
+        Returns:
+            List of (symbol index, 'buy' | 'sell')
+        """
+        out = []
+        for s, (prev, cur) in enumerate(zip(self.prev_trend, self.trend)):
+            if prev == -1 and cur == 1:
+                out.append((s, 'buy'))
+            elif prev == 1 and cur == -1:
+                out.append((s, 'sell'))
+        return out
+
+
+def supertrend_batch(high, low, close, period: int = 10, multiplier: float = 3) -> Dict:
+    """
+    SuperTrend over aligned histories of many symbols
+
+    Args:
+        high, low, close: 2-D arrays or lists of rows (symbols × time)
+        period: ATR period
+        multiplier: ATR multiplier
+
+    Returns:
+        Dict of symbols × time arrays: atr, final_upper, final_lower,
+        supertrend, trend (codes); NaN / 0 during warm-up
+    """
+    n_symbols = len(close)
+    n_times = len(close[0]) if n_symbols else 0
+    tracker = SupertrendBatchTracker(n_symbols, period, multiplier)
+    fields = ('atr', 'final_upper', 'final_lower', 'supertrend', 'trend')
+
+    if HAVE_NUMPY:
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        out = {name: np.full((n_symbols, n_times), math.nan) for name in fields[:-1]}
+        out['trend'] = np.zeros((n_symbols, n_times), dtype=np.int64)
+        for t in range(n_times):
+            tracker.update(high[:, t], low[:, t], close[:, t])
+            if t >= period:
+                for name in fields:
+                    out[name][:, t] = getattr(tracker, name)
+        return out
+
+    out = {name: [[math.nan] * n_times for _ in range(n_symbols)] for name in fields[:-1]}
+    out['trend'] = [[0] * n_times for _ in range(n_symbols)]
+    for t in range(n_times):
+        tracker.update(_column(high, t), _column(low, t), _column(close, t))
+        if t >= period:
+            for name in fields:
+                values = getattr(tracker, name)
+                rows = out[name]
+                for s in range(n_symbols):
+                    rows[s][t] = values[s]
+    return out
+
+
+def _full(n: int, value, dtype=float):
+    if HAVE_NUMPY:
+        return np.full(n, value, dtype=np.int64 if dtype is int else np.float64)
+    return [value] * n
+
+
+def _column(rows, t):
+    if HAVE_NUMPY and isinstance(rows, np.ndarray):
+        return rows[:, t]
+    return [row[t] for row in rows]
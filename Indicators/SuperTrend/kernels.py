@@ -0,0 +1,281 @@
+"""
+Compiled kernels for the sequential SuperTrend recursion and the
+SL/target exit scan
+
+With numba installed the kernels are JIT-compiled (nopython, cached on
+disk next to this module); otherwise the same functions run as plain
+Python over array('d') buffers. Call warmup() at startup so the first live
+cycle does not pay compile or cache-load cost.
+
+Trend codes: 1 = up, -1 = down, 0 = warm-up.
+Exit reasons: 1 = SL, 2 = TARGET, 3 = TREND_FLIP.
+"""
+import logging
+import math
+import time
+from array import array
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+HAVE_NUMBA = njit is not None
+
+EXIT_REASONS = {1: "SL", 2: "TARGET", 3: "TREND_FLIP"}
+TREND_CODES = {"up": 1, "down": -1}
+
+
+def _jit(fn):
+    return njit(cache=True, nogil=True)(fn) if HAVE_NUMBA else fn
+
+
+# ==================== Buffers ====================
+
+def _empty(typecode: str, n: int):
+    if HAVE_NUMBA:
+        return np.empty(n, dtype=np.int64 if typecode == 'q' else np.float64)
+    return array(typecode, bytes(8 * n))
+
+
+def as_kernel_array(values, typecode: str = 'd'):
+    """Convert a column once for repeated kernel calls (numpy under numba)"""
+    if HAVE_NUMBA:
+        return np.asarray(values, dtype=np.int64 if typecode == 'q' else np.float64)
+    return values
+
+
+# ==================== Kernels ====================
+
+@_jit
+def supertrend_kernel(high, low, close, period, multiplier,
+                      atr, final_upper, final_lower, supertrend, trend):
+    """
+    Fill the output buffers with calculate_supertrend's values
+
+    Warm-up positions are NaN (trend 0).
+    """
+    n = len(close)
+    nan = math.nan
+    tr_sum = 0.0
+    prev_atr = 0.0
+    prev_upper = nan
+    prev_lower = nan
+    prev_trend = 0
+
+    for i in range(n):
+        atr[i] = nan
+        final_upper[i] = nan
+        final_lower[i] = nan
+        supertrend[i] = nan
+        trend[i] = 0
+        if i == 0:
+            continue
+
+        h = high[i]
+        lo = low[i]
+        c = close[i]
+        prev_close = close[i - 1]
+        tr = max(h - lo, abs(h - prev_close), abs(lo - prev_close))
+
+        if i < period:
+            tr_sum += tr
+            continue
+        elif i == period:
+            a = (tr_sum + tr) / period
+        else:
+            a = (prev_atr * (period - 1) + tr) / period
+        prev_atr = a
+
+        mid = (h + lo) / 2
+        basic_upper = mid + multiplier * a
+        basic_lower = mid - multiplier * a
+
+        if math.isnan(prev_upper) or basic_upper < prev_upper or prev_close > prev_upper:
+            fu = basic_upper
+        else:
+            fu = prev_upper
+
+        if math.isnan(prev_lower) or basic_lower > prev_lower or prev_close < prev_lower:
+            fl = basic_lower
+        else:
+            fl = prev_lower
+
+        if prev_trend == 0:
+            t = 1
+        elif prev_trend == 1:
+            t = 1 if c > fl else -1
+        else:
+            t = -1 if c < fu else 1
+
+        atr[i] = a
+        final_upper[i] = fu
+        final_lower[i] = fl
+        supertrend[i] = fl if t == 1 else fu
+        trend[i] = t
+
+        prev_upper = fu
+        prev_lower = fl
+        prev_trend = t
+
+
+@_jit
+def sl_target_kernel(trend, high, low, close, sl_pct, target_pct,
+                     entry_idx, exit_idx, exit_price, side, reason):
+    """
+    Trade scan of SupertrendBacktest.backtest_sl_target over trend codes
+
+    Entries on a trend flip at the next close; exits on SL, target
+    (checked on the candle's high/low, SL first) or the opposite flip.
+
+    Returns:
+        Number of trades written to the output buffers
+    """
+    n = len(close)
+    k = 0
+    pos = 0
+    entry = 0.0
+    entry_i = -1
+
+    for i in range(n - 1):
+        ct = trend[i]
+        nt = trend[i + 1]
+
+        if pos == 0:
+            if ct == -1 and nt == 1:
+                pos = 1
+            elif ct == 1 and nt == -1:
+                pos = -1
+            else:
+                continue
+            entry = close[i + 1]
+            entry_i = i + 1
+            continue
+
+        h = high[i]
+        lo = low[i]
+        r = 0
+        px = 0.0
+
+        if pos == 1:
+            stop = entry * (1 - sl_pct / 100)
+            target = entry * (1 + target_pct / 100)
+            if lo <= stop:
+                px = stop
+                r = 1
+            elif h >= target:
+                px = target
+                r = 2
+        else:
+            stop = entry * (1 + sl_pct / 100)
+            target = entry * (1 - target_pct / 100)
+            if h >= stop:
+                px = stop
+                r = 1
+            elif lo <= target:
+                px = target
+                r = 2
+
+        if r != 0:
+            entry_idx[k] = entry_i
+            exit_idx[k] = i
+            exit_price[k] = px
+            side[k] = pos
+            reason[k] = r
+            k += 1
+            pos = 0
+        elif (pos == 1 and ct == 1 and nt == -1) or (pos == -1 and ct == -1 and nt == 1):
+            entry_idx[k] = entry_i
+            exit_idx[k] = i + 1
+            exit_price[k] = close[i + 1]
+            side[k] = pos
+            reason[k] = 3
+            k += 1
+            pos = 0
+
+    return k
+
+
+# ==================== Wrappers ====================
+
+def supertrend_arrays(data, period: int = 10, multiplier: float = 3) -> dict:
+    """
+    SuperTrend as columns instead of row dicts
+
+    Args:
+        data: List of (time, open, high, low, close, volume) rows or CandleColumns
+        period: ATR period
+        multiplier: ATR multiplier
+
+    Returns:
+        Dict of columns: time, atr, final_upper, final_lower, supertrend,
+        trend (codes); empty columns when there is not enough data, like
+        calculate_supertrend
+    """
+    if hasattr(data, 'close'):
+        times, high, low, close = data.time, data.high, data.low, data.close
+    elif data:
+        times, _, high, low, close, _ = zip(*data)
+    else:
+        times = high = low = close = ()
+
+    n = len(close) if len(close) >= period + 1 else 0
+    out = {
+        'time': times[:n],
+        'atr': _empty('d', n),
+        'final_upper': _empty('d', n),
+        'final_lower': _empty('d', n),
+        'supertrend': _empty('d', n),
+        'trend': _empty('q', n),
+    }
+    if n:
+        supertrend_kernel(as_kernel_array(high), as_kernel_array(low), as_kernel_array(close),
+                          period, float(multiplier), out['atr'], out['final_upper'], out['final_lower'],
+                          out['supertrend'], out['trend'])
+    return out
+
+
+def trend_codes(supertrend_data) -> list:
+    """Trend codes of calculate_supertrend rows"""
+    return [TREND_CODES.get(row["trend"], 0) for row in supertrend_data]
+
+
+def sl_target_scan(trend, high, low, close, sl_pct: float, target_pct: float):
+    """
+    Run sl_target_kernel
+
+    Returns:
+        List of (entry_index, exit_index, exit_price, side_code, reason_code)
+    """
+    n = len(close)
+    entry_idx, exit_idx = _empty('q', n), _empty('q', n)
+    exit_price = _empty('d', n)
+    side, reason = _empty('q', n), _empty('q', n)
+    k = sl_target_kernel(as_kernel_array(trend, 'q'), as_kernel_array(high),
+                         as_kernel_array(low), as_kernel_array(close),
+                         float(sl_pct), float(target_pct),
+                         entry_idx, exit_idx, exit_price, side, reason)
+    return [(int(entry_idx[j]), int(exit_idx[j]), float(exit_price[j]), int(side[j]), int(reason[j]))
+            for j in range(k)]
+
+
+def warmup() -> float:
+    """
+    Compile (or load from the on-disk cache) both kernels on a tiny input
+
+    Returns:
+        Seconds spent
+    """
+    start = time.perf_counter()
+    candles = [(i, 100.0, 101.0 + i % 3, 99.0 - i % 2, 100.0 + (i % 5) - 2, 1.0) for i in range(32)]
+    st = supertrend_arrays(candles, period=10, multiplier=3)
+    sl_target_scan(st['trend'], [c[2] for c in candles], [c[3] for c in candles],
+                   [c[4] for c in candles], 2.0, 3.0)
+    elapsed = time.perf_counter() - start
+    logger.info(f"✓ SuperTrend kernels ready ({'numba' if HAVE_NUMBA else 'pure Python'}) "
+                f"in {elapsed * 1000:.1f} ms")
+    return elapsed
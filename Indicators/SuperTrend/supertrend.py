@@ -1,7 +1,6 @@
-from utils.data_fetcher import DataFetcher
+from utils.latency import timed
+from Indicators.SuperTrend.kernels import HAVE_NUMBA, supertrend_arrays
 
-fetcher=DataFetcher()
-    
 
 def get_supertrend_signal(supertrend_data):
     """
@@ -154,6 +153,7 @@ def get_supertrend_signal(supertrend_data):
 #     return result
 #above is sma atr
 
+@timed("indicator.supertrend")
 def calculate_supertrend(data, period=10, multiplier=3):
     """
     Calculate SuperTrend indicator.
@@ -177,6 +177,9 @@ def calculate_supertrend(data, period=10, multiplier=3):
     if not data or len(data) < period + 1:
         return []
 
+    if HAVE_NUMBA:
+        return _supertrend_rows(data, period, multiplier)
+
     for i in range(len(data)):
         time_val, open_price, high, low, close, volume = data[i]
 
@@ -281,5 +284,173 @@ def calculate_supertrend(data, period=10, multiplier=3):
 
     return result
 
+
+def _supertrend_rows(data, period, multiplier):
+    """calculate_supertrend rows with the recursion run by the compiled kernel"""
+    st = supertrend_arrays(data, period, multiplier)
+    atrs = st['atr'].tolist()
+    uppers = st['final_upper'].tolist()
+    lowers = st['final_lower'].tolist()
+    lines = st['supertrend'].tolist()
+    trends = st['trend'].tolist()
+    if hasattr(data, 'close'):
+        data = zip(data.time, data.open, data.high, data.low, data.close, data.volume)
+
+    result = []
+    for i, (time_val, open_price, high, low, close, volume) in enumerate(data):
+        code = trends[i]
+        if not code:
+            result.append({
+                "time": time_val,
+                "open": open_price,
+                "high": high,
+                "low": low,
+                "close": close,
+                "atr": None,
+                "basic_upper": None,
+                "basic_lower": None,
+                "final_upper": None,
+                "final_lower": None,
+                "supertrend": None,
+                "trend": None
+            })
+            continue
+        atr = atrs[i]
+        hl2 = (high + low) / 2
+        result.append({
+            "time": time_val,
+            "open": open_price,
+            "high": high,
+            "low": low,
+            "close": close,
+            "atr": atr,
+            "basic_upper": hl2 + multiplier * atr,
+            "basic_lower": hl2 - multiplier * atr,
+            "final_upper": uppers[i],
+            "final_lower": lowers[i],
+            "supertrend": lines[i],
+            "trend": "up" if code == 1 else "down"
+        })
+    return result
+
+
+class SupertrendTracker:
+    """
+    Incremental SuperTrend with the same Wilder ATR seeding as calculate_supertrend.
+
+    Feeding candles one by one through update() yields exactly the rows
+    calculate_supertrend returns for the same history, in O(1) per candle.
+    """
+
+    def __init__(self, period=10, multiplier=3):
+        self.period = period
+        self.multiplier = multiplier
+        self.reset()
+
+    def reset(self):
+        """Reset state to recalculate from scratch"""
+        self.count = 0
+        self.tr_sum = 0.0
+        self.prev_close = None
+        self.prev_atr = None
+        self.prev_final_upper = None
+        self.prev_final_lower = None
+        self.prev_trend = None
+
+    def update(self, candle):
+        """
+        Update SuperTrend with the next closed candle
+
+        Args:
+            candle: (time, open, high, low, close, volume)
+
+        Returns:
+            Dict in the calculate_supertrend row layout
+        """
+        time_val, open_price, high, low, close, volume = candle
+        i = self.count
+        self.count += 1
+
+        if i == 0:
+            self.prev_close = close
+            return _empty_row(time_val, open_price, high, low, close)
+
+        prev_close = self.prev_close
+        self.prev_close = close
+
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        period = self.period
+        if i < period:
+            self.tr_sum += tr
+            return _empty_row(time_val, open_price, high, low, close)
+        elif i == period:
+            atr = (self.tr_sum + tr) / period
+        else:
+            atr = ((self.prev_atr * (period - 1)) + tr) / period
+        self.prev_atr = atr
+
+        hl2 = (high + low) / 2
+        basic_upper = hl2 + self.multiplier * atr
+        basic_lower = hl2 - self.multiplier * atr
+
+        prev_final_upper = self.prev_final_upper
+        prev_final_lower = self.prev_final_lower
+
+        if prev_final_upper is None or basic_upper < prev_final_upper or prev_close > prev_final_upper:
+            final_upper = basic_upper
+        else:
+            final_upper = prev_final_upper
+
+        if prev_final_lower is None or basic_lower > prev_final_lower or prev_close < prev_final_lower:
+            final_lower = basic_lower
+        else:
+            final_lower = prev_final_lower
+
+        prev_trend = self.prev_trend
+        if prev_trend is None:
+            trend = "up"
+        elif prev_trend == "up":
+            trend = "up" if close > final_lower else "down"
+        else:
+            trend = "down" if close < final_upper else "up"
+
+        self.prev_final_upper = final_upper
+        self.prev_final_lower = final_lower
+        self.prev_trend = trend
+
+        return {
+            "time": time_val,
+            "open": open_price,
+            "high": high,
+            "low": low,
+            "close": close,
+            "atr": atr,
+            "basic_upper": basic_upper,
+            "basic_lower": basic_lower,
+            "final_upper": final_upper,
+            "final_lower": final_lower,
+            "supertrend": final_lower if trend == "up" else final_upper,
+            "trend": trend
+        }
+
+
+def _empty_row(time_val, open_price, high, low, close):
+    """Warm-up row with no indicator values"""
+    return {
+        "time": time_val,
+        "open": open_price,
+        "high": high,
+        "low": low,
+        "close": close,
+        "atr": None,
+        "basic_upper": None,
+        "basic_lower": None,
+        "final_upper": None,
+        "final_lower": None,
+        "supertrend": None,
+        "trend": None
+    }
+
 # data=calculate_supertrend()
 # fetcher.export_to_json(data,"supertrend.json")
\ No newline at end of file
@@ -4,7 +4,6 @@ Supertrend signal generator with incremental updates
 Works with your existing Supertrend calculation logic
 """
 from typing import Dict, Optional, List
-from utils.data_fetcher import DataFetcher
 
 
 class SupertrendState:
@@ -151,22 +150,31 @@ class SupertrendState:
 class SupertrendSignalGenerator:
     """Generate trading signals based on Supertrend"""
     
-    def __init__(self, period: int = 10, multiplier: float = 3.0):
+    def __init__(self, period: int = 10, multiplier: float = 3.0, data_fetcher=None):
         """
         Initialize Signal Generator
         
         Args:
             period: ATR period (default 10)
             multiplier: ATR multiplier (default 3.0)
+            data_fetcher: DataFetcher instance (optional, created on first use)
         """
         self.period = period
         self.multiplier = multiplier
         self.state = SupertrendState(period, multiplier)
-        self.data_fetcher = DataFetcher()
+        self._data_fetcher = data_fetcher
         
         # Signal tracking
         self.last_signal = None
         self.last_signal_time = None
+
+    @property
+    def data_fetcher(self):
+        """DataFetcher, created lazily on first access"""
+        if self._data_fetcher is None:
+            from utils.data_fetcher import DataFetcher
+            self._data_fetcher = DataFetcher()
+        return self._data_fetcher
     
     def initialize_from_history(self, historical_data: List[List]) -> Dict:
         """
@@ -1,3 +1,7 @@
 from Indicators.SuperTrend.supertrend import calculate_supertrend,get_supertrend_signal
+from Indicators.ema5 import calculate_ema, ema_values, EMATracker
+from Indicators.rsi import calculate_rsi, rsi_values, RSITracker
 
-__all__ = ['calculate_supertrend','get_supertrend_signal']
\ No newline at end of file
+__all__ = ['calculate_supertrend','get_supertrend_signal',
+           'calculate_ema','ema_values','EMATracker',
+           'calculate_rsi','rsi_values','RSITracker']
@@ -0,0 +1,95 @@
+"""
+Exponential moving average (batch and incremental)
+
+Seeded like TradingView's ta.ema: the first value is the SMA of the first
+`span` closes, then ema = alpha * close + (1 - alpha) * prev with
+alpha = 2 / (span + 1). Warm-up positions are None.
+"""
+from typing import List, Optional, Sequence
+
+
+def ema_values(values: Sequence[float], span: int = 5) -> List[Optional[float]]:
+    """
+    EMA of a plain value series
+
+    Args:
+        values: Input series (e.g. closes)
+        span: EMA length
+
+    Returns:
+        List aligned with `values`
+    """
+    n = len(values)
+    if n < span:
+        return [None] * n
+
+    alpha = 2.0 / (span + 1)
+    keep = 1.0 - alpha
+    out: List[Optional[float]] = [None] * (span - 1)
+
+    ema = sum(values[:span]) / span
+    out.append(ema)
+    for i in range(span, n):
+        ema = alpha * values[i] + keep * ema
+        out.append(ema)
+    return out
+
+
+def calculate_ema(data, span: int = 5) -> List[Optional[float]]:
+    """
+    EMA of candle closes
+
+    Args:
+        data: List of (time, open, high, low, close, volume) rows or CandleColumns
+        span: EMA length
+
+    Returns:
+        List of EMA values aligned with `data`
+    """
+    closes = data.close if hasattr(data, 'close') else [c[4] for c in data]
+    return ema_values(closes, span)
+
+
+class EMATracker:
+    """
+    Incremental EMA, O(1) per candle
+
+    Feeding candles one by one through update() yields exactly the values
+    calculate_ema returns for the same history.
+    """
+
+    def __init__(self, span: int = 5):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value: Optional[float] = None
+
+    def update_value(self, x: float) -> Optional[float]:
+        """Feed one raw value; returns the EMA or None during warm-up"""
+        self.count += 1
+        if self.value is None:
+            self.seed_sum += x
+            if self.count == self.span:
+                self.value = self.seed_sum / self.span
+            return self.value
+        self.value = self.alpha * x + (1.0 - self.alpha) * self.value
+        return self.value
+
+    def update(self, candle) -> Optional[float]:
+        """
+        Update with the next closed candle
+
+        Args:
+            candle: (time, open, high, low, close, volume)
+        """
+        return self.update_value(candle[4])
+
+    def seed(self, data) -> Optional[float]:
+        """Warm the state up on history and return the latest value"""
+        for candle in data:
+            self.update(candle)
+        return self.value
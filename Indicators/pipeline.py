@@ -0,0 +1,353 @@
+"""
+Composable indicator pipeline
+
+Indicators declare their inputs (price sources, TR, ATR, hl2, EMA of
+close, ...) and the pipeline builds a dependency graph keyed by each node's
+parameters, so a shared intermediate is computed once per batch no matter
+how many indicators use it. The same graph evaluates a whole history in
+batch (run) or one closed candle at a time (stream().update).
+
+Usage:
+    from Indicators.pipeline import IndicatorPipeline, supertrend, ema, rsi
+
+    pipe = IndicatorPipeline(supertrend(10, 3), ema(5), rsi(14))
+    series = pipe.run(candles)              # {'supertrend_10_3': [...], 'ema_close_5': [...], ...}
+
+    streams = {s: pipe.stream() for s in symbols}   # one graph, state per symbol
+    streams['BTCUSD'].seed(history)
+    values = streams['BTCUSD'].update(candle)       # O(1) per candle
+"""
+from typing import Callable, Dict, List, Optional
+
+from Indicators.ema5 import EMATracker, ema_values
+from Indicators.rsi import RSITracker, rsi_values
+
+SOURCES = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+
+class Node:
+    """
+    One indicator in the graph
+
+    Args:
+        key: Unique name built from the indicator parameters
+        inputs: Nodes whose outputs are passed to batch/step, in order
+        batch: fn(*input_series) -> series
+        make_step: fn() -> step(*input_values) -> value, fresh state per stream
+    """
+
+    def __init__(self, key: str, inputs: tuple, batch: Callable, make_step: Callable):
+        self.key = key
+        self.inputs = inputs
+        self.batch = batch
+        self.make_step = make_step
+
+    def __repr__(self):
+        return f"Node({self.key})"
+
+
+def _skip_none(fn: Callable) -> Callable:
+    """Apply fn to the series from its first non-None value on"""
+    def batch(values):
+        start = 0
+        n = len(values)
+        while start < n and values[start] is None:
+            start += 1
+        return [None] * start + fn(values[start:])
+    return batch
+
+
+def _skip_none_step(update_value: Callable) -> Callable:
+    return lambda x: None if x is None else update_value(x)
+
+
+# ==================== Sources ====================
+
+def source(name: str) -> Node:
+    """Raw candle field"""
+    if name not in SOURCES:
+        raise ValueError(f"Unknown source: {name} (available: {', '.join(SOURCES)})")
+    index = SOURCES.index(name)
+    return Node(name, (), None, lambda: (lambda candle: candle[index]))
+
+
+def _as_node(src) -> Node:
+    return src if isinstance(src, Node) else source(src)
+
+
+# ==================== Intermediates ====================
+
+def hl2() -> Node:
+    def batch(high, low):
+        return [(h + l) / 2 for h, l in zip(high, low)]
+    return Node('hl2', (source('high'), source('low')), batch,
+                lambda: (lambda h, l: (h + l) / 2))
+
+
+def true_range() -> Node:
+    """True range; None on the first candle (no previous close)"""
+    def batch(high, low, close):
+        out = [None] * len(close)
+        for i in range(1, len(close)):
+            h, l, prev_close = high[i], low[i], close[i - 1]
+            out[i] = max(h - l, abs(h - prev_close), abs(l - prev_close))
+        return out
+
+    def make_step():
+        prev = [None]
+
+        def step(h, l, c):
+            prev_close = prev[0]
+            prev[0] = c
+            if prev_close is None:
+                return None
+            return max(h - l, abs(h - prev_close), abs(l - prev_close))
+        return step
+
+    return Node('tr', (source('high'), source('low'), source('close')), batch, make_step)
+
+
+def _wilder(values: List[float], period: int) -> List[Optional[float]]:
+    """Wilder smoothing seeded with the SMA of the first `period` values"""
+    n = len(values)
+    if n < period:
+        return [None] * n
+    out: List[Optional[float]] = [None] * (period - 1)
+    avg = sum(values[:period]) / period
+    out.append(avg)
+    keep = period - 1
+    for i in range(period, n):
+        avg = (avg * keep + values[i]) / period
+        out.append(avg)
+    return out
+
+
+class _WilderStep:
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.total = 0.0
+        self.value = None
+
+    def __call__(self, x):
+        if x is None:
+            return None
+        if self.value is None:
+            self.count += 1
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+            return self.value
+        self.value = (self.value * (self.period - 1) + x) / self.period
+        return self.value
+
+
+def atr(period: int = 10) -> Node:
+    """Wilder ATR, seeded like calculate_supertrend"""
+    return Node(f'atr_{period}', (true_range(),),
+                _skip_none(lambda tr: _wilder(tr, period)),
+                lambda: _WilderStep(period))
+
+
+# ==================== Indicators ====================
+
+def ema(span: int = 5, src='close') -> Node:
+    """EMA of any source or node"""
+    src = _as_node(src)
+    return Node(f'ema_{src.key}_{span}', (src,),
+                _skip_none(lambda v: ema_values(v, span)),
+                lambda: _skip_none_step(EMATracker(span).update_value))
+
+
+def rsi(period: int = 14, src='close') -> Node:
+    """Wilder RSI of any source or node"""
+    src = _as_node(src)
+    return Node(f'rsi_{src.key}_{period}', (src,),
+                _skip_none(lambda v: rsi_values(v, period)),
+                lambda: _skip_none_step(RSITracker(period).update_value))
+
+
+class _SupertrendStep:
+    """Final-band and trend state of one SuperTrend stream"""
+
+    __slots__ = ('multiplier', 'upper', 'lower', 'trend', 'close')
+
+    def __init__(self, multiplier: float):
+        self.multiplier = multiplier
+        self.upper = None
+        self.lower = None
+        self.trend = None
+        self.close = None
+
+    def __call__(self, time_val, open_price, high, low, close, mid, atr_val):
+        prev_close = self.close
+        self.close = close
+        if atr_val is None:
+            return {
+                "time": time_val, "open": open_price, "high": high, "low": low, "close": close,
+                "atr": None, "basic_upper": None, "basic_lower": None,
+                "final_upper": None, "final_lower": None, "supertrend": None, "trend": None,
+            }
+
+        basic_upper = mid + self.multiplier * atr_val
+        basic_lower = mid - self.multiplier * atr_val
+        prev_upper = self.upper
+        prev_lower = self.lower
+
+        if prev_upper is None or basic_upper < prev_upper or prev_close > prev_upper:
+            final_upper = basic_upper
+        else:
+            final_upper = prev_upper
+
+        if prev_lower is None or basic_lower > prev_lower or prev_close < prev_lower:
+            final_lower = basic_lower
+        else:
+            final_lower = prev_lower
+
+        prev_trend = self.trend
+        if prev_trend is None:
+            trend = "up"
+        elif prev_trend == "up":
+            trend = "up" if close > final_lower else "down"
+        else:
+            trend = "down" if close < final_upper else "up"
+
+        self.upper = final_upper
+        self.lower = final_lower
+        self.trend = trend
+
+        return {
+            "time": time_val, "open": open_price, "high": high, "low": low, "close": close,
+            "atr": atr_val,
+            "basic_upper": basic_upper,
+            "basic_lower": basic_lower,
+            "final_upper": final_upper,
+            "final_lower": final_lower,
+            "supertrend": final_lower if trend == "up" else final_upper,
+            "trend": trend,
+        }
+
+
+def supertrend(period: int = 10, multiplier: float = 3) -> Node:
+    """
+    SuperTrend rows in the calculate_supertrend layout, built on the shared
+    hl2 and ATR nodes
+    """
+    inputs = tuple(source(name) for name in SOURCES[:5]) + (hl2(), atr(period))
+
+    def batch(*series):
+        step = _SupertrendStep(multiplier)
+        return list(map(step, *series))
+
+    return Node(f'supertrend_{period}_{multiplier}', inputs, batch,
+                lambda: _SupertrendStep(multiplier))
+
+
+# ==================== Pipeline ====================
+
+class IndicatorPipeline:
+    """
+    Dependency graph of indicators with shared intermediates
+
+    Nodes are deduplicated by key, so supertrend(10, 3) and atr(10) share
+    one TR and one ATR computation.
+    """
+
+    def __init__(self, *indicators: Node):
+        self.nodes: Dict[str, Node] = {}
+        self.outputs: List[str] = []
+        for node in indicators:
+            self.add(node)
+
+    def add(self, node: Node) -> str:
+        """
+        Add an indicator and its inputs
+
+        Returns:
+            Output key of the indicator
+        """
+        self._register(node)
+        if node.key not in self.outputs:
+            self.outputs.append(node.key)
+        return node.key
+
+    def _register(self, node: Node):
+        # Depth-first: inputs are registered before the node, so dict order is topological
+        if node.key in self.nodes:
+            return
+        for dep in node.inputs:
+            self._register(dep)
+        self.nodes[node.key] = node
+
+    def run(self, data, keys: Optional[List[str]] = None) -> Dict[str, list]:
+        """
+        Batch evaluation over a candle history
+
+        Args:
+            data: List of (time, open, high, low, close, volume) rows or CandleColumns
+            keys: Series to return (default: the added indicators)
+
+        Returns:
+            Dict of key -> series aligned with data
+        """
+        series: Dict[str, list] = {}
+        if hasattr(data, 'close'):
+            for name in SOURCES:
+                series[name] = getattr(data, name)
+        elif data:
+            for name, column in zip(SOURCES, zip(*data)):
+                series[name] = list(column)
+        else:
+            for name in SOURCES:
+                series[name] = []
+
+        for key, node in self.nodes.items():
+            if key in series:
+                continue
+            series[key] = node.batch(*(series[dep.key] for dep in node.inputs))
+
+        return {key: series[key] for key in (keys or self.outputs)}
+
+    def stream(self) -> 'PipelineStream':
+        """Fresh incremental state (e.g. one per symbol) over this graph"""
+        return PipelineStream(self)
+
+
+class PipelineStream:
+    """Incremental evaluation of an IndicatorPipeline, O(1) per candle"""
+
+    def __init__(self, pipeline: IndicatorPipeline):
+        self.pipeline = pipeline
+        self.reset()
+
+    def reset(self):
+        plan = []
+        for key, node in self.pipeline.nodes.items():
+            if key in SOURCES:
+                continue
+            plan.append((key, node.make_step(), tuple(dep.key for dep in node.inputs)))
+        self._plan = plan
+        self.values: Dict[str, object] = {}
+
+    def update(self, candle) -> Dict[str, object]:
+        """
+        Update every node with the next closed candle
+
+        Args:
+            candle: (time, open, high, low, close, volume)
+
+        Returns:
+            Dict of output key -> latest value
+        """
+        values = dict(zip(SOURCES, candle))
+        for key, step, deps in self._plan:
+            values[key] = step(*[values[d] for d in deps])
+        self.values = values
+        return {key: values[key] for key in self.pipeline.outputs}
+
+    def seed(self, data) -> Dict[str, object]:
+        """Warm the state up on history and return the latest values"""
+        latest = {}
+        for candle in data:
+            latest = self.update(candle)
+        return latest
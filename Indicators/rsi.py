@@ -0,0 +1,140 @@
+"""
+Wilder RSI (batch and incremental)
+
+The first average gain/loss is the simple mean of the first `period`
+changes; later averages use Wilder smoothing
+avg = (avg * (period - 1) + x) / period, as in TradingView's ta.rsi.
+Warm-up positions are None.
+"""
+from typing import List, Optional, Sequence
+
+
+def _rsi(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+def rsi_values(values: Sequence[float], period: int = 14) -> List[Optional[float]]:
+    """
+    Wilder RSI of a plain value series
+
+    Args:
+        values: Input series (e.g. closes)
+        period: RSI length
+
+    Returns:
+        List aligned with `values`
+    """
+    n = len(values)
+    if n <= period:
+        return [None] * n
+
+    out: List[Optional[float]] = [None] * period
+    gain_sum = 0.0
+    loss_sum = 0.0
+    for i in range(1, period + 1):
+        change = values[i] - values[i - 1]
+        if change > 0:
+            gain_sum += change
+        else:
+            loss_sum -= change
+
+    avg_gain = gain_sum / period
+    avg_loss = loss_sum / period
+    out.append(_rsi(avg_gain, avg_loss))
+
+    keep = period - 1
+    prev = values[period]
+    for i in range(period + 1, n):
+        x = values[i]
+        change = x - prev
+        prev = x
+        if change > 0:
+            avg_gain = (avg_gain * keep + change) / period
+            avg_loss = (avg_loss * keep) / period
+        else:
+            avg_gain = (avg_gain * keep) / period
+            avg_loss = (avg_loss * keep - change) / period
+        out.append(_rsi(avg_gain, avg_loss))
+    return out
+
+
+def calculate_rsi(data, period: int = 14) -> List[Optional[float]]:
+    """
+    Wilder RSI of candle closes
+
+    Args:
+        data: List of (time, open, high, low, close, volume) rows or CandleColumns
+        period: RSI length
+
+    Returns:
+        List of RSI values aligned with `data`
+    """
+    closes = data.close if hasattr(data, 'close') else [c[4] for c in data]
+    return rsi_values(closes, period)
+
+
+class RSITracker:
+    """
+    Incremental Wilder RSI, O(1) per candle
+
+    Feeding candles one by one through update() yields exactly the values
+    calculate_rsi returns for the same history.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.prev: Optional[float] = None
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+        self.value: Optional[float] = None
+
+    def update_value(self, x: float) -> Optional[float]:
+        """Feed one raw value; returns the RSI or None during warm-up"""
+        prev = self.prev
+        self.prev = x
+        self.count += 1
+        if prev is None:
+            return None
+
+        change = x - prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        period = self.period
+
+        if self.avg_gain is None:
+            self.gain_sum += gain
+            self.loss_sum += loss
+            if self.count == period + 1:
+                self.avg_gain = self.gain_sum / period
+                self.avg_loss = self.loss_sum / period
+                self.value = _rsi(self.avg_gain, self.avg_loss)
+            return self.value
+
+        keep = period - 1
+        self.avg_gain = (self.avg_gain * keep + gain) / period
+        self.avg_loss = (self.avg_loss * keep + loss) / period
+        self.value = _rsi(self.avg_gain, self.avg_loss)
+        return self.value
+
+    def update(self, candle) -> Optional[float]:
+        """
+        Update with the next closed candle
+
+        Args:
+            candle: (time, open, high, low, close, volume)
+        """
+        return self.update_value(candle[4])
+
+    def seed(self, data) -> Optional[float]:
+        """Warm the state up on history and return the latest value"""
+        for candle in data:
+            self.update(candle)
+        return self.value
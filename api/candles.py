@@ -0,0 +1,140 @@
+"""
+Columnar candle buffers for the history endpoint
+"""
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List
+
+
+def _zeros(typecode: str, n: int) -> array:
+    return array(typecode, bytes(8 * n))
+
+
+def parse_candle_rows(result: List[Dict]) -> List[list]:
+    """
+    Decode a /v2/history/candles 'result' list into [time, o, h, l, c, v] rows
+
+    Returns:
+        Rows ordered oldest → newest
+    """
+    rows = []
+    append = rows.append
+    for row in result:
+        append([row['time'], float(row['open']), float(row['high']),
+                float(row['low']), float(row['close']), float(row['volume'])])
+    # The endpoint returns newest first
+    if len(rows) > 1 and rows[0][0] > rows[-1][0]:
+        rows.reverse()
+    return rows
+
+
+def merge_candle_rows(pages: Iterable[List[list]]) -> List[list]:
+    """
+    Merge row pages into one time-ordered list
+
+    Same boundary rule as CandleColumns.concat: rows at or before the last
+    merged time are dropped.
+    """
+    out: List[list] = []
+    for page in sorted((p for p in pages if p), key=lambda p: p[0][0]):
+        if out:
+            last = out[-1][0]
+            start = 0
+            while start < len(page) and page[start][0] <= last:
+                start += 1
+            out.extend(page[start:] if start else page)
+        else:
+            out.extend(page)
+    return out
+
+
+class CandleColumns:
+    """
+    Candles stored as typed columns, ordered oldest → newest
+
+    time is int64 epoch seconds, open/high/low/close/volume are float64.
+    Indexing returns (time, open, high, low, close, volume) tuples, so a
+    CandleColumns can be passed anywhere a list of candle rows is read,
+    e.g. calculate_supertrend(columns).
+    """
+
+    __slots__ = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+    FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, time=None, open=None, high=None, low=None, close=None, volume=None):
+        self.time = time if time is not None else array('q')
+        self.open = open if open is not None else array('d')
+        self.high = high if high is not None else array('d')
+        self.low = low if low is not None else array('d')
+        self.close = close if close is not None else array('d')
+        self.volume = volume if volume is not None else array('d')
+
+    @classmethod
+    def from_result(cls, result: List[Dict]) -> "CandleColumns":
+        """
+        Decode a /v2/history/candles 'result' list into columns
+
+        The endpoint returns newest first; rows are written from the back of
+        preallocated buffers so no reverse pass is needed.
+        """
+        n = len(result)
+        t, o, h, l, c, v = (_zeros('q', n), _zeros('d', n), _zeros('d', n),
+                            _zeros('d', n), _zeros('d', n), _zeros('d', n))
+        i = n
+        for row in result:
+            i -= 1
+            t[i] = row['time']
+            o[i] = float(row['open'])
+            h[i] = float(row['high'])
+            l[i] = float(row['low'])
+            c[i] = float(row['close'])
+            v[i] = float(row['volume'])
+
+        columns = cls(t, o, h, l, c, v)
+        if n > 1 and t[0] > t[-1]:
+            # Page came back oldest first
+            for col in columns.columns():
+                col.reverse()
+        return columns
+
+    @classmethod
+    def concat(cls, pages: Iterable["CandleColumns"]) -> "CandleColumns":
+        """
+        Merge pages into one time-ordered buffer
+
+        Pages may arrive in any order (get_candles_in_batches walks backwards);
+        rows at or before the last merged time are dropped, which removes the
+        overlap at page boundaries.
+        """
+        out = cls()
+        for page in sorted((p for p in pages if len(p)), key=lambda p: p.time[0]):
+            start = bisect_right(page.time, out.time[-1]) if len(out) else 0
+            if start >= len(page):
+                continue
+            for dst, src in zip(out.columns(), page.columns()):
+                dst.extend(src[start:] if start else src)
+        return out
+
+    def columns(self):
+        return (self.time, self.open, self.high, self.low, self.close, self.volume)
+
+    def to_rows(self) -> List[list]:
+        """List of [time, open, high, low, close, volume]"""
+        return list(map(list, zip(*self.columns())))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.itemsize * len(col) for col in self.columns())
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __iter__(self):
+        return zip(*self.columns())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CandleColumns(*(col[index] for col in self.columns()))
+        return (self.time[index], self.open[index], self.high[index],
+                self.low[index], self.close[index], self.volume[index])
@@ -5,18 +5,45 @@ import hmac
 import hashlib
 import time
 import json
+import logging
+import uuid
 import requests
 from typing import Dict, Optional
 from config.config import Config
+from api.request_metrics import RequestMetrics, request_metrics
+from api.rate_limiter import RateLimiter, is_order_endpoint, order_rate_limiter, rate_limiter
+
+try:
+    # Optional: orjson decodes large candle pages several times faster
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Only idempotent reads are retried; orders are never resubmitted automatically
+RETRY_METHODS = ('GET',)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+logger = logging.getLogger(__name__)
 
 
 class DeltaExchangeClient:
     """Base client for Delta Exchange API with authentication"""
     
-    def __init__(self, api_key: str = None, api_secret: str = None):
+    def __init__(self, api_key: str = None, api_secret: str = None, base_url: str = None,
+                 metrics: RequestMetrics = None, max_retries: int = 0,
+                 retry_backoff_sec: float = 0.5, limiter: RateLimiter = None,
+                 order_limiter: RateLimiter = None, session=None):
         self.api_key = api_key or Config.API_KEY
         self.api_secret = api_secret or Config.API_SECRET
-        self.base_url = Config.BASE_URL
+        self.base_url = base_url or Config.BASE_URL
+        self.metrics = metrics or request_metrics
+        # Retries are opt-in: by default every call is made exactly once
+        self.max_retries = max_retries
+        self.retry_backoff_sec = retry_backoff_sec
+        self.limiter = limiter or rate_limiter
+        self.order_limiter = order_limiter or order_rate_limiter
+        # HTTP transport: anything with requests' request() signature
+        self.session = session or requests
         
         if not self.api_key or not self.api_secret:
             raise ValueError("API credentials not found. Set them in .env file")
@@ -30,6 +57,22 @@ class DeltaExchangeClient:
         ).hexdigest()
         return signature
     
+    def _headers(self, method: str, endpoint: str, query_string: str, payload: str,
+                 auth: bool) -> Dict:
+        """Request headers, signed with the current timestamp when auth is set"""
+        if not auth:
+            return {'Content-Type': 'application/json'}
+        timestamp = str(int(time.time()))
+        # Signature format: method + timestamp + path + query_string + payload
+        signature_data = method + timestamp + endpoint + query_string + payload
+        signature = self._generate_signature(method, signature_data, timestamp)
+        return {
+            'api-key': self.api_key,
+            'timestamp': timestamp,
+            'signature': signature,
+            'Content-Type': 'application/json'
+        }
+
     def _request(self, method: str, endpoint: str, params: Dict = None, 
                  data: Dict = None, auth: bool = True) -> Dict:
         """Make HTTP request to Delta Exchange API"""
@@ -42,35 +85,78 @@ class DeltaExchangeClient:
             sorted_params = sorted(params.items())
             query_string = "?" + "&".join([f"{k}={v}" for k, v in sorted_params])
         
-        # Generate headers
-        if auth:
-            timestamp = str(int(time.time()))
-            # Signature format: method + timestamp + path + query_string + payload
-            signature_data = method + timestamp + endpoint + query_string + payload
-            signature = self._generate_signature(method, signature_data, timestamp)
-            
-            headers = {
-                'api-key': self.api_key,
-                'timestamp': timestamp,
-                'signature': signature,
-                'Content-Type': 'application/json'
-            }
-        else:
-            headers = {'Content-Type': 'application/json'}
-        
-        try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                params=params,
-                data=payload if data else None,
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"API Request Error: {e}")
-            if hasattr(e.response, 'text'):
-                print(f"Response: {e.response.text}")
-            raise
+        request_id = uuid.uuid4().hex[:16]
+        retryable = method in RETRY_METHODS
+        limiter = self.order_limiter if is_order_endpoint(endpoint) else self.limiter
+        attempt = 0
+        start = time.perf_counter()
+
+        while True:
+            response = None
+            limiter.acquire()
+            # Signed per attempt: a retry after limiter waits and backoff needs a fresh timestamp
+            headers = self._headers(method, endpoint, query_string, payload, auth)
+            try:
+                response = self.session.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    data=payload if data else None,
+                    timeout=30
+                )
+                if (retryable and response.status_code in RETRY_STATUSES
+                        and attempt < self.max_retries):
+                    attempt += 1
+                    time.sleep(self.retry_backoff_sec * 2 ** (attempt - 1))
+                    continue
+                response.raise_for_status()
+                result = json_loads(response.content)
+                self._record(method, endpoint, response, start, payload, attempt, request_id)
+                return result
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if retryable and attempt < self.max_retries:
+                    attempt += 1
+                    time.sleep(self.retry_backoff_sec * 2 ** (attempt - 1))
+                    continue
+                fields = self._record(method, endpoint, None, start, payload, attempt, request_id)
+                logger.error(f"API Request Error: {e}", extra=fields)
+                raise
+            except requests.exceptions.RequestException as e:
+                fields = self._record(method, endpoint,
+                                      e.response if e.response is not None else response,
+                                      start, payload, attempt, request_id)
+                if hasattr(e.response, 'text'):
+                    fields['response'] = e.response.text[:2000]
+                logger.error(f"API Request Error: {e}", extra=fields)
+                raise
+            except ValueError:
+                # Non-JSON body on a 2xx response
+                self._record(method, endpoint, response, start, payload, attempt, request_id)
+                raise
+
+    def _record(self, method: str, endpoint: str, response, start: float,
+                payload: str, retries: int, request_id: str) -> Dict:
+        """
+        Record one logical request (including its retries) into the metrics
+
+        Returns:
+            Structured log fields for the request
+        """
+        latency = time.perf_counter() - start
+        status = response.status_code if response is not None else 'error'
+        response_bytes = len(response.content) if response is not None else 0
+        self.metrics.record(method, endpoint, status, latency,
+                            request_bytes=len(payload), response_bytes=response_bytes,
+                            retries=retries, request_id=request_id)
+        fields = {
+            'request_id': request_id,
+            'method': method,
+            'endpoint': endpoint,
+            'status': status,
+            'latency_ms': round(latency * 1000, 3),
+            'retries': retries,
+        }
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("api request", extra=fields)
+        return fields
@@ -3,6 +3,9 @@ Market data methods for Delta Exchange
 """
 from typing import Dict, Optional, List
 from api.delta_client import DeltaExchangeClient
+from api.candles import CandleColumns, merge_candle_rows, parse_candle_rows
+from api.orderbook import OrderBook
+from api.tickers import TickerTable
 import time
 
 TIMEFRAME_SECONDS = {
@@ -33,66 +36,80 @@ class MarketData(DeltaExchangeClient):
     def get_ticker(self, symbol: str) -> Dict:
         """Get ticker data for a symbol"""
         return self._request('GET', f'/v2/tickers/{symbol}', auth=False)
+
+    def get_tickers(self, contract_types: Optional[str] = None) -> Dict:
+        """Get tickers of all products in one request (e.g. contract_types='perpetual_futures')"""
+        params = {'contract_types': contract_types} if contract_types else None
+        return self._request('GET', '/v2/tickers', params=params, auth=False)
+
+    def get_ticker_table(self, contract_types: Optional[str] = None) -> TickerTable:
+        """All tickers parsed into a TickerTable"""
+        return TickerTable.from_result(self.get_tickers(contract_types).get('result', []))
     
     def get_orderbook(self, symbol: str, depth: int = 20) -> Dict:
         """Get orderbook for a symbol"""
         params = {'depth': depth}
         return self._request('GET', f'/v2/l2orderbook/{symbol}', params=params, auth=False)
+
+    def get_order_book(self, symbol: str, depth: int = 20) -> OrderBook:
+        """Orderbook snapshot parsed into a local OrderBook"""
+        return OrderBook.from_rest(symbol, self.get_orderbook(symbol, depth).get('result', {}))
     
     def get_trades(self, symbol: str) -> Dict:
         """Get recent trades for a symbol"""
         return self._request('GET', f'/v2/trades/{symbol}', auth=False)
     
-    def get_candles(self, symbol: str, resolution: str = '5m', 
-                   start: Optional[int] = None, end: Optional[int] = None) -> Dict:
+    def get_candle_columns(self, symbol: str, resolution: str = '5m',
+                           start: Optional[int] = None, end: Optional[int] = None) -> CandleColumns:
         """
-        Get historical OHLCV candlestick data
-        
+        Get historical OHLCV candles as typed columns
+
         Args:
             symbol: Trading pair (e.g., 'BTCUSD', 'ETHUSD')
             resolution: Timeframe - '1m', '3m', '5m', '15m', '30m', '1h', '2h', 
                        '4h', '6h', '1d', '7d', '30d', '1w', '2w'
             start: Start timestamp (Unix epoch in seconds)
             end: End timestamp (Unix epoch in seconds)
-        
+
         Returns:
-            Dict with 'result' containing list of [timestamp, open, high, low, close, volume]
+            CandleColumns ordered oldest → newest
         """
+        return CandleColumns.from_result(self._get_history_candles(symbol, resolution, start, end))
 
+    def _get_history_candles(self, symbol: str, resolution: str,
+                             start: Optional[int], end: Optional[int]) -> List[Dict]:
+        """Raw newest-first 'result' list of /v2/history/candles"""
         if not end:
             end = int(time.time())
         if not start:
            start = end - (24*60*60)
 
-
-        print(resolution)
         params = {
             'symbol': symbol,
-            'resolution': resolution
+            'resolution': resolution,
+            'start': start,
+            'end': end,
         }
-        
-        if start:
-            params['start'] = start
-        if end:
-            params['end'] = end
-        
-        response= self._request('GET', '/v2/history/candles', params=params, auth=False)
-
-        candles = []
-        for c in response["result"]:
-            candles.append([
-                c["time"],
-                float(c["open"]),
-                float(c["high"]),
-                float(c["low"]),
-                float(c["close"]),
-                float(c["volume"])
-            ])
 
+        response = self._request('GET', '/v2/history/candles', params=params, auth=False)
+        return response["result"]
+
+    def get_candles(self, symbol: str, resolution: str = '5m', 
+                   start: Optional[int] = None, end: Optional[int] = None) -> List[list]:
+        """
+        Get historical OHLCV candlestick data
+        
+        Args:
+            symbol: Trading pair (e.g., 'BTCUSD', 'ETHUSD')
+            resolution: Timeframe - '1m', '3m', '5m', '15m', '30m', '1h', '2h', 
+                       '4h', '6h', '1d', '7d', '30d', '1w', '2w'
+            start: Start timestamp (Unix epoch in seconds)
+            end: End timestamp (Unix epoch in seconds)
         
-       
-        candles.reverse()
-        return candles
+        Returns:
+            List of [timestamp, open, high, low, close, volume], oldest → newest
+        """
+        return parse_candle_rows(self._get_history_candles(symbol, resolution, start, end))
     
     def get_candles_dataframe(self, symbol: str, resolution: str = '1m',
                              start: Optional[int] = None, end: Optional[int] = None):
@@ -160,30 +177,19 @@ class MarketData(DeltaExchangeClient):
         
         return self._request('GET', '/v2/history/open_interest', params=params, auth=False)
 
-    def get_candles_in_batches(self,symbol: str,resolution: str,start: int,
-        end: int,
-        max_candles_per_request: int = 500,
-        sleep_sec: float = 0.3
-    ) -> List[list]:
+    def _fetch_pages(self, fetch_page, symbol: str, resolution: str,
+                     start: Optional[int], end: Optional[int],
+                     max_candles_per_request: int, sleep_sec: float) -> list:
         """
-        Fetch candles in batches without modifying get_candles()
+        Walk backwards from `end` to `start` one page at a time
 
         Args:
-            symbol: Trading pair
-            resolution: Timeframe (e.g. '5m', '1h')
-            start: Start epoch (seconds)
-            end: End epoch (seconds)
-            max_candles_per_request: Safe Delta batch size
-            sleep_sec: Delay between requests (rate-limit safe)
-
+            fetch_page: get_candles or get_candle_columns
         Returns:
-            List of [time, open, high, low, close, volume]
-            Ordered oldest → newest
+            Pages in fetch order (newest page first)
         """
-
         if not end:
             end = int(time.time())
-            print(end)
         if not start:
            start = end - (45*24*60*60)
 
@@ -191,7 +197,7 @@ class MarketData(DeltaExchangeClient):
             raise ValueError(f"Unsupported resolution: {resolution}")
 
         tf_sec = TIMEFRAME_SECONDS[resolution]
-        all_candles: List[list] = []
+        pages = []
 
         current_end = end
 
@@ -201,27 +207,72 @@ class MarketData(DeltaExchangeClient):
                 current_end - (max_candles_per_request * tf_sec)
             )
 
-            candles = self.get_candles(
+            page = fetch_page(
                 symbol=symbol,
                 resolution=resolution,
                 start=current_start,
                 end=current_end
             )
 
-            if not candles:
+            if not len(page):
                 break
 
-            all_candles.extend(candles)
+            pages.append(page)
 
             # Move backward safely
-            oldest_time = candles[0][0]
-            current_end = oldest_time - tf_sec
+            current_end = page[0][0] - tf_sec
 
             time.sleep(sleep_sec)
 
-        # Deduplicate by timestamp and sort
-        unique = {c[0]: c for c in all_candles}
-        candles = list(unique.values())
-        candles.sort(key=lambda x: x[0])
+        return pages
+
+    def get_candle_columns_in_batches(self, symbol: str, resolution: str,
+                                      start: Optional[int] = None, end: Optional[int] = None,
+                                      max_candles_per_request: int = 500,
+                                      sleep_sec: float = 0.3) -> CandleColumns:
+        """
+        Fetch candles in batches straight into typed columns
+
+        Each page is decoded into its own buffers and the pages are merged
+        once at the end, without per-candle lists, a dedupe dict or a sort.
+
+        Args:
+            symbol: Trading pair
+            resolution: Timeframe (e.g. '5m', '1h')
+            start: Start epoch (seconds)
+            end: End epoch (seconds)
+            max_candles_per_request: Safe Delta batch size
+            sleep_sec: Delay between requests (rate-limit safe)
+
+        Returns:
+            CandleColumns ordered oldest → newest
+        """
+        return CandleColumns.concat(self._fetch_pages(
+            self.get_candle_columns, symbol, resolution, start, end,
+            max_candles_per_request, sleep_sec))
+
+    def get_candles_in_batches(self,symbol: str,resolution: str,start: int,
+        end: int,
+        max_candles_per_request: int = 500,
+        sleep_sec: float = 0.3
+    ) -> List[list]:
+        """
+        Fetch candles in batches without modifying get_candles()
+
+        Args:
+            symbol: Trading pair
+            resolution: Timeframe (e.g. '5m', '1h')
+            start: Start epoch (seconds)
+            end: End epoch (seconds)
+            max_candles_per_request: Safe Delta batch size
+            sleep_sec: Delay between requests (rate-limit safe)
 
-        return candles
+        Returns:
+            List of [time, open, high, low, close, volume]
+            Ordered oldest → newest
+        """
+        # Pages are contiguous, so merging at the boundaries replaces the
+        # dedupe dict and sort
+        return merge_candle_rows(self._fetch_pages(
+            self.get_candles, symbol, resolution, start, end,
+            max_candles_per_request, sleep_sec))
@@ -80,9 +80,72 @@ class OrderManagement(DeltaExchangeClient):
         
         if order_type == 'limit_order' and limit_price:
             data['limit_price'] = str(limit_price)
-        
+
         return self._request('POST', '/v2/orders', data=data)
-    
+
+    def place_bracket_order(self, product_id: int, size: float, side: str,
+                            stop_loss_price: Optional[float] = None,
+                            take_profit_price: Optional[float] = None,
+                            order_type: str = 'market_order',
+                            limit_price: Optional[float] = None) -> Dict:
+        """
+        Place an entry order with its stop loss / take profit attached
+
+        The exchange creates the reduce-only exit legs when the entry fills,
+        so entry and protection go out in one request.
+
+        Args:
+            product_id: Product ID to trade
+            size: Order size in contracts
+            side: 'buy' or 'sell'
+            stop_loss_price: Bracket stop loss trigger price
+            take_profit_price: Bracket take profit trigger price
+            order_type: 'market_order' or 'limit_order'
+            limit_price: Required if order_type is 'limit_order'
+        """
+        data = {
+            'product_id': product_id,
+            'size': size,
+            'side': side,
+            'order_type': order_type
+        }
+
+        if order_type == 'limit_order' and limit_price:
+            data['limit_price'] = str(limit_price)
+        if stop_loss_price is not None:
+            data['bracket_stop_loss_price'] = str(stop_loss_price)
+        if take_profit_price is not None:
+            data['bracket_take_profit_price'] = str(take_profit_price)
+        if stop_loss_price is not None or take_profit_price is not None:
+            data['bracket_stop_trigger_method'] = 'last_traded_price'
+
+        return self._request('POST', '/v2/orders', data=data)
+
+    def place_position_bracket(self, product_id: int,
+                               stop_loss_price: Optional[float] = None,
+                               take_profit_price: Optional[float] = None) -> Dict:
+        """
+        Attach stop loss / take profit to the open position
+
+        Args:
+            product_id: Product ID of the position
+            stop_loss_price: Stop loss trigger price
+            take_profit_price: Take profit trigger price
+        """
+        data = {
+            'product_id': product_id,
+            'bracket_stop_trigger_method': 'last_traded_price'
+        }
+
+        if stop_loss_price is not None:
+            data['stop_loss_order'] = {'order_type': 'market_order',
+                                       'stop_price': str(stop_loss_price)}
+        if take_profit_price is not None:
+            data['take_profit_order'] = {'order_type': 'market_order',
+                                         'stop_price': str(take_profit_price)}
+
+        return self._request('POST', '/v2/orders/bracket', data=data)
+
     def cancel_order(self, order_id: int, product_id: int) -> Dict:
         """Cancel an open order"""
         data = {
@@ -0,0 +1,415 @@
+"""
+Local L2 order book replica
+
+A book is seeded from a snapshot (the WebSocket `l2_updates` snapshot or a
+REST /v2/l2orderbook call) and kept current by incremental level updates.
+Each side keeps its price keys sorted plus a price -> size dict, so best
+bid/ask is O(1) and depth / VWAP queries walk only the levels needed. With
+sortedcontainers installed the keys live in a SortedList and adding or
+removing a level is O(log n); otherwise they are a plain list kept sorted
+with bisect, where the search is O(log n) but the insert/delete shifts the
+list, O(n) in the number of levels. Size changes at an existing level are
+O(1) either way.
+
+OrderBookFeed maintains a book from the Delta WebSocket when
+websocket-client is installed and falls back to polling REST snapshots
+otherwise.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import websocket  # websocket-client
+except ImportError:
+    websocket = None
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:
+    SortedList = None
+
+
+class BookSide:
+    """
+    One side of the book, best level first
+
+    Args:
+        descending: True for bids (highest price is best)
+    """
+
+    __slots__ = ('descending', '_keys', 'sizes')
+
+    def __init__(self, descending: bool):
+        self.descending = descending
+        # Sort keys: -price for bids, price for asks
+        self._keys = SortedList() if SortedList is not None else []
+        self.sizes: Dict[float, float] = {}
+
+    def _key(self, price: float) -> float:
+        return -price if self.descending else price
+
+    def set(self, price: float, size: float):
+        """Set a level's size; size 0 removes the level"""
+        # Keys are only listed while their size is present, so an unlocked
+        # reader never sees a price in _keys without a size
+        key = self._key(price)
+        keys = self._keys
+        if size > 0:
+            new = price not in self.sizes
+            self.sizes[price] = size
+            if new:
+                if SortedList is not None:
+                    keys.add(key)
+                else:
+                    keys.insert(bisect_left(keys, key), key)
+        elif price in self.sizes:
+            if SortedList is not None:
+                keys.remove(key)
+            else:
+                del keys[bisect_left(keys, key)]
+            del self.sizes[price]
+
+    def clear(self):
+        self._keys.clear()
+        self.sizes.clear()
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        """(price, size) of the best level"""
+        try:
+            price = self._key(self._keys[0])
+        except IndexError:
+            return None
+        return price, self.sizes.get(price, 0.0)
+
+    def levels(self, n: Optional[int] = None) -> List[Tuple[float, float]]:
+        """Top n levels as (price, size)"""
+        keys = self._keys if n is None else self._keys[:n]
+        sizes = self.sizes
+        if self.descending:
+            return [(-k, sizes.get(-k, 0.0)) for k in keys]
+        return [(k, sizes.get(k, 0.0)) for k in keys]
+
+    def depth_at(self, price: float) -> float:
+        """Size resting at exactly this price"""
+        return self.sizes.get(price, 0.0)
+
+    def depth_through(self, price: float) -> float:
+        """Total size at prices equal to or better than `price`"""
+        key = self._key(price)
+        keys = self._keys
+        end = keys.bisect_right(key) if SortedList is not None else bisect_right(keys, key)
+        sizes = self.sizes
+        sign = -1 if self.descending else 1
+        return sum(sizes.get(sign * key, 0.0) for key in self._keys[:end])
+
+    def vwap(self, size: float) -> Tuple[Optional[float], float]:
+        """
+        Average price of taking `size` from this side
+
+        Returns:
+            (vwap, filled); filled < size when the book is too thin
+        """
+        remaining = size
+        cost = 0.0
+        sizes = self.sizes
+        sign = -1 if self.descending else 1
+        for key in self._keys:
+            price = sign * key
+            take = min(remaining, sizes.get(price, 0.0))
+            cost += take * price
+            remaining -= take
+            if remaining <= 0:
+                break
+        filled = size - max(remaining, 0.0)
+        return (cost / filled if filled else None), filled
+
+    def copy(self) -> "BookSide":
+        side = BookSide(self.descending)
+        side._keys = self._keys.copy()
+        side.sizes = dict(self.sizes)
+        return side
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def _levels(rows: Iterable) -> Iterable[Tuple[float, float]]:
+    """[price, size] pairs or {'price', 'size'} dicts → float tuples"""
+    for row in rows:
+        if isinstance(row, dict):
+            yield float(row['price']), float(row['size'])
+        else:
+            yield float(row[0]), float(row[1])
+
+
+class OrderBook:
+    """L2 book of one symbol"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.sequence: Optional[int] = None
+        self.timestamp: Optional[int] = None
+        self.updated_at: Optional[float] = None
+
+    @classmethod
+    def from_rest(cls, symbol: str, result: Dict) -> "OrderBook":
+        """Book from a /v2/l2orderbook 'result' ('buy' / 'sell' level lists)"""
+        book = cls(symbol)
+        book.apply_snapshot(result.get('buy', []), result.get('sell', []),
+                            timestamp=result.get('last_updated_at'))
+        return book
+
+    def copy(self) -> "OrderBook":
+        """Independent copy of the book"""
+        book = OrderBook(self.symbol)
+        book.bids = self.bids.copy()
+        book.asks = self.asks.copy()
+        book.sequence = self.sequence
+        book.timestamp = self.timestamp
+        book.updated_at = self.updated_at
+        return book
+
+    # ==================== Updates ====================
+
+    def apply_snapshot(self, bids: Iterable, asks: Iterable, sequence: Optional[int] = None,
+                       timestamp: Optional[int] = None):
+        """Replace the whole book"""
+        self.bids.clear()
+        self.asks.clear()
+        for price, size in _levels(bids):
+            self.bids.set(price, size)
+        for price, size in _levels(asks):
+            self.asks.set(price, size)
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.updated_at = time.monotonic()
+
+    def apply_update(self, bids: Iterable, asks: Iterable, sequence: Optional[int] = None,
+                     timestamp: Optional[int] = None) -> bool:
+        """
+        Apply incremental level changes (size 0 deletes a level)
+
+        Returns:
+            False if the sequence number shows a gap; the book then needs a
+            fresh snapshot and the update is not applied
+        """
+        if sequence is not None and self.sequence is not None and sequence != self.sequence + 1:
+            return False
+        for price, size in _levels(bids):
+            self.bids.set(price, size)
+        for price, size in _levels(asks):
+            self.asks.set(price, size)
+        if sequence is not None:
+            self.sequence = sequence
+        self.timestamp = timestamp
+        self.updated_at = time.monotonic()
+        return True
+
+    # ==================== Queries ====================
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        best = self.bids.best()
+        return best[0] if best else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        best = self.asks.best()
+        return best[0] if best else None
+
+    @property
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid, self.best_ask
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    @property
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid, self.best_ask
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def depth_at(self, price: float) -> float:
+        """Size resting at a price on either side"""
+        return self.bids.depth_at(price) or self.asks.depth_at(price)
+
+    def vwap(self, side: str, size: float) -> Tuple[Optional[float], float]:
+        """
+        Expected average fill of a market order
+
+        Args:
+            side: 'buy' (walks the asks) or 'sell' (walks the bids)
+            size: Order size in contracts
+
+        Returns:
+            (vwap, filled)
+        """
+        return (self.asks if side == 'buy' else self.bids).vwap(size)
+
+    def slippage(self, side: str, size: float) -> Optional[float]:
+        """Fractional cost of a market order against the mid (positive = worse)"""
+        price, filled = self.vwap(side, size)
+        mid = self.mid
+        if price is None or not mid or filled < size:
+            return None
+        return (price - mid) / mid if side == 'buy' else (mid - price) / mid
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last snapshot or update"""
+        return None if self.updated_at is None else time.monotonic() - self.updated_at
+
+
+class OrderBookFeed:
+    """
+    Keep an OrderBook current from the Delta `l2_updates` WebSocket channel
+
+    Without websocket-client, the book is refreshed from REST snapshots every
+    poll_interval seconds instead.
+
+    Args:
+        symbol: Trading pair
+        client: DeltaAPI used for REST snapshots (fallback and resync)
+        url: WebSocket endpoint
+        poll_interval: REST polling period for the fallback
+    """
+
+    def __init__(self, symbol: str, client=None, url: Optional[str] = None,
+                 poll_interval: float = 1.0, depth: int = 50):
+        self.symbol = symbol
+        self.client = client
+        self.url = url or Config.WS_URL
+        self.poll_interval = poll_interval
+        self.depth = depth
+        self.book = OrderBook(symbol)
+        self.resyncs = 0
+
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._ws = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ==================== Messages ====================
+
+    def handle_message(self, message) -> bool:
+        """
+        Apply one l2_updates message (dict or JSON text)
+
+        Returns:
+            False when a sequence gap forced a resubscribe
+        """
+        msg = json.loads(message) if isinstance(message, (str, bytes)) else message
+        if msg.get('type') != 'l2_updates' or msg.get('symbol') != self.symbol:
+            return True
+
+        with self._lock:
+            if msg.get('action') == 'snapshot':
+                self.book.apply_snapshot(msg.get('bids', []), msg.get('asks', []),
+                                         msg.get('sequence_no'), msg.get('timestamp'))
+                self._ready.set()
+                return True
+            if not self._ready.is_set():
+                return True
+            ok = self.book.apply_update(msg.get('bids', []), msg.get('asks', []),
+                                        msg.get('sequence_no'), msg.get('timestamp'))
+        if not ok:
+            self.resyncs += 1
+            logger.warning(f"⚠ {self.symbol} book sequence gap; resubscribing")
+            self._ready.clear()
+            # Drop the existing subscription first so the server sends a fresh snapshot
+            self._subscribe('unsubscribe')
+            self._subscribe()
+        return ok
+
+    def _subscribe(self, kind: str = 'subscribe'):
+        if self._ws is None:
+            return
+        payload = {'type': kind,
+                   'payload': {'channels': [{'name': 'l2_updates', 'symbols': [self.symbol]}]}}
+        self._ws.send(json.dumps(payload))
+
+    # ==================== Transport ====================
+
+    def start(self) -> "OrderBookFeed":
+        """Start the background feed thread"""
+        target = self._run_ws if websocket is not None else self._run_poll
+        self._thread = threading.Thread(target=target, name=f'book-{self.symbol}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._ws is not None:
+            self._ws.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # ==================== Reads ====================
+    # The book is mutated on the feed thread; readers on other threads go
+    # through these so they never see a half-applied update.
+
+    def snapshot(self) -> OrderBook:
+        """Consistent copy of the book"""
+        with self._lock:
+            return self.book.copy()
+
+    def best_bid(self) -> Optional[float]:
+        with self._lock:
+            return self.book.best_bid
+
+    def best_ask(self) -> Optional[float]:
+        with self._lock:
+            return self.book.best_ask
+
+    def mid(self) -> Optional[float]:
+        with self._lock:
+            return self.book.mid
+
+    def vwap(self, side: str, size: float) -> Tuple[Optional[float], float]:
+        with self._lock:
+            return self.book.vwap(side, size)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first snapshot has been applied"""
+        return self._ready.wait(timeout)
+
+    def _run_ws(self):
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=lambda ws: self._subscribe(),
+                on_message=lambda ws, message: self.handle_message(message),
+                on_error=lambda ws, error: logger.error(f"✗ {self.symbol} book feed error: {error}"),
+            )
+            self._ws.run_forever(ping_interval=30)
+            self._ready.clear()
+            if not self._stop.is_set():
+                logger.warning(f"⚠ {self.symbol} book feed disconnected; reconnecting")
+                time.sleep(1)
+
+    def _run_poll(self):
+        if self.client is None:
+            from api import DeltaAPI
+            self.client = DeltaAPI()
+        while not self._stop.is_set():
+            try:
+                result = self.client.get_orderbook(self.symbol, self.depth).get('result', {})
+                with self._lock:
+                    self.book.apply_snapshot(result.get('buy', []), result.get('sell', []),
+                                             timestamp=result.get('last_updated_at'))
+                self._ready.set()
+            except Exception as e:
+                logger.error(f"✗ {self.symbol} book snapshot failed: {e}")
+            self._stop.wait(self.poll_interval)
@@ -73,9 +73,12 @@ class PositionManagement(DeltaExchangeClient):
         
         side = 'sell' if float(pos_data['size']) > 0 else 'buy'
         
-        # Import OrderManagement to place order
+        # Reuse this client when it can place orders (DeltaAPI, simulators)
         from api.order_management import OrderManagement
-        order_client = OrderManagement(self.api_key, self.api_secret)
+        if isinstance(self, OrderManagement):
+            order_client = self
+        else:
+            order_client = OrderManagement(self.api_key, self.api_secret, self.base_url)
         
         return order_client.place_market_order(
             product_id=product_id,
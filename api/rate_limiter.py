@@ -0,0 +1,87 @@
+"""
+Shared token-bucket rate limiter for Delta REST requests
+
+Every DeltaExchangeClient request takes a token from a shared bucket, so
+the trading loop, scanners and background fetchers running in different
+threads stay under one combined request rate instead of each sleeping on
+its own. Order and position requests draw from their own bucket
+(order_rate_limiter), so market-data bursts never queue an order.
+"""
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket
+
+    Args:
+        rate: Tokens added per second (sustained requests/sec)
+        burst: Bucket size (requests allowed back to back)
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_sec = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, cost: float = 1.0, timeout: float = None) -> bool:
+        """
+        Block until `cost` tokens are available
+
+        Args:
+            cost: Request weight
+            timeout: Give up after this many seconds (None waits forever)
+
+        Returns:
+            True once the tokens were taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return True
+                wait = (cost - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+            with self._lock:
+                self.waited_sec += wait
+
+    def try_acquire(self, cost: float = 1.0) -> bool:
+        """Take tokens without blocking"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= cost:
+                self._tokens -= cost
+                return True
+            return False
+
+
+rate_limiter = RateLimiter(
+    rate=float(os.getenv("DELTA_RATE_LIMIT", "10")),
+    burst=int(os.getenv("DELTA_RATE_BURST", "20")),
+)
+
+order_rate_limiter = RateLimiter(
+    rate=float(os.getenv("DELTA_ORDER_RATE_LIMIT", "5")),
+    burst=int(os.getenv("DELTA_ORDER_RATE_BURST", "10")),
+)
+
+# Routed to order_rate_limiter: trading and account state, never market data
+ORDER_ENDPOINTS = ('/v2/orders', '/v2/positions', '/v2/wallet', '/v2/fills')
+
+
+def is_order_endpoint(endpoint: str) -> bool:
+    return endpoint.startswith(ORDER_ENDPOINTS)
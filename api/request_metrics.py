@@ -0,0 +1,193 @@
+"""
+Per-endpoint request metrics for the Delta Exchange client
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Path segments that carry a symbol or id are collapsed so metrics stay per endpoint
+_ROUTE_PATTERNS = [
+    (re.compile(r'^(/v2/(?:tickers|l2orderbook|trades))/[^/]+$'), r'\1/{symbol}'),
+    (re.compile(r'^(/v2/orders)/\d+$'), r'\1/{id}'),
+]
+
+
+def endpoint_route(endpoint: str) -> str:
+    """Normalize an endpoint path, e.g. '/v2/tickers/ETHUSD' → '/v2/tickers/{symbol}'"""
+    for pattern, repl in _ROUTE_PATTERNS:
+        if pattern.match(endpoint):
+            return pattern.sub(repl, endpoint)
+    return endpoint
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class EndpointStats:
+    """Counters and a latency window for one method + endpoint"""
+
+    __slots__ = ('count', 'errors', 'retries', 'latencies', 'latency_sum',
+                 'request_bytes', 'response_bytes', 'status')
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=window)
+        self.latency_sum = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.status = Counter()
+
+    def to_dict(self) -> Dict:
+        ordered = sorted(self.latencies)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'retries': self.retries,
+            'mean_ms': round(self.latency_sum / self.count * 1000, 3) if self.count else None,
+            'p50_ms': _ms(_percentile(ordered, 0.50)),
+            'p95_ms': _ms(_percentile(ordered, 0.95)),
+            'p99_ms': _ms(_percentile(ordered, 0.99)),
+            'max_ms': _ms(ordered[-1] if ordered else None),
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'avg_response_bytes': round(self.response_bytes / self.count) if self.count else 0,
+            'status': {str(k): v for k, v in self.status.items()},
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+class RequestMetrics:
+    """
+    Thread-safe request metrics shared by all client instances
+
+    Latency percentiles are computed over the last `window` calls per
+    endpoint; calls slower than `slow_threshold_sec` are kept in a
+    bounded slow-call log with their request id.
+    """
+
+    def __init__(self, window: int = 1024, slow_threshold_sec: float = 1.0,
+                 slow_log_size: int = 200):
+        self.window = window
+        self.slow_threshold_sec = slow_threshold_sec
+        self._stats: Dict[tuple, EndpointStats] = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        self._dump_thread = None
+        self._dump_stop = threading.Event()
+
+    def record(self, method: str, endpoint: str, status, latency: float,
+               request_bytes: int = 0, response_bytes: int = 0, retries: int = 0,
+               request_id: Optional[str] = None):
+        """Record one completed (or failed) request"""
+        route = endpoint_route(endpoint)
+        key = (method, route)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats(self.window)
+            stats.count += 1
+            stats.retries += retries
+            stats.latencies.append(latency)
+            stats.latency_sum += latency
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.status[status] += 1
+            if status is None or status == 'error' or (isinstance(status, int) and status >= 400):
+                stats.errors += 1
+
+            if latency >= self.slow_threshold_sec:
+                self._slow.append({
+                    'request_id': request_id,
+                    'time': int(time.time()),
+                    'method': method,
+                    'endpoint': endpoint,
+                    'status': status,
+                    'latency_ms': round(latency * 1000, 3),
+                    'retries': retries,
+                })
+
+    # ==================== Queries ====================
+
+    def endpoint_stats(self, endpoint: Optional[str] = None, method: Optional[str] = None) -> Dict:
+        """
+        Stats per 'METHOD /route', optionally filtered
+
+        Args:
+            endpoint: Raw or normalized endpoint to filter on
+            method: HTTP method to filter on
+        """
+        route = endpoint_route(endpoint) if endpoint else None
+        with self._lock:
+            items = list(self._stats.items())
+            out = {}
+            for (m, r), stats in items:
+                if (route and r != route) or (method and m != method):
+                    continue
+                out[f"{m} {r}"] = stats.to_dict()
+        return out
+
+    def slow_calls(self, limit: Optional[int] = None) -> List[Dict]:
+        """Most recent slow calls, newest last"""
+        with self._lock:
+            calls = list(self._slow)
+        return calls[-limit:] if limit else calls
+
+    def snapshot(self) -> Dict:
+        return {
+            'time': int(time.time()),
+            'endpoints': self.endpoint_stats(),
+            'slow_calls': self.slow_calls(),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+    # ==================== Dumping ====================
+
+    def dump(self, filename: str):
+        """Write the snapshot to a JSON file (atomic replace)"""
+        tmp = f"{filename}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, filename)
+
+    def start_periodic_dump(self, filename: str, interval_sec: float = 60.0):
+        """Dump the snapshot every `interval_sec` from a daemon thread"""
+        if self._dump_thread is not None:
+            return
+        self._dump_stop.clear()
+
+        def loop():
+            while not self._dump_stop.wait(interval_sec):
+                try:
+                    self.dump(filename)
+                except OSError as e:
+                    logger.error(f"Request metrics dump error: {e}")
+
+        self._dump_thread = threading.Thread(target=loop, daemon=True)
+        self._dump_thread.start()
+
+    def stop_periodic_dump(self):
+        self._dump_stop.set()
+        self._dump_thread = None
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,194 @@
+"""
+Higher-timeframe OHLCV bars from a single base resolution
+
+5m, 15m and 1h candles can all be built from one 1m (or 5m) feed instead of
+one REST fetch per timeframe. Buckets are aligned to UTC epoch multiples of
+the target timeframe (weeks start on Monday), the same boundaries the Delta
+history endpoint uses, so resampled bars line up with fetched ones.
+"""
+from array import array
+from typing import List, Optional
+
+from api.candles import CandleColumns
+
+_UNIT_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+# 1970-01-01 was a Thursday; weekly buckets start on Monday 1970-01-05
+_WEEK_OFFSET = 4 * 86400
+
+
+def resolution_seconds(resolution: str) -> int:
+    """
+    Seconds in a resolution string ('1m', '15m', '4h', '1d', '1w')
+
+    Raises:
+        ValueError: Unknown resolution format
+    """
+    try:
+        return int(resolution[:-1]) * _UNIT_SECONDS[resolution[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def bucket_start(t: int, tf_sec: int) -> int:
+    """Open time of the tf_sec bucket containing t"""
+    if tf_sec % 604800 == 0:
+        return t - (t - _WEEK_OFFSET) % tf_sec
+    return t - t % tf_sec
+
+
+def _check(base_sec: int, tf_sec: int):
+    if tf_sec < base_sec or tf_sec % base_sec:
+        raise ValueError(f"Cannot build {tf_sec}s bars from {base_sec}s candles")
+
+
+def resample_candles(data, resolution: str, base_resolution: str,
+                     include_partial: bool = False):
+    """
+    Aggregate base candles into higher-timeframe bars in one pass
+
+    Args:
+        data: List of (time, open, high, low, close, volume) rows or CandleColumns,
+              ordered oldest → newest
+        resolution: Target timeframe (e.g. '15m')
+        base_resolution: Timeframe of `data` (e.g. '1m')
+        include_partial: Keep the last bar even if its bucket has not closed
+
+    A leading bucket whose first base candle is not at the bucket start
+    (history beginning partway through it) is dropped: its open, high, low
+    and volume would only cover part of the bar.
+
+    Returns:
+        Same container type as `data` (rows or CandleColumns)
+    """
+    base_sec = resolution_seconds(base_resolution)
+    tf_sec = resolution_seconds(resolution)
+    _check(base_sec, tf_sec)
+
+    columnar = isinstance(data, CandleColumns)
+    out_t, out_o, out_h, out_l, out_c, out_v = (
+        array('q'), array('d'), array('d'), array('d'), array('d'), array('d'))
+
+    bucket = None
+    leading = True
+    o = h = l = c = v = 0.0
+    last_t = None
+    for t, op, hi, lo, cl, vol in data:
+        b = bucket_start(t, tf_sec)
+        if leading:
+            if t != b:
+                continue
+            leading = False
+        if b != bucket:
+            if bucket is not None:
+                out_t.append(bucket); out_o.append(o); out_h.append(h)
+                out_l.append(l); out_c.append(c); out_v.append(v)
+            bucket = b
+            o, h, l, c, v = op, hi, lo, cl, vol
+        else:
+            if hi > h:
+                h = hi
+            if lo < l:
+                l = lo
+            c = cl
+            v += vol
+        last_t = t
+
+    if bucket is not None and (include_partial or last_t + base_sec >= bucket + tf_sec):
+        out_t.append(bucket); out_o.append(o); out_h.append(h)
+        out_l.append(l); out_c.append(c); out_v.append(v)
+
+    columns = CandleColumns(out_t, out_o, out_h, out_l, out_c, out_v)
+    return columns if columnar else columns.to_rows()
+
+
+class Resampler:
+    """
+    Incremental resampler: feed closed base candles, get closed higher bars
+
+    A bar is emitted as soon as the base candle that completes its bucket
+    arrives, or when the first candle of a later bucket shows up (gaps in
+    the base feed). Candles before the first bucket start are skipped, so a
+    feed that begins partway through a bucket never emits a truncated bar.
+    """
+
+    def __init__(self, resolution: str, base_resolution: str):
+        self.resolution = resolution
+        self.base_sec = resolution_seconds(base_resolution)
+        self.tf_sec = resolution_seconds(resolution)
+        _check(self.base_sec, self.tf_sec)
+        self.reset()
+
+    def reset(self):
+        self.bucket: Optional[int] = None
+        self.bar: Optional[list] = None
+
+    def update(self, candle) -> List[tuple]:
+        """
+        Add one closed base candle
+
+        Args:
+            candle: (time, open, high, low, close, volume)
+
+        Returns:
+            Higher-timeframe bars closed by this candle (usually zero or one)
+        """
+        t, op, hi, lo, cl, vol = candle
+        b = bucket_start(t, self.tf_sec)
+        closed = []
+        if self.bucket is None and t != b:
+            # Joined mid-bucket: wait for the next bucket start
+            return closed
+
+        bar = self.bar
+        if bar is not None and b != self.bucket:
+            closed.append(tuple(bar))
+            bar = None
+        if bar is None:
+            self.bucket = b
+            bar = [b, op, hi, lo, cl, vol]
+        else:
+            if hi > bar[2]:
+                bar[2] = hi
+            if lo < bar[3]:
+                bar[3] = lo
+            bar[4] = cl
+            bar[5] += vol
+
+        if t + self.base_sec >= b + self.tf_sec:
+            closed.append(tuple(bar))
+            bar = None
+        self.bar = bar
+        return closed
+
+    @property
+    def partial(self) -> Optional[tuple]:
+        """The bar still forming, if any"""
+        return tuple(self.bar) if self.bar is not None else None
+
+
+class MultiTimeframeResampler:
+    """
+    One base feed fanned out to several timeframes
+
+    Usage:
+        mtf = MultiTimeframeResampler('1m', ['5m', '15m', '1h'])
+        for candle in closed_1m_candles:
+            for resolution, bar in mtf.update(candle):
+                trackers[resolution].update(bar)
+    """
+
+    def __init__(self, base_resolution: str, resolutions: List[str]):
+        self.base_resolution = base_resolution
+        self.resamplers = [Resampler(r, base_resolution) for r in resolutions]
+
+    def update(self, candle) -> List[tuple]:
+        """
+        Returns:
+            List of (resolution, bar) for every bar closed by this candle
+        """
+        out = []
+        for resampler in self.resamplers:
+            for bar in resampler.update(candle):
+                out.append((resampler.resolution, bar))
+        return out
@@ -0,0 +1,96 @@
+"""
+Compact table of the all-tickers listing (/v2/tickers)
+
+One request returns every product's ticker; the table keeps the numeric
+fields in typed columns indexed by symbol, so pricing hundreds of symbols
+costs one request and a dict lookup per symbol.
+"""
+import time
+from array import array
+from typing import Dict, List, Optional
+
+FIELDS = ('mark_price', 'last_price', 'bid', 'ask', 'volume_24h', 'high_24h',
+          'low_24h', 'open_24h', 'change_24h', 'change_24h_percent')
+
+
+def _f(value) -> float:
+    if value is None or value == '':
+        return 0.0
+    return float(value)
+
+
+class TickerTable:
+    """
+    Ticker snapshot as typed columns
+
+    Rows come out in the DataFetcher.get_live_price layout.
+    """
+
+    __slots__ = ('symbols', 'index', 'columns', 'timestamp', 'fetched_at')
+
+    def __init__(self):
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.columns: Dict[str, array] = {name: array('d') for name in FIELDS}
+        self.timestamp = array('q')
+        self.fetched_at = time.monotonic()
+
+    @classmethod
+    def from_result(cls, result: List[Dict]) -> "TickerTable":
+        """Parse a /v2/tickers 'result' list"""
+        table = cls()
+        cols = table.columns
+        mark, last, bid, ask = cols['mark_price'], cols['last_price'], cols['bid'], cols['ask']
+        volume, high, low, open_ = cols['volume_24h'], cols['high_24h'], cols['low_24h'], cols['open_24h']
+        change, change_pct = cols['change_24h'], cols['change_24h_percent']
+
+        for row in result:
+            symbol = row.get('symbol')
+            if not symbol:
+                continue
+            quotes = row.get('quotes') or {}
+            table.index[symbol] = len(table.symbols)
+            table.symbols.append(symbol)
+            mark.append(_f(row.get('mark_price')))
+            last.append(_f(row.get('close')))
+            bid.append(_f(row.get('bid', quotes.get('best_bid'))))
+            ask.append(_f(row.get('ask', quotes.get('best_ask'))))
+            volume.append(_f(row.get('volume')))
+            high.append(_f(row.get('high')))
+            low.append(_f(row.get('low')))
+            open_.append(_f(row.get('open')))
+            change.append(_f(row.get('price_change_24h')))
+            change_pct.append(_f(row.get('price_change_24h_percent')))
+            table.timestamp.append(int(row.get('timestamp') or 0))
+        return table
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was fetched"""
+        return time.monotonic() - self.fetched_at
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def price(self, symbol: str, field: str = 'mark_price') -> Optional[float]:
+        """One field of one symbol, without building a dict"""
+        i = self.index.get(symbol)
+        return None if i is None else self.columns[field][i]
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Ticker of one symbol in the get_live_price layout"""
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        cols = self.columns
+        row = {'symbol': symbol}
+        for name in FIELDS[:4]:
+            row[name] = cols[name][i]
+        row['spread'] = cols['ask'][i] - cols['bid'][i]
+        for name in FIELDS[4:]:
+            row[name] = cols[name][i]
+        row['timestamp'] = self.timestamp[i]
+        return row
@@ -1,19 +1,45 @@
 import json
 from pathlib import Path
 
-from utils.data_fetcher import DataFetcher
+from backtest.costs import CostModel
+from backtest.metrics import compute_metrics
+from backtest.segments import build_trend_segments, segment_trades
+from Indicators.SuperTrend.kernels import (
+    EXIT_REASONS, as_kernel_array, sl_target_scan, trend_codes)
+
 
-fetcher=DataFetcher()
-    
 class SupertrendBacktest:
     """
     Supertrend trend-flip backtest engine
     """
 
-    def __init__(self, data_file: str = "supertrend_ETHUSD.json"):
+    def __init__(self, data_file: str = "supertrend_ETHUSD.json",
+                 cost_model: CostModel = None):
         self.data_file = data_file
         self.data = []
         self.trades = []
+        self.cost_model = cost_model
+
+    @property
+    def data(self):
+        """Supertrend rows under test"""
+        return self._data
+
+    @data.setter
+    def data(self, rows):
+        self._data = rows
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop the segment and column caches (call after editing data in place)"""
+        self._segments = None
+        self._columns = None
+
+    def _apply_costs(self, trades):
+        """Deduct fees, funding and slippage when a cost model is set"""
+        if self.cost_model is not None:
+            self.cost_model.apply(trades)
+        return trades
 
     def load_data(self):
         """Load Supertrend JSON data"""
@@ -22,6 +48,27 @@ class SupertrendBacktest:
         with open(file_path, "r") as f:
             self.data = json.load(f)
 
+    @property
+    def segments(self):
+        """Trend segment index, built once per dataset"""
+        if self._segments is None:
+            self._segments = build_trend_segments(self.data)
+        return self._segments
+
+    @property
+    def columns(self):
+        """(time, high, low, close, trend codes) of the data, built once"""
+        if self._columns is None:
+            data = self.data
+            self._columns = (
+                [row["time"] for row in data],
+                as_kernel_array([row["high"] for row in data]),
+                as_kernel_array([row["low"] for row in data]),
+                as_kernel_array([row["close"] for row in data]),
+                as_kernel_array(trend_codes(data), 'q'),
+            )
+        return self._columns
+
     def supertrend_signal_flip_bt(self):
         """Run backtest and calculate PnL"""
         if not self.data:
@@ -66,6 +113,21 @@ class SupertrendBacktest:
                 entry_price = nxt["close"]
                 entry_time = nxt["time"]
 
+        self._apply_costs(self.trades)
+
+    def metrics(self, capital: float = 5000, trades=None):
+        """
+        Structured performance report (no printing)
+
+        Args:
+            capital: Notional per trade
+            trades: Trades to evaluate (defaults to self.trades)
+        """
+        trades = self.trades if trades is None else trades
+        start = self.data[0]["time"] if self.data else None
+        end = self.data[-1]["time"] if self.data else None
+        return compute_metrics(trades, capital, start, end)
+
     def summary(self):
         """Print backtest summary"""
         if not self.trades:
@@ -73,16 +135,36 @@ class SupertrendBacktest:
             return
 
         total_pnl = sum(t["pnl"] for t in self.trades)
-        wins = [t for t in self.trades if t["pnl"] > 0]
-        losses = [t for t in self.trades if t["pnl"] <= 0]
+        report = self.metrics()
+
+        # With a cost model the metrics are computed on net returns
+        net = "net_pnl" in self.trades[0]
+        label = " (net)" if net else ""
+
+        def line(name, value):
+            print(f"{name:<20} : {value}")
 
         print("\n📊 BACKTEST SUMMARY")
         print("=" * 40)
-        print(f"Total Trades : {len(self.trades)}")
-        print(f"Winning Trades : {len(wins)}")
-        print(f"Losing Trades  : {len(losses)}")
-        print(f"Win Rate       : {round(len(wins) / len(self.trades) * 100, 2)}%")
-        print(f"Total PnL      : {round(total_pnl, 5)}")
+        line("Total Trades", report['trades'])
+        line("Metrics on", 'net returns (after costs)' if net else 'gross returns')
+        line(f"Winning Trades{label}", report['wins'])
+        line(f"Losing Trades{label}", report['losses'])
+        line(f"Win Rate{label}", f"{report['win_rate']}%")
+        if net:
+            gross_wins = sum(1 for t in self.trades if t["pnl"] > 0)
+            line("Win Rate (gross)", f"{round(gross_wins / len(self.trades) * 100, 2)}%")
+        line("Total PnL (gross)", round(total_pnl, 5))
+
+        if net:
+            total_net = sum(t["net_pnl"] for t in self.trades)
+            line("Total Costs", round(total_pnl - total_net, 5))
+            line("Net PnL", round(total_net, 5))
+
+        line("Max Drawdown", f"{report['max_drawdown_pct']}%")
+        line("Profit Factor", report['profit_factor'])
+        line("Sharpe (trade)", report['sharpe'])
+        line("Exposure", f"{report['exposure_pct']}%")
 
     def get_trades(self):
         """Return trades list"""
@@ -92,183 +174,35 @@ class SupertrendBacktest:
         """
         Extract AFE & MAE per Supertrend trade (LONG + SHORT)
         """
-        supertrend_data=self.data
-        trades = []
+        return segment_trades(self.data, self.segments)
 
-        for i in range(len(supertrend_data) - 1):
-            curr = supertrend_data[i]
-            nxt = supertrend_data[i + 1]
-
-            # ---------- LONG ----------
-            if curr["trend"] == "down" and nxt["trend"] == "up":
-                entry = nxt["close"]
-                entry_time = nxt["time"]
-
-                max_high = entry
-                min_low = entry
-                candles = 0
-
-                j = i + 1
-                while j < len(supertrend_data) and supertrend_data[j]["trend"] == "up":
-                    max_high = max(max_high, supertrend_data[j]["high"])
-                    min_low = min(min_low, supertrend_data[j]["low"])
-                    candles += 1
-                    j += 1
-                
-                exit_price = supertrend_data[j]["close"] if j < len(supertrend_data) else supertrend_data[-1]["close"]
-                exit_time = supertrend_data[j]["time"] if j < len(supertrend_data) else supertrend_data[-1]["time"]
-
-                trades.append({
-                    "side": "long",
-                    "entry_time": entry_time,
-                    "entry": entry,
-                    "afe": round((max_high - entry) / entry * 100, 2),
-                    "mae": round((entry - min_low) / entry * 100, 2),
-                    "exit":exit_price,
-                    "exit_time":exit_time,
-                    "max_high_in_range":max_high,
-                    "min_low_in_range":min_low,
-                    "candles": candles
-                })
-
-            # ---------- SHORT ----------
-            elif curr["trend"] == "up" and nxt["trend"] == "down":
-                entry = nxt["close"]
-                entry_time = nxt["time"]
-
-                min_low = entry
-                max_high = entry
-                candles = 0
-
-                j = i + 1
-                while j < len(supertrend_data) and supertrend_data[j]["trend"] == "down":
-                    min_low = min(min_low, supertrend_data[j]["low"])
-                    max_high = max(max_high, supertrend_data[j]["high"])
-                    candles += 1
-                    j += 1
-
-                exit_price = supertrend_data[j]["close"] if j < len(supertrend_data) else supertrend_data[-1]["close"]
-                exit_time = supertrend_data[j]["time"] if j < len(supertrend_data) else supertrend_data[-1]["time"]
-                trades.append({
-                    "side": "short",
-                    "entry_time": entry_time,
-                    "entry": entry,
-                    "afe": round((entry - min_low) / entry * 100, 2),
-                    "mae": round((max_high - entry) / entry * 100, 2),
-                    "max_high_in_range":max_high,
-                    "exit":exit_price,
-                    "exit_time":exit_time,
-                    "min_low_in_range":min_low,
-                    "candles": candles
-                })
-
-        return trades
 # ---- CLI runner ----
     def backtest_sl_target(self, sl_pct=12, target_pct=3):
-        supertrend_data=self.data
-        trades = []
-
-        position = None
-        entry = None
-        entry_time = None
-        side = None
-
-        for i in range(len(supertrend_data) - 1):
-            curr = supertrend_data[i]
-            nxt = supertrend_data[i + 1]
-
-            # ---------------- ENTRY ----------------
-            if position is None:
-                if curr["trend"] == "down" and nxt["trend"] == "up":
-                    position = "long"
-                elif curr["trend"] == "up" and nxt["trend"] == "down":
-                    position = "short"
-                else:
-                    continue
-
-                entry = nxt["close"]
-                entry_time = nxt["time"]
-                side = position
-                continue
-
-            # ---------------- MANAGE OPEN TRADE ----------------
-            high = curr["high"]
-            low = curr["low"]
-
-            exit_price = None
-            exit_reason = None
-
-            if side == "long":
-                stop = entry * (1 - sl_pct / 100)
-                target = entry * (1 + target_pct / 100)
-
-                if low <= stop:
-                    exit_price = stop
-                    exit_reason = "SL"
-                elif high >= target:
-                    exit_price = target
-                    exit_reason = "TARGET"
-
-            else:  # SHORT
-                stop = entry * (1 + sl_pct / 100)
-                target = entry * (1 - target_pct / 100)
-
-                if high >= stop:
-                    exit_price = stop
-                    exit_reason = "SL"
-                elif low <= target:
-                    exit_price = target
-                    exit_reason = "TARGET"
-
-            # ---------------- EXIT ----------------
-            if exit_price is not None:
-                pnl = (
-                    exit_price - entry
-                    if side == "long"
-                    else entry - exit_price
-                )
-
-                trades.append({
-                    "side": side,
-                    "entry_time": entry_time,
-                    "exit_time": curr["time"],
-                    "entry": round(entry, 5),
-                    "exit": round(exit_price, 5),
-                    "pnl_pct": round(pnl / entry * 100, 2),
-                    "exit_reason": exit_reason
-                })
-
-                position = None
-                entry = None
-                side = None
-
-            # Exit on trend flip (if SL/Target not hit)
-            elif (
-                (side == "long" and curr["trend"] == "up" and nxt["trend"] == "down") or
-                (side == "short" and curr["trend"] == "down" and nxt["trend"] == "up")
-            ):
-                exit_price = nxt["close"]
-                pnl = (
-                    exit_price - entry
-                    if side == "long"
-                    else entry - exit_price
-                )
-
-                trades.append({
-                    "side": side,
-                    "entry_time": entry_time,
-                    "exit_time": nxt["time"],
-                    "entry": round(entry, 5),
-                    "exit": round(exit_price, 5),
-                    "pnl_pct": round(pnl / entry * 100, 2),
-                    "exit_reason": "TREND_FLIP"
-                })
+        """
+        Trend-flip entries with fixed SL/target exits
 
-                position = None
-                entry = None
-                side = None
+        The candle scan runs in sl_target_kernel (numba-compiled when
+        available), so large parameter sweeps reuse the cached columns.
+        """
+        time_col, high, low, close, trend = self.columns
+        trades = []
+        for entry_i, exit_i, exit_price, side_code, reason in sl_target_scan(
+                trend, high, low, close, sl_pct, target_pct):
+            entry = float(close[entry_i])
+            side = "long" if side_code == 1 else "short"
+            pnl = exit_price - entry if side == "long" else entry - exit_price
+            trades.append({
+                "side": side,
+                "entry_time": time_col[entry_i],
+                "exit_time": time_col[exit_i],
+                "entry": round(entry, 5),
+                "exit": round(exit_price, 5),
+                "pnl_pct": round(pnl / entry * 100, 2),
+                "exit_reason": EXIT_REASONS[reason]
+            })
+
+        return self._apply_costs(trades)
 
-        return trades
     def backtest_inverse_supertrend(self, sl_pct=2, target_pct=3):
         assert sl_pct > 0, "sl_pct must be positive"
         assert target_pct > 0, "target_pct must be positive"
@@ -376,39 +310,29 @@ class SupertrendBacktest:
                 entry = None
                 side = None
 
-        return trades
-
-    def returns_supertrend(self):
-        data=self.extract_local_maxima_local_minima_trend_range()
-        data2=self.backtest_sl_target()
-        data3=self.backtest_inverse_supertrend()
-        capital=5000
-        capital2=5000
-        capital3=5000
-        res,res2=0,0
-        total_pnl=0.0
-        for i in data:
-             res =res+capital *( i["afe"] / 100)
-        afe_values = sorted(t["afe"] for t in data)
+        return self._apply_costs(trades)
 
-        for trade in data2:
-            trade_pnl = 5000 * (trade["pnl_pct"] / 100)
-            # print(trade_pnl)
-            # total_pnl += trade_pnl
-        for trade in data3:
-            trade_pnl = 5000 * (trade["pnl_pct"] / 100)
-            print(trade_pnl)
-            total_pnl += trade_pnl
+    def returns_supertrend(self, capital: float = 5000):
+        """
+        Inverse-Supertrend PnL at a fixed notional, with AFE percentiles printed
+        """
+        afe_values = sorted(t["afe"] for t in self.extract_local_maxima_local_minima_trend_range())
+        inverse_report = self.metrics(capital, self.backtest_inverse_supertrend())
 
-        print("Max AFE:", max(afe_values))
-        print("95th percentile AFE:", afe_values[int(len(afe_values)*0.95)])
-        print("Median AFE:", afe_values[len(afe_values)//2])
+        # Nearest-rank percentiles, as printed before compute_metrics existed
+        if afe_values:
+            print("Max AFE:", afe_values[-1])
+            print("95th percentile AFE:", afe_values[int(len(afe_values) * 0.95)])
+            print("Median AFE:", afe_values[len(afe_values) // 2])
 
-        return total_pnl
+        return inverse_report.get("total_pnl", 0.0)
 
 
 
 if __name__ == "__main__":
+    from utils.data_fetcher import DataFetcher
+
+    fetcher = DataFetcher()
     bt = SupertrendBacktest()
     bt.load_data()
     bt.supertrend_signal_flip_bt()
@@ -422,4 +346,14 @@ if __name__ == "__main__":
     data=bt.get_trades()
     print(bt.returns_supertrend())
     # print(data)
-    fetcher.export_to_json(data,"supertrend_backtest.json")
\ No newline at end of file
+    fetcher.export_to_json(data,"supertrend_backtest.json")
+
+    # Keep every run in the analytics store for indexed cross-run comparison
+    from utils.analytics_store import AnalyticsStore
+    with AnalyticsStore("analytics.db") as store:
+        run_ids = [
+            store.save_backtest("signal_flip", data, symbol="ETHUSD", metrics=bt.metrics(trades=data)),
+            store.save_backtest("sl_target", sl_target_data, symbol="ETHUSD"),
+            store.save_backtest("afe_mae", lmlm_data, symbol="ETHUSD"),
+        ]
+        print(store.compare_runs(run_ids))
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Trading cost model for backtests
+Fees, funding payments and slippage applied to completed trades
+"""
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+
+class CostModel:
+    """Pluggable fee / funding / slippage model for backtest trades"""
+
+    def __init__(self, maker_fee: float = 0.0002, taker_fee: float = 0.0005,
+                 slippage_pct: float = 0.0, funding_times: Optional[List[int]] = None,
+                 funding_rates: Optional[List[float]] = None,
+                 maker_exit_reasons=("TARGET",)):
+        """
+        Initialize CostModel
+
+        Args:
+            maker_fee: Maker fee as a fraction of notional (0.0002 = 0.02%)
+            taker_fee: Taker fee as a fraction of notional
+            slippage_pct: Slippage per fill as a fraction of price
+            funding_times: Funding settlement timestamps (epoch seconds, ascending)
+            funding_rates: Funding rate per settlement (fraction, longs pay if positive)
+            maker_exit_reasons: Exit reasons filled as resting limit orders (maker)
+        """
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.slippage_pct = slippage_pct
+        self.maker_exit_reasons = set(maker_exit_reasons)
+        self.set_funding(funding_times or [], funding_rates or [])
+
+    # ==================== Builders ====================
+
+    @classmethod
+    def from_exchange(cls, client, symbol: str, start: Optional[int] = None,
+                      end: Optional[int] = None, depth: int = 20) -> "CostModel":
+        """
+        Build a cost model from live exchange data
+
+        Args:
+            client: DeltaAPI client instance
+            symbol: Trading pair (e.g., 'ETHUSD')
+            start: Funding history start timestamp
+            end: Funding history end timestamp
+            depth: Orderbook depth used for the spread estimate
+        """
+        model = cls()
+        model.set_fees_from_response(client.get_trading_fees())
+        model.set_funding_from_response(
+            client.get_funding_rate_history(symbol, start=start, end=end)
+        )
+        model.set_slippage_from_orderbook(client.get_orderbook(symbol, depth))
+        return model
+
+    def set_fees_from_response(self, response: Dict):
+        """
+        Read maker/taker rates from a profile or product response
+
+        Accepts the `AccountMethods.get_trading_fees` payload as well as a
+        product dict carrying `maker_commission_rate` / `taker_commission_rate`.
+        """
+        result = response.get('result', response) if response else {}
+        if isinstance(result, list):
+            result = result[0] if result else {}
+
+        maker = result.get('maker_commission_rate', result.get('maker_fee'))
+        taker = result.get('taker_commission_rate', result.get('taker_fee'))
+
+        if maker is not None:
+            self.maker_fee = float(maker)
+        if taker is not None:
+            self.taker_fee = float(taker)
+
+    def set_funding(self, times: List[int], rates: List[float]):
+        """Set funding series and rebuild the cumulative lookup"""
+        pairs = sorted(zip(times, rates))
+        self.funding_times = [t for t, _ in pairs]
+        self.funding_cum = [0.0] + list(accumulate(r for _, r in pairs))
+
+    def set_funding_from_response(self, response: Dict):
+        """
+        Load funding history from `MarketData.get_funding_rate_history`
+
+        Rows are candle-like dicts; the funding rate is read from `close`
+        (or `funding_rate`) and is expected in percent, as the exchange reports it.
+        """
+        rows = response.get('result', []) if response else []
+        times = [int(r['time']) for r in rows]
+        rates = [float(r.get('funding_rate', r.get('close', 0))) / 100 for r in rows]
+        self.set_funding(times, rates)
+
+    def set_slippage_from_orderbook(self, snapshot: Dict):
+        """
+        Estimate slippage as the half spread of an L2 orderbook snapshot
+
+        Args:
+            snapshot: `MarketData.get_orderbook` response with `buy` / `sell` levels
+        """
+        book = snapshot.get('result', snapshot) if snapshot else {}
+        bids = book.get('buy', [])
+        asks = book.get('sell', [])
+        if not bids or not asks:
+            return
+
+        best_bid = max(float(b['price']) for b in bids)
+        best_ask = min(float(a['price']) for a in asks)
+        mid = (best_bid + best_ask) / 2
+        if mid > 0:
+            self.slippage_pct = (best_ask - best_bid) / 2 / mid
+
+    # ==================== Cost Calculation ====================
+
+    def funding_between(self, start: int, end: int) -> float:
+        """Sum of funding rates settled in (start, end]"""
+        if not self.funding_times:
+            return 0.0
+        i = bisect_right(self.funding_times, start)
+        j = bisect_right(self.funding_times, end)
+        return self.funding_cum[j] - self.funding_cum[i]
+
+    def apply(self, trades: List[Dict]) -> List[Dict]:
+        """
+        Add cost columns to backtest trades in place
+
+        Works on both trade layouts produced by SupertrendBacktest
+        (`entry_price`/`exit_price`/`pnl` and `entry`/`exit`/`pnl_pct`).
+        Adds `fees`, `funding`, `slippage`, `net_pnl` and `net_pnl_pct`
+        in price units per contract; the gross `pnl` fields are untouched.
+        """
+        if not trades:
+            return trades
+
+        entries = [t.get('entry_price', t.get('entry')) for t in trades]
+        exits = [t.get('exit_price', t.get('exit')) for t in trades]
+        signs = [1 if t['side'] == 'long' else -1 for t in trades]
+        exit_fees = [
+            self.maker_fee if t.get('exit_reason') in self.maker_exit_reasons else self.taker_fee
+            for t in trades
+        ]
+        funding = [
+            self.funding_between(t['entry_time'], t['exit_time']) for t in trades
+        ]
+
+        taker, slip = self.taker_fee, self.slippage_pct
+        for t, entry, exit_price, sign, exit_fee, rate in zip(
+                trades, entries, exits, signs, exit_fees, funding):
+            gross = (exit_price - entry) * sign
+            fees = entry * taker + exit_price * exit_fee
+            slippage = (entry + exit_price) * slip
+            funding_paid = sign * entry * rate
+            net = gross - fees - slippage - funding_paid
+
+            t['fees'] = round(fees, 5)
+            t['funding'] = round(funding_paid, 5)
+            t['slippage'] = round(slippage, 5)
+            t['net_pnl'] = round(net, 5)
+            t['net_pnl_pct'] = round(net / entry * 100, 2)
+
+        return trades
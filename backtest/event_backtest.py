@@ -0,0 +1,223 @@
+"""
+Event-driven backtester
+Replays closed candles through the live SupertrendStrategy and a simulated exchange
+"""
+from typing import Dict, List, Optional
+
+from Bot.strategy import SupertrendStrategy
+from Indicators.SuperTrend.supertrend import SupertrendTracker
+
+
+class SimulatedBroker:
+    """
+    Minimal exchange simulator for one symbol
+
+    Market orders fill after `latency_sec`: immediately at the submit price
+    when latency is zero, otherwise at the open of the first candle that
+    starts after the order arrives. Stop and take-profit orders trigger on
+    the candle high/low and fill at their price (or the open on a gap); when
+    one candle reaches both, the stop is assumed to have been hit first.
+    """
+
+    def __init__(self, latency_sec: float = 0.0, slippage_pct: float = 0.0):
+        """
+        Initialize SimulatedBroker
+
+        Args:
+            latency_sec: Order latency in seconds
+            slippage_pct: Adverse slippage per market fill as a fraction of price
+        """
+        self.latency_sec = latency_sec
+        self.slippage_pct = slippage_pct
+
+        self.side = None          # "long" | "short" | None
+        self.size = 0
+        self.entry = None
+        self.entry_time = None
+        self.stop = None          # (side, price) of the protective stop
+        self.target = None        # (side, price) of the take profit
+
+        self.pending = []         # [(arrival_time, side, size, reduce_only, stop, target)]
+        self.trades = []
+
+    # ==================== Order Entry ====================
+
+    def position(self):
+        """Return (side, size) like get_current_position()"""
+        return self.side, self.size
+
+    def market_order(self, side: str, size: float, price: float, now: int,
+                     reduce_only: bool = False, stop_price: Optional[float] = None,
+                     take_profit: Optional[float] = None):
+        """
+        Submit a market order at `now`; fills immediately if latency is zero
+
+        Args:
+            stop_price: Protective stop attached to the position this order opens
+            take_profit: Take profit attached to the position this order opens
+        """
+        if self.latency_sec <= 0:
+            self._fill(side, size, price, now, reduce_only, stop_price, take_profit)
+        else:
+            self.pending.append((now + self.latency_sec, side, size, reduce_only, stop_price,
+                                 take_profit))
+
+    # ==================== Matching ====================
+
+    def on_candle(self, candle):
+        """
+        Process a new candle: deliver pending orders, then check the stop and target
+
+        Args:
+            candle: (time, open, high, low, close, volume)
+        """
+        time_val, open_price, high, low = candle[0], candle[1], candle[2], candle[3]
+
+        if self.pending:
+            ready = [o for o in self.pending if o[0] <= time_val]
+            if ready:
+                self.pending = [o for o in self.pending if o[0] > time_val]
+                for _, side, size, reduce_only, stop_price, take_profit in ready:
+                    self._fill(side, size, open_price, time_val, reduce_only, stop_price,
+                               take_profit)
+
+        if self.stop is not None and self.side is not None:
+            stop_side, stop_price = self.stop
+            if stop_side == "sell" and low <= stop_price:
+                self._close(min(stop_price, open_price), time_val, "SL")
+            elif stop_side == "buy" and high >= stop_price:
+                self._close(max(stop_price, open_price), time_val, "SL")
+
+        if self.target is not None and self.side is not None:
+            target_side, target_price = self.target
+            if target_side == "sell" and high >= target_price:
+                self._close(max(target_price, open_price), time_val, "TARGET")
+            elif target_side == "buy" and low <= target_price:
+                self._close(min(target_price, open_price), time_val, "TARGET")
+
+    def _fill(self, side, size, price, now, reduce_only, stop_price, take_profit=None):
+        """Apply a market fill with slippage"""
+        slip = self.slippage_pct
+        price = price * (1 + slip) if side == "buy" else price * (1 - slip)
+
+        if self.side is not None:
+            closing = (self.side == "long" and side == "sell") or \
+                      (self.side == "short" and side == "buy")
+            if closing:
+                self._close(price, now, "TREND_FLIP")
+                return
+        if reduce_only:
+            return
+
+        self.side = "long" if side == "buy" else "short"
+        self.size = size
+        self.entry = price
+        self.entry_time = now
+        exit_side = "sell" if side == "buy" else "buy"
+        if stop_price is not None:
+            self.stop = (exit_side, stop_price)
+        if take_profit is not None:
+            self.target = (exit_side, take_profit)
+
+    def _close(self, price, now, reason):
+        """Close the position and record the trade"""
+        pnl = price - self.entry if self.side == "long" else self.entry - price
+        self.trades.append({
+            "side": self.side,
+            "entry_time": self.entry_time,
+            "exit_time": now,
+            "entry": round(self.entry, 5),
+            "exit": round(price, 5),
+            "size": self.size,
+            "pnl_pct": round(pnl / self.entry * 100, 2),
+            "exit_reason": reason
+        })
+        self.side = None
+        self.size = 0
+        self.entry = None
+        self.entry_time = None
+        self.stop = None
+        self.target = None
+
+
+class EventBacktester:
+    """
+    Candle-by-candle replay of the live Supertrend cycle
+
+    Each closed candle updates an incremental SuperTrend, asks the shared
+    SupertrendStrategy for a decision against the simulated position and
+    executes it the way cloud_main_donotchange.main() does.
+    """
+
+    def __init__(self, strategy: Optional[SupertrendStrategy] = None,
+                 period: int = 10, multiplier: float = 3, size: float = 5,
+                 latency_sec: float = 0.0, slippage_pct: float = 0.0):
+        """
+        Initialize EventBacktester
+
+        Args:
+            strategy: Strategy instance (default SupertrendStrategy())
+            period: ATR period
+            multiplier: ATR multiplier
+            size: Order size in contracts
+            latency_sec: Simulated order latency in seconds
+            slippage_pct: Adverse slippage per market fill
+        """
+        self.strategy = strategy or SupertrendStrategy()
+        self.period = period
+        self.multiplier = multiplier
+        self.size = size
+        self.latency_sec = latency_sec
+        self.slippage_pct = slippage_pct
+        self.broker = None
+
+    def run(self, candles: List[list]) -> List[Dict]:
+        """
+        Replay candles oldest → newest
+
+        Args:
+            candles: List of [time, open, high, low, close, volume]
+
+        Returns:
+            Trades in the backtest_sl_target layout
+        """
+        broker = SimulatedBroker(self.latency_sec, self.slippage_pct)
+        tracker = SupertrendTracker(self.period, self.multiplier)
+        decide = self.strategy.decide
+        size = self.size
+        self.broker = broker
+
+        prev = None
+        for candle in candles:
+            broker.on_candle(candle)
+            curr = tracker.update(candle)
+
+            if prev is None:
+                prev = curr
+                continue
+
+            side, current_size = broker.side, broker.size
+            decision = decide(prev, curr, side)
+            prev = curr
+
+            action = decision['action']
+            if action == 'hold':
+                continue
+
+            now = curr["time"]
+            price = decision['price']
+
+            if action == 'exit':
+                broker.market_order("sell" if side == "long" else "buy",
+                                    current_size, price, now, reduce_only=True)
+                continue
+
+            if decision['close_first']:
+                broker.market_order("sell" if side == "long" else "buy",
+                                    current_size, price, now, reduce_only=True)
+
+            broker.market_order("buy" if decision['side'] == "long" else "sell",
+                                size, price, now, stop_price=decision['stop_loss'],
+                                take_profit=decision['take_profit'])
+
+        return broker.trades
@@ -0,0 +1,169 @@
+"""
+Performance metrics for backtest results
+Computes a structured report from a list of trades without printing
+"""
+import math
+from typing import Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """
+    Linear-interpolated percentile of an already sorted list
+
+    Args:
+        sorted_values: Ascending values
+        q: Percentile in [0, 100]
+    """
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def distribution(values: List[float]) -> Dict:
+    """Summary distribution (min, median, p75, p90, p95, max, mean)"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'min': ordered[0],
+        'median': percentile(ordered, 50),
+        'p75': percentile(ordered, 75),
+        'p90': percentile(ordered, 90),
+        'p95': percentile(ordered, 95),
+        'max': ordered[-1],
+        'mean': sum(ordered) / len(ordered),
+    }
+
+
+def trade_returns_pct(trades: List[Dict]) -> List[float]:
+    """
+    Per-trade return in percent
+
+    Prefers net-of-cost returns when a CostModel has been applied, then
+    `pnl_pct`, then `pnl` relative to the entry price, then the raw
+    entry/exit move for the AFE/MAE trade layout.
+    """
+    returns = []
+    for t in trades:
+        if 'net_pnl_pct' in t:
+            returns.append(t['net_pnl_pct'])
+        elif 'pnl_pct' in t:
+            returns.append(t['pnl_pct'])
+        else:
+            entry = t.get('entry_price', t.get('entry'))
+            if 'pnl' in t:
+                pnl = t['pnl']
+            else:
+                sign = 1 if t['side'] == 'long' else -1
+                pnl = (t.get('exit_price', t.get('exit')) - entry) * sign
+            returns.append(pnl / entry * 100)
+    return returns
+
+
+def _side_stats(returns: List[float], capital: float) -> Dict:
+    """Win rate and PnL for a subset of trade returns"""
+    if not returns:
+        return {'trades': 0, 'win_rate': 0.0, 'total_pnl': 0.0, 'avg_return_pct': 0.0}
+    wins = sum(1 for r in returns if r > 0)
+    return {
+        'trades': len(returns),
+        'win_rate': round(wins / len(returns) * 100, 2),
+        'total_pnl': round(sum(capital * r / 100 for r in returns), 2),
+        'avg_return_pct': round(sum(returns) / len(returns), 4),
+    }
+
+
+def compute_metrics(trades: List[Dict], capital: float = 5000,
+                    start_time: Optional[int] = None, end_time: Optional[int] = None,
+                    periods_per_year: Optional[float] = None) -> Dict:
+    """
+    Build a performance report for backtest trades
+
+    Each trade is sized at a fixed `capital` notional, as in
+    `SupertrendBacktest.returns_supertrend`.
+
+    Args:
+        trades: Trade dicts from any SupertrendBacktest method
+        capital: Notional per trade
+        start_time: Backtest start (defaults to first entry) for exposure
+        end_time: Backtest end (defaults to last exit) for exposure
+        periods_per_year: Trades per year used to annualize Sharpe/Sortino;
+                          per-trade ratios are reported when omitted
+
+    Returns:
+        Dict report with equity curve, drawdown, ratios, exposure,
+        MAE/MFE distributions and per-side stats
+    """
+    if not trades:
+        return {'trades': 0}
+
+    returns = trade_returns_pct(trades)
+    pnls = [capital * r / 100 for r in returns]
+
+    # Equity curve and drawdown
+    equity = []
+    balance = capital
+    peak = capital
+    max_dd = 0.0
+    max_dd_pct = 0.0
+    for pnl in pnls:
+        balance += pnl
+        equity.append(round(balance, 2))
+        peak = max(peak, balance)
+        dd = peak - balance
+        if dd > max_dd:
+            max_dd = dd
+            max_dd_pct = dd / peak * 100 if peak else 0.0
+
+    # Ratios
+    n = len(returns)
+    mean = sum(returns) / n
+    variance = sum((r - mean) ** 2 for r in returns) / (n - 1) if n > 1 else 0.0
+    downside = sum(min(r, 0.0) ** 2 for r in returns) / n
+    scale = math.sqrt(periods_per_year) if periods_per_year else 1.0
+    sharpe = mean / math.sqrt(variance) * scale if variance > 0 else None
+    sortino = mean / math.sqrt(downside) * scale if downside > 0 else None
+
+    gross_profit = sum(p for p in pnls if p > 0)
+    gross_loss = -sum(p for p in pnls if p < 0)
+    profit_factor = gross_profit / gross_loss if gross_loss > 0 else None
+
+    # Exposure: share of the backtest window spent in a position
+    start = start_time if start_time is not None else min(t['entry_time'] for t in trades)
+    end = end_time if end_time is not None else max(t['exit_time'] for t in trades)
+    in_market = sum(t['exit_time'] - t['entry_time'] for t in trades)
+    exposure = in_market / (end - start) * 100 if end > start else 0.0
+
+    wins = sum(1 for r in returns if r > 0)
+    sides = [t['side'] for t in trades]
+
+    report = {
+        'trades': n,
+        'wins': wins,
+        'losses': n - wins,
+        'win_rate': round(wins / n * 100, 2),
+        'total_pnl': round(sum(pnls), 2),
+        'total_return_pct': round(sum(pnls) / capital * 100, 2),
+        'avg_return_pct': round(mean, 4),
+        'equity_curve': equity,
+        'max_drawdown': round(max_dd, 2),
+        'max_drawdown_pct': round(max_dd_pct, 2),
+        'sharpe': round(sharpe, 4) if sharpe is not None else None,
+        'sortino': round(sortino, 4) if sortino is not None else None,
+        'profit_factor': round(profit_factor, 4) if profit_factor is not None else None,
+        'exposure_pct': round(exposure, 2),
+        'returns': distribution(returns),
+        'long': _side_stats([r for r, s in zip(returns, sides) if s == 'long'], capital),
+        'short': _side_stats([r for r, s in zip(returns, sides) if s == 'short'], capital),
+    }
+
+    # MAE/MFE distributions when the trades carry excursion data
+    if 'afe' in trades[0]:
+        report['mfe'] = distribution([t['afe'] for t in trades])
+        report['mae'] = distribution([t['mae'] for t in trades])
+
+    return report
@@ -0,0 +1,108 @@
+"""
+Trend segment index for Supertrend data
+One pass over the trend column; per-segment stats are derived from it
+"""
+from typing import Dict, List
+
+
+def build_trend_segments(supertrend_data: List[Dict]) -> Dict[str, List]:
+    """
+    Index every Supertrend trend run that starts with a flip
+
+    A segment starts on the candle where the trend flips (down → up or
+    up → down) and ends on the last candle before the next flip.
+    The warm-up run that starts from `trend=None` is not a flip and is skipped.
+
+    Args:
+        supertrend_data: Output of calculate_supertrend
+
+    Returns:
+        Columnar dict with equal-length lists:
+        start, end (inclusive candle indices), side ('long' / 'short'),
+        max_high, min_low (running extremes seeded with the entry close)
+    """
+    segments = {'start': [], 'end': [], 'side': [], 'max_high': [], 'min_low': []}
+    n = len(supertrend_data)
+
+    start = None
+    prev_trend = None
+    max_high = min_low = None
+
+    for i in range(n):
+        candle = supertrend_data[i]
+        trend = candle["trend"]
+
+        if trend != prev_trend:
+            # Close the running segment
+            if start is not None:
+                segments['end'].append(i - 1)
+                segments['max_high'].append(max_high)
+                segments['min_low'].append(min_low)
+                start = None
+
+            # Open a new one only on a real flip
+            if prev_trend is not None and trend is not None:
+                start = i
+                max_high = min_low = candle["close"]
+                segments['start'].append(i)
+                segments['side'].append("long" if trend == "up" else "short")
+
+            prev_trend = trend
+
+        if start is not None:
+            if candle["high"] > max_high:
+                max_high = candle["high"]
+            if candle["low"] < min_low:
+                min_low = candle["low"]
+
+    if start is not None:
+        segments['end'].append(n - 1)
+        segments['max_high'].append(max_high)
+        segments['min_low'].append(min_low)
+
+    return segments
+
+
+def segment_trades(supertrend_data: List[Dict], segments: Dict[str, List]) -> List[Dict]:
+    """
+    AFE / MAE trade records derived from a trend segment index
+
+    Args:
+        supertrend_data: Supertrend data the index was built from
+        segments: Output of build_trend_segments
+
+    Returns:
+        Trades in the `extract_local_maxima_local_minima_trend_range` layout
+    """
+    n = len(supertrend_data)
+    last = n - 1
+    trades = []
+
+    for start, end, side, max_high, min_low in zip(
+            segments['start'], segments['end'], segments['side'],
+            segments['max_high'], segments['min_low']):
+        entry_candle = supertrend_data[start]
+        exit_candle = supertrend_data[end + 1 if end < last else last]
+        entry = entry_candle["close"]
+
+        if side == "long":
+            afe = (max_high - entry) / entry * 100
+            mae = (entry - min_low) / entry * 100
+        else:
+            afe = (entry - min_low) / entry * 100
+            mae = (max_high - entry) / entry * 100
+
+        trades.append({
+            "side": side,
+            "entry_time": entry_candle["time"],
+            "entry": entry,
+            "afe": round(afe, 2),
+            "mae": round(mae, 2),
+            "exit": exit_candle["close"],
+            "exit_time": exit_candle["time"],
+            "max_high_in_range": max_high,
+            "min_low_in_range": min_low,
+            "candles": end - start + 1
+        })
+
+    return trades
@@ -0,0 +1,164 @@
+"""
+Cold-start benchmark: process start → first Supertrend signal
+
+Stages timed in a fresh interpreter, against the local exchange simulator:
+    config      import config.config (dotenv load)
+    api         import api
+    modules     import Bot, utils, Indicators
+    construct   TradingBot + DataFetcher construction
+    history     45-day get_candle_columns_in_batches pull
+    indicator   calculate_supertrend on the history
+    signal      first strategy signal
+
+Results are appended to benchmarks/results/cold_start.jsonl keyed by git
+commit, and compared with the previous run to flag regressions.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--repeat 5] [--budget-ms 2000] [--importtime]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import ROOT, append_result, git_commit, load_results  # noqa: E402
+
+STAGES = ['config', 'api', 'modules', 'construct', 'history', 'indicator', 'signal']
+HISTORY_DAYS = 45
+RESOLUTION_SEC = 300
+
+
+def child():
+    """Run the cold-start chain once and print stage timings as JSON"""
+    marks = {}
+    t0 = time.perf_counter()
+
+    import config.config  # noqa: F401
+    marks['config'] = time.perf_counter()
+
+    import api  # noqa: F401
+    marks['api'] = time.perf_counter()
+
+    from Bot.trading_bot import TradingBot
+    from Bot.strategy import SupertrendStrategy
+    from utils.data_fetcher import DataFetcher
+    from Indicators.SuperTrend.supertrend import calculate_supertrend
+    marks['modules'] = time.perf_counter()
+
+    # Harness setup is excluded from the stage timings
+    setup_start = time.perf_counter()
+    from benchmarks.common import synthetic_candles
+    from simulator import DeltaExchangeSimulator, SimulatedDeltaAPI
+    n = HISTORY_DAYS * 86400 // RESOLUTION_SEC + 100
+    sim = DeltaExchangeSimulator()
+    sim.load_candles('ETHUSD', synthetic_candles(n, step=RESOLUTION_SEC), resolution='5m')
+    setup = time.perf_counter() - setup_start
+
+    start = time.perf_counter()
+    client = SimulatedDeltaAPI(sim)
+    TradingBot(client)
+    fetcher = DataFetcher(client)
+    marks['construct'] = time.perf_counter()
+
+    end = sim.now()
+    candles = fetcher.get_candle_columns_in_batches('ETHUSD', '5m',
+                                                    start=end - HISTORY_DAYS * 86400, end=end)
+    marks['history'] = time.perf_counter()
+
+    supertrend_data = calculate_supertrend(candles)
+    marks['indicator'] = time.perf_counter()
+
+    SupertrendStrategy().signal(supertrend_data[-2], supertrend_data[-1])
+    marks['signal'] = time.perf_counter()
+
+    stages = {}
+    prev = t0
+    for stage in STAGES:
+        if stage == 'construct':
+            prev = start
+        stages[stage] = (marks[stage] - prev) * 1000
+        prev = marks[stage]
+    stages['total'] = sum(stages.values())
+    print(json.dumps({'stages': stages, 'candles': len(candles), 'setup_ms': setup * 1000}))
+
+
+def run_child():
+    """Spawn a fresh interpreter for one cold-start measurement"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run([sys.executable, __file__, '--child'], cwd=str(ROOT), env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='Exit non-zero if median total exceeds this budget')
+    parser.add_argument('--regression-pct', type=float, default=20.0,
+                        help='Flag stages slower than the previous run by this much')
+    parser.add_argument('--importtime', action='store_true',
+                        help='Print -X importtime breakdown of the runtime imports')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    runs = [run_child() for _ in range(args.repeat)]
+    medians = {
+        stage: statistics.median(r['stages'][stage] for r in runs)
+        for stage in STAGES + ['total']
+    }
+
+    previous = load_results('cold_start')
+    last = previous[-1]['stages'] if previous else None
+
+    print(f"Cold start ({runs[0]['candles']} candles, median of {args.repeat})")
+    print(f"{'stage':12} {'ms':>10} {'prev ms':>10}")
+    print("-" * 36)
+    regressions = []
+    for stage, ms in medians.items():
+        prev_ms = last.get(stage) if last else None
+        flag = ''
+        if prev_ms and ms > prev_ms * (1 + args.regression_pct / 100) and ms - prev_ms > 1:
+            flag = '  ⚠ regression'
+            regressions.append(stage)
+        prev_text = f"{prev_ms:10.2f}" if prev_ms is not None else f"{'-':>10}"
+        print(f"{stage:12} {ms:10.2f} {prev_text}{flag}")
+
+    if args.importtime:
+        from benchmarks.bench_startup import importtime_breakdown
+        print("\nTop imports (cumulative):")
+        for cumulative, name in importtime_breakdown(
+                'config.config, api, Bot.trading_bot, Bot.strategy, utils.data_fetcher, '
+                'Indicators.SuperTrend.supertrend', top=15):
+            print(f"  {cumulative / 1000:8.2f} ms  {name}")
+
+    if not args.no_save:
+        append_result('cold_start', {
+            'commit': git_commit(),
+            'time': int(time.time()),
+            'python': sys.version.split()[0],
+            'stages': medians,
+        })
+
+    if args.budget_ms is not None and medians['total'] > args.budget_ms:
+        print(f"\n✗ Cold start {medians['total']:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    if regressions:
+        print(f"\n⚠ Regressed stages: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Micro-benchmarks for indicator, backtest and export hot paths
+
+Each case runs on synthetic candles and on the bundled btc_5m_data.json
+(repeated with shifted timestamps to reach the target size). Throughput is
+reported in candles/s from an untraced run; peak memory comes from a
+second run under tracemalloc.
+
+Usage:
+    python benchmarks/bench_hot_paths.py [--sizes 10000,100000,1000000]
+                                         [--cases calculate_supertrend,...]
+                                         [--dataset synthetic|bundled|both]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import (  # noqa: E402
+    append_result, bundled_candles, git_commit, scale_candles, synthetic_candles,
+)
+from Indicators.SuperTrend.supertrend import calculate_supertrend, get_supertrend_signal  # noqa: E402
+from Indicators.SuperTrend.supertrend_signal import SupertrendState  # noqa: E402
+from backtest.Supertrend_backtest import SupertrendBacktest  # noqa: E402
+from utils.data_fetcher import DataFetcher  # noqa: E402
+
+
+# ==================== Cases ====================
+# Each case takes (candles, supertrend_data, workdir) and returns nothing.
+
+def case_calculate_supertrend(candles, st, workdir):
+    calculate_supertrend(candles)
+
+
+def case_state_update(candles, st, workdir):
+    state = SupertrendState()
+    update = state.update
+    for candle in candles:
+        update(candle)
+
+
+def case_get_supertrend_signal(candles, st, workdir):
+    # One call per closed candle, on the last two rows as the live loop does
+    for i in range(2, len(st) + 1):
+        get_supertrend_signal(st[i - 2:i])
+
+
+def _backtest(st):
+    bt = SupertrendBacktest()
+    bt.data = st
+    return bt
+
+
+def case_bt_signal_flip(candles, st, workdir):
+    _backtest(st).supertrend_signal_flip_bt()
+
+
+def case_bt_afe_mae(candles, st, workdir):
+    _backtest(st).extract_local_maxima_local_minima_trend_range()
+
+
+def case_bt_sl_target(candles, st, workdir):
+    _backtest(st).backtest_sl_target()
+
+
+def case_bt_inverse(candles, st, workdir):
+    _backtest(st).backtest_inverse_supertrend()
+
+
+def case_export_to_json(candles, st, workdir):
+    DataFetcher().export_to_json(st, os.path.join(workdir, "supertrend_bench.json"))
+
+
+def case_load_json(candles, st, workdir):
+    path = os.path.join(workdir, "supertrend_bench.json")
+    if not os.path.exists(path):
+        with open(path, "w") as f:
+            json.dump(st, f)
+    with open(path, "r") as f:
+        json.load(f)
+
+
+CASES = {
+    'calculate_supertrend': case_calculate_supertrend,
+    'SupertrendState.update': case_state_update,
+    'get_supertrend_signal': case_get_supertrend_signal,
+    'bt.supertrend_signal_flip_bt': case_bt_signal_flip,
+    'bt.extract_afe_mae': case_bt_afe_mae,
+    'bt.backtest_sl_target': case_bt_sl_target,
+    'bt.backtest_inverse_supertrend': case_bt_inverse,
+    'DataFetcher.export_to_json': case_export_to_json,
+    'json.load': case_load_json,
+}
+
+
+# ==================== Runner ====================
+
+def measure(fn, candles, st, workdir, memory: bool = True):
+    """
+    Time one call, then measure its peak traced memory
+
+    Returns:
+        (seconds, peak_bytes or None)
+    """
+    start = time.perf_counter()
+    fn(candles, st, workdir)
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn(candles, st, workdir)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def datasets(names, n):
+    """Yield (name, candles) for each requested dataset at size n"""
+    if 'synthetic' in names:
+        yield 'synthetic', synthetic_candles(n, step=900)
+    if 'bundled' in names:
+        yield 'bundled', scale_candles(bundled_candles(), n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks")
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--cases', default=','.join(CASES))
+    parser.add_argument('--dataset', choices=['synthetic', 'bundled', 'both'], default='both')
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc runs')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    cases = [c for c in args.cases.split(',') if c]
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+    names = ['synthetic', 'bundled'] if args.dataset == 'both' else [args.dataset]
+
+    results = []
+    print(f"{'case':32} {'dataset':10} {'candles':>9} {'seconds':>9} {'candles/s':>12} {'peak MB':>9}")
+    print("-" * 86)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            for dataset, candles in datasets(names, n):
+                st = calculate_supertrend(candles)
+                for f in os.listdir(workdir):
+                    os.remove(os.path.join(workdir, f))
+
+                for case in cases:
+                    seconds, peak = measure(CASES[case], candles, st, workdir,
+                                            memory=not args.no_memory)
+                    rate = n / seconds if seconds > 0 else float('inf')
+                    peak_mb = peak / 1e6 if peak is not None else None
+                    peak_text = f"{peak_mb:9.1f}" if peak_mb is not None else f"{'-':>9}"
+                    print(f"{case:32} {dataset:10} {n:9d} {seconds:9.3f} {rate:12,.0f} {peak_text}")
+                    results.append({'case': case, 'dataset': dataset, 'candles': n,
+                                    'seconds': seconds, 'candles_per_sec': rate,
+                                    'peak_mb': peak_mb})
+
+    if not args.no_save:
+        append_result('hot_paths', {'commit': git_commit(), 'time': int(time.time()),
+                                    'results': results})
+
+
+if __name__ == "__main__":
+    main()
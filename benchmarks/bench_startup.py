@@ -0,0 +1,103 @@
+"""
+Import-time benchmark for indicator, backtest and API modules
+
+Each module is imported in a fresh interpreter with the Delta API
+credentials removed from the environment, so a module that still builds a
+client at import time shows up as a failure rather than a slow import.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--importtime]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    'Indicators.SuperTrend.supertrend',
+    'Indicators.SuperTrend.supertrend_signal',
+    'Indicators',
+    'backtest.Supertrend_backtest',
+    'backtest.event_backtest',
+    'utils.data_fetcher',
+    'api',
+]
+
+
+def _clean_env():
+    """Environment without credentials, pointed at the repo root"""
+    env = {k: v for k, v in os.environ.items()
+           if k not in ('DELTA_API_KEY', 'DELTA_API_SECRET')}
+    env['PYTHONPATH'] = str(ROOT)
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    return env
+
+
+def time_import(module: str, repeat: int = 5):
+    """
+    Median wall time of `import module` in a fresh interpreter
+
+    Returns:
+        (median_ms, error) where error is the stderr tail if the import failed
+    """
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    samples = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-c', code], cwd=str(ROOT),
+                              env=_clean_env(), capture_output=True, text=True)
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1]
+        samples.append(float(proc.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples), None
+
+
+def importtime_breakdown(module: str, top: int = 10):
+    """
+    Top cumulative entries from `python -X importtime -c 'import module'`
+
+    Returns:
+        List of (cumulative_us, imported_module)
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=str(ROOT), env=_clean_env(), capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--importtime', action='store_true',
+                        help='Print -X importtime breakdown per module')
+    args = parser.parse_args()
+
+    print(f"{'module':45} {'median ms':>10}")
+    print("-" * 56)
+    for module in MODULES:
+        ms, error = time_import(module, args.repeat)
+        if error:
+            print(f"{module:45} {'FAILED':>10}  {error}")
+            continue
+        print(f"{module:45} {ms:10.2f}")
+
+        if args.importtime:
+            for cumulative, name in importtime_breakdown(module):
+                print(f"    {cumulative / 1000:8.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
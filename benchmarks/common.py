@@ -0,0 +1,85 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import json
+import random
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUNDLED_CANDLES = ROOT / "btc_5m_data.json"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def synthetic_candles(n: int, step: int = 300, start: int = 1_700_000_000,
+                      price: float = 2000.0, vol: float = 0.002, seed: int = 42):
+    """
+    Deterministic random-walk candles
+
+    Returns:
+        List of [time, open, high, low, close, volume], oldest → newest
+    """
+    rng = random.Random(seed)
+    gauss = rng.gauss
+    candles = []
+    for i in range(n):
+        open_price = price
+        price = price * (1 + gauss(0, vol))
+        wick = abs(gauss(0, vol / 2))
+        high = max(open_price, price) * (1 + wick)
+        low = min(open_price, price) * (1 - wick)
+        candles.append([start + i * step, open_price, high, low, price, float(rng.randint(1, 1000))])
+    return candles
+
+
+def bundled_candles():
+    """Candles from btc_5m_data.json, oldest → newest"""
+    with open(BUNDLED_CANDLES, "r") as f:
+        rows = json.load(f)["result"]
+    candles = [[r["time"], float(r["open"]), float(r["high"]), float(r["low"]),
+                float(r["close"]), float(r["volume"])] for r in rows]
+    candles.sort(key=lambda x: x[0])
+    return candles
+
+
+def scale_candles(base, n: int):
+    """Repeat a candle list with shifted timestamps until it has n rows"""
+    if len(base) >= n:
+        return [list(c) for c in base[:n]]
+    step = base[1][0] - base[0][0]
+    span = base[-1][0] - base[0][0] + step
+    out = []
+    k = 0
+    while len(out) < n:
+        shift = k * span
+        for c in base:
+            out.append([c[0] + shift, c[1], c[2], c[3], c[4], c[5]])
+            if len(out) == n:
+                break
+        k += 1
+    return out
+
+
+def append_result(name: str, record: dict):
+    """Append one benchmark record to benchmarks/results/<name>.jsonl"""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(RESULTS_DIR / f"{name}.jsonl", "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def load_results(name: str):
+    """All records previously written by append_result"""
+    path = RESULTS_DIR / f"{name}.jsonl"
+    if not path.exists():
+        return []
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def git_commit() -> str:
+    """Short hash of HEAD, or 'unknown' outside a git checkout"""
+    import subprocess
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
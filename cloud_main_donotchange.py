@@ -1,7 +1,14 @@
 from Bot.trading_bot import TradingBot
+from Bot.strategy import SupertrendStrategy
+from Bot.journal import TradeJournal
+from Bot.execution import ExecutionEngine
 from utils.data_fetcher import DataFetcher
-from Indicators.SuperTrend.supertrend import calculate_supertrend, get_supertrend_signal
+from Indicators.SuperTrend.supertrend import calculate_supertrend
+from Indicators.SuperTrend.kernels import warmup as warmup_kernels
 from utils.telegramNotifier import TelegramNotifier
+from utils.structured_logging import setup_logging, bind_context
+from utils.latency import recorder
+from api.request_metrics import request_metrics
 
 import json
 import time
@@ -16,14 +23,11 @@ sys.stdout.reconfigure(encoding='utf-8')
 
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading_bot.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+# Configure logging (queued JSON-lines file + console, written off the trading thread)
+setup_logging(
+    os.getenv("LOG_FILE", "trading_bot.log"),
+    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+    json_console=os.getenv("LOG_FORMAT", "").lower() == "json",
 )
 
 logger = logging.getLogger(__name__)
@@ -49,6 +53,13 @@ def wait_until_next_15m():
 
     time.sleep(max(1, sleep_seconds))
 
+def observe_stage(stages, name, start):
+    """Record a cycle stage latency in the recorder and the cycle's log fields"""
+    elapsed = time.perf_counter() - start
+    recorder.observe(f"cycle.{name}", elapsed)
+    stages[name] = round(elapsed * 1000, 3)
+
+
 def verify_position_closed(bot, symbol, max_attempts=3):
     """
     Verify that position is actually closed
@@ -80,10 +91,23 @@ def verify_position_closed(bot, symbol, max_attempts=3):
     return False
 
 
-def get_current_position(bot, symbol):
+def sync_journal(journal, symbol, size, price):
+    """Reconcile the journal with the exchange position (catches exchange-side SL/TP fills)"""
+    if journal is None or price is None:
+        return
+    try:
+        journal.sync_position(symbol, size, price)
+    except Exception as e:
+        logger.error(f"✗ Journal position sync failed: {e}", exc_info=True)
+
+
+def get_current_position(bot, symbol, journal=None, price=None):
     """
     Get current position side and size
     Returns: (side, size) where side is 'long', 'short', or None
+
+    With a journal, the exchange position is also written to it as a
+    position_sync event (only when the exchange query succeeded).
     """
     logger.info(f"→ Entering get_current_position() | Symbol: {symbol}")
     
@@ -93,6 +117,7 @@ def get_current_position(bot, symbol):
         
         if not positions:
             logger.info("  No positions found")
+            sync_journal(journal, symbol, 0.0, price)
             logger.info("← Exiting get_current_position() returning (None, 0)")
             return None, 0
         
@@ -103,15 +128,18 @@ def get_current_position(bot, symbol):
             
             if size > 0:
                 logger.info(f"✓ Found LONG position with size: {size}")
+                sync_journal(journal, symbol, float(size), price)
                 logger.info("← Exiting get_current_position() returning ('long', size)")
                 return "long", size
             elif size < 0:
                 abs_size = abs(size)
                 logger.info(f"✓ Found SHORT position with size: {abs_size}")
+                sync_journal(journal, symbol, -float(abs_size), price)
                 logger.info("← Exiting get_current_position() returning ('short', abs_size)")
                 return "short", abs_size
         
         logger.info("  All positions have zero size")
+        sync_journal(journal, symbol, 0.0, price)
         logger.info("← Exiting get_current_position() returning (None, 0)")
         return None, 0
         
@@ -169,46 +197,6 @@ def close_position(bot, notifier, symbol, current_side, size):
         return False
 
 
-def calculate_stop_loss(price, supertrend_value, side, fallback_pct=0.02):
-    """
-    Calculate stop loss using SuperTrend value with fallback
-    
-    Args:
-        price: Current market price
-        supertrend_value: SuperTrend indicator value
-        side: 'long' or 'short'
-        fallback_pct: Fallback percentage if SuperTrend is invalid
-    
-    Returns:
-        Stop loss price
-    """
-    logger.info(f"→ Entering calculate_stop_loss() | Price: {price} | SuperTrend: {supertrend_value} | Side: {side} | Fallback: {fallback_pct}")
-    
-    if side == "long":
-        logger.info("  Calculating stop loss for LONG position")
-        # For longs, SuperTrend should be below price (support)
-        if supertrend_value and supertrend_value < price:
-            sl_price = supertrend_value
-            logger.info(f"✓ Using SuperTrend SL: {sl_price} (SuperTrend is below price)")
-        else:
-            sl_price = price * (1 - fallback_pct)
-            logger.info(f"⚠ Using fallback SL: {sl_price} ({fallback_pct*100}%) - SuperTrend invalid or above price")
-            logger.info(f"  Reason: supertrend_value={supertrend_value}, price={price}")
-    else:  # short
-        logger.info("  Calculating stop loss for SHORT position")
-        # For shorts, SuperTrend should be above price (resistance)
-        if supertrend_value and supertrend_value > price:
-            sl_price = supertrend_value
-            logger.info(f"✓ Using SuperTrend SL: {sl_price} (SuperTrend is above price)")
-        else:
-            sl_price = price * (1 + fallback_pct)
-            logger.info(f"⚠ Using fallback SL: {sl_price} ({fallback_pct*100}%) - SuperTrend invalid or below price")
-            logger.info(f"  Reason: supertrend_value={supertrend_value}, price={price}")
-    
-    logger.info(f"← Exiting calculate_stop_loss() returning {sl_price}")
-    return sl_price
-
-
 def main(notifier):
     """
     Main trading loop
@@ -220,9 +208,19 @@ def main(notifier):
     
     # ---------------- INITIALIZATION ---------------- #
     logger.info("Initializing TradingBot and DataFetcher...")
-    bot = TradingBot()
+    journal = TradeJournal(os.getenv("TRADE_JOURNAL", "trade_journal.jsonl"))
+    bot = TradingBot(journal=journal)
+    # EXECUTION=smart works entries/exits as post-only limits with a market fallback
+    if os.getenv("EXECUTION", "market").lower() == "smart":
+        bot.execution = ExecutionEngine(
+            bot.client,
+            reprice_sec=float(os.getenv("EXECUTION_REPRICE_SEC", "2")),
+            deadline_sec=float(os.getenv("EXECUTION_DEADLINE_SEC", "20")),
+        )
     fetcher = DataFetcher()
     logger.info("✓ Bot and Fetcher initialized")
+    # Compile/load the SuperTrend kernels now rather than in the first cycle
+    warmup_kernels()
 
     # Configuration
     symbol = "ETHUSD"
@@ -230,6 +228,19 @@ def main(notifier):
     size = 5
     sl_pct = 0.02  # 2% fallback SL
     min_candles_required = 50  # Minimum candles needed for SuperTrend
+    target_atr = float(os.getenv("TARGET_ATR", "0")) or None  # take profit in ATRs; unset = none
+    # Entry decisions carry a ready-to-submit order plan (entry + stop / target legs)
+    strategy = SupertrendStrategy(sl_pct=sl_pct, size=size, target_atr=target_atr)
+    bind_context(symbol=symbol)
+
+    # State rebuilt from the local journal (no REST calls)
+    journal_side, journal_size = journal.state.side(symbol)
+    journal_pos = journal.state.position(symbol)
+    logger.info(
+        f"📒 Journal: {journal_side.upper() if journal_side else 'FLAT'} {journal_size} | "
+        f"entry {journal_pos['entry_price']} | SL {journal_pos['stop_loss']} | "
+        f"{len(journal.state.trades)} closed trades"
+    )
 
     logger.info("=" * 80)
     logger.info("🚀 SUPERTREND BOT STARTED")
@@ -237,6 +248,7 @@ def main(notifier):
     logger.info(f"Symbol        : {symbol}")
     logger.info(f"Position Size : {size}")
     logger.info(f"Stop Loss     : {sl_pct*100}% (fallback)")
+    logger.info(f"Take Profit   : {f'{target_atr} ATR' if target_atr else 'none'}")
     logger.info(f"Execution     : Every {timeframe} candle close")
     logger.info(f"Min Candles   : {min_candles_required}")
     logger.info("=" * 80)
@@ -246,16 +258,32 @@ def main(notifier):
     max_consecutive_errors = 5
     logger.info(f"Error tracking initialized: {consecutive_errors}/{max_consecutive_errors}")
 
+    # Latency metrics: JSON file every cycle, optional Prometheus endpoint
+    metrics_file = os.getenv("LATENCY_METRICS_FILE", "latency_metrics.json")
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port:
+        recorder.serve_prometheus(int(metrics_port))
+        logger.info(f"📈 Prometheus metrics on :{metrics_port}/metrics")
+
+    # Per-endpoint API request metrics, dumped periodically
+    request_metrics_file = os.getenv("REQUEST_METRICS_FILE", "request_metrics.json")
+    request_metrics.slow_threshold_sec = float(os.getenv("SLOW_CALL_SEC", "1.0"))
+    request_metrics.start_periodic_dump(request_metrics_file,
+                                        float(os.getenv("REQUEST_METRICS_INTERVAL", "60")))
+
     try:
         iteration = 0
         while True:
             iteration += 1
+            bind_context(cycle_id=iteration)
             logger.info(f"\n{'='*80}")
             logger.info(f"ITERATION #{iteration} | Consecutive Errors: {consecutive_errors}/{max_consecutive_errors}")
             logger.info(f"{'='*80}")
             
             logger.info(f"⏳ Waiting for next {timeframe} candle close...")
             wait_until_next_15m()
+            cycle_start = time.perf_counter()
+            stages = {}
 
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             logger.info(f"\n[{timestamp}] 🔍 Checking market...")
@@ -263,7 +291,9 @@ def main(notifier):
             try:
                 # ---------------- FETCH DATA ---------------- #
                 logger.info("STEP 1: Fetching candle data...")
-                candles = fetcher.get_candles_in_batches(symbol, timeframe)
+                stage_start = time.perf_counter()
+                candles = fetcher.get_candle_columns_in_batches(symbol, timeframe)
+                observe_stage(stages, "fetch", stage_start)
                 logger.info(f"  Candles fetched: {len(candles) if candles else 0} candles")
                 
                 # Validate data
@@ -284,17 +314,25 @@ def main(notifier):
                 logger.info(f"  Sample candle data (last): {candles[-1] if candles else 'None'}")
                 
                 logger.info("STEP 2: Calculating SuperTrend...")
+                stage_start = time.perf_counter()
                 supertrend_data = calculate_supertrend(candles)
+                observe_stage(stages, "indicator", stage_start)
                 logger.info(f"  SuperTrend data calculated: {len(supertrend_data) if supertrend_data else 0} data points")
                 
-                # Export for analysis
+                # Export for analysis (written by the export thread, off the order path)
                 logger.info("  Exporting SuperTrend data to JSON...")
-                fetcher.export_to_json(supertrend_data, "supertrend_ETHUSD.json")
-                logger.info("✓ Data exported to supertrend_ETHUSD.json")
+                stage_start = time.perf_counter()
+                fetcher.export_to_json(supertrend_data, "supertrend_ETHUSD.json", background=True)
+                observe_stage(stages, "export", stage_start)
+                logger.info("✓ Export of supertrend_ETHUSD.json queued")
 
                 # ---------------- SIGNAL GENERATION ---------------- #
                 logger.info("STEP 3: Generating trading signal...")
-                signal, price, trend, supertrend_value = get_supertrend_signal(supertrend_data)
+                stage_start = time.perf_counter()
+                signal, price, trend, supertrend_value = strategy.signal(supertrend_data[-2], supertrend_data[-1])
+                observe_stage(stages, "signal", stage_start)
+                journal.append("signal", symbol, signal=signal, price=price, trend=trend,
+                               supertrend=supertrend_value)
                 
                 logger.info(f"  Signal returned: {signal}")
                 logger.info(f"  Price: {price}")
@@ -320,149 +358,80 @@ def main(notifier):
 
                 # ---------------- POSITION CHECK ---------------- #
                 logger.info("STEP 4: Checking current position...")
-                current_side, current_size = get_current_position(bot, symbol)
+                stage_start = time.perf_counter()
+                current_side, current_size = get_current_position(bot, symbol, journal, price)
+                observe_stage(stages, "position", stage_start)
                 logger.info(f"📍 Current Position: {current_side.upper() if current_side else 'NONE'} | Size: {current_size}")
 
                 # =================================================
                 # 🔴 FORCE EXIT ON TREND FLIP (CRITICAL)
                 # =================================================
                 logger.info("STEP 5: Checking for trend flip exit conditions...")
-                
-                if current_side == "long" and trend == "down":
-                    logger.info("🔁 TREND FLIP DETECTED: LONG position + DOWN trend")
-                    logger.info("  Action: Closing LONG position immediately")
-                    notifier.info("🔁 Trend flipped DOWN → Closing LONG")
-                    
-                    if close_position(bot, notifier, symbol, current_side, current_size):
-                        logger.info("✓ LONG position closed due to trend flip")
-                        consecutive_errors = 0
-                        logger.info(f"  Consecutive errors reset to: {consecutive_errors}")
-                    else:
-                        logger.error("✗ Failed to close LONG position on trend flip")
-                        consecutive_errors += 1
-                        logger.warning(f"  Consecutive errors incremented to: {consecutive_errors}")
-                    continue
+                decision = strategy.decide(supertrend_data[-2], supertrend_data[-1], current_side)
+                logger.info(f"  Decision: {decision}")
+
+                if decision["action"] == "exit":
+                    label = current_side.upper()
+                    logger.info(f"🔁 TREND FLIP DETECTED: {label} position + {trend.upper()} trend")
+                    logger.info(f"  Action: Closing {label} position immediately")
+                    notifier.info(f"🔁 Trend flipped {trend.upper()} → Closing {label}")
 
-                elif current_side == "short" and trend == "up":
-                    logger.info("🔁 TREND FLIP DETECTED: SHORT position + UP trend")
-                    logger.info("  Action: Closing SHORT position immediately")
-                    notifier.info("🔁 Trend flipped UP → Closing SHORT")
-                    
                     if close_position(bot, notifier, symbol, current_side, current_size):
-                        logger.info("✓ SHORT position closed due to trend flip")
+                        logger.info(f"✓ {label} position closed due to trend flip")
                         consecutive_errors = 0
                         logger.info(f"  Consecutive errors reset to: {consecutive_errors}")
                     else:
-                        logger.error("✗ Failed to close SHORT position on trend flip")
+                        logger.error(f"✗ Failed to close {label} position on trend flip")
                         consecutive_errors += 1
                         logger.warning(f"  Consecutive errors incremented to: {consecutive_errors}")
                     continue
-                
+
                 logger.info("  No trend flip detected - proceeding to entry logic")
 
                 # =================================================
                 # 🟢 ENTRY LOGIC
                 # =================================================
                 logger.info("STEP 6: Processing entry/exit logic...")
-                
-                if signal == "buy" and current_side != "long":
-                    logger.info("🟢 BUY SIGNAL with no LONG position")
-                    logger.info(f"  Current position: {current_side}")
-                    logger.info("  Action: Opening LONG position")
-
-                    # Close opposite position if exists
-                    if current_side == "short":
-                        logger.info("⚠️ Opposite SHORT position exists - closing first")
-                        if not close_position(bot, notifier, symbol, current_side, current_size):
-                            logger.error("✗ Failed to close SHORT, skipping LONG entry")
-                            consecutive_errors += 1
-                            logger.warning(f"  Consecutive errors incremented to: {consecutive_errors}")
-                            continue
-                        logger.info("✓ SHORT position closed successfully")
-                        logger.info("  Waiting 2 seconds before opening LONG...")
-                        time.sleep(2)
-
-                    # Open LONG position
-                    logger.info("  Executing BUY order...")
-                    order = bot.execute_simple_trade(symbol, "buy", size)
-                    logger.info(f"  Order result: {order}")
-
-                    if order:
-                        logger.info("✅ LONG position opened successfully")
-                        logger.info("  Waiting 1 second before setting stop loss...")
-                        time.sleep(1)
-                        
-                        # Calculate and set stop loss
-                        sl_price = calculate_stop_loss(price, supertrend_value, "long", sl_pct)
-                        logger.info(f"🛡️ Setting stop loss at {sl_price}")
-                        
-                        sl_order = bot.set_stop_loss(symbol, "sell", size, sl_price)
-                        logger.info(f"  Stop loss order result: {sl_order}")
-                        
-                        if sl_order:
-                            logger.info("✅ Stop loss set successfully")
-                        else:
-                            logger.warning("⚠️ Failed to set stop loss")
 
-                        logger.info("  Sending trade notification...")
-                        notifier.trade_entry(
-                            symbol=symbol,
-                            side="LONG",
-                            entry=price,
-                            stoploss=sl_price,
-                            timeframe=timeframe
-                        )
-                        consecutive_errors = 0
-                        logger.info(f"✓ Consecutive errors reset to: {consecutive_errors}")
-                    else:
-                        logger.error("❌ Failed to open LONG position - order returned None/False")
-                        notifier.info("❌ Failed to open LONG")
-                        consecutive_errors += 1
-                        logger.warning(f"  Consecutive errors incremented to: {consecutive_errors}")
-
-                elif signal == "sell" and current_side != "short":
-                    logger.info("🔴 SELL SIGNAL with no SHORT position")
+                if decision["action"] == "enter":
+                    new_side = decision["side"]
+                    label = new_side.upper()
+                    order_side = "buy" if new_side == "long" else "sell"
+                    logger.info(f"{'🟢' if new_side == 'long' else '🔴'} {signal.upper()} SIGNAL with no {label} position")
                     logger.info(f"  Current position: {current_side}")
-                    logger.info("  Action: Opening SHORT position")
+                    logger.info(f"  Action: Opening {label} position")
 
                     # Close opposite position if exists
-                    if current_side == "long":
-                        logger.info("⚠️ Opposite LONG position exists - closing first")
+                    if decision["close_first"]:
+                        opposite = current_side.upper()
+                        logger.info(f"⚠️ Opposite {opposite} position exists - closing first")
                         if not close_position(bot, notifier, symbol, current_side, current_size):
-                            logger.error("✗ Failed to close LONG, skipping SHORT entry")
+                            logger.error(f"✗ Failed to close {opposite}, skipping {label} entry")
                             consecutive_errors += 1
                             logger.warning(f"  Consecutive errors incremented to: {consecutive_errors}")
                             continue
-                        logger.info("✓ LONG position closed successfully")
-                        logger.info("  Waiting 2 seconds before opening SHORT...")
+                        logger.info(f"✓ {opposite} position closed successfully")
+                        logger.info(f"  Waiting 2 seconds before opening {label}...")
                         time.sleep(2)
 
-                    # Open SHORT position
-                    logger.info("  Executing SELL order...")
-                    order = bot.execute_simple_trade(symbol, "sell", size)
+                    # Open position: entry and its stop / target legs in one submission
+                    plan = decision["plan"]
+                    logger.info(
+                        f"  Submitting {order_side.upper()} {plan['size']} | SL {plan['stop_loss']} | "
+                        f"TP {plan['take_profit']} | R:R {plan['risk_reward_ratio']}"
+                    )
+                    order = bot.submit_plan(symbol, plan)
+                    observe_stage(stages, "close_to_order", cycle_start)
                     logger.info(f"  Order result: {order}")
 
                     if order:
-                        logger.info("✅ SHORT position opened successfully")
-                        logger.info("  Waiting 1 second before setting stop loss...")
-                        time.sleep(1)
-                        
-                        # Calculate and set stop loss
-                        sl_price = calculate_stop_loss(price, supertrend_value, "short", sl_pct)
-                        logger.info(f"🛡️ Setting stop loss at {sl_price}")
-                        
-                        sl_order = bot.set_stop_loss(symbol, "buy", size, sl_price)
-                        logger.info(f"  Stop loss order result: {sl_order}")
-                        
-                        if sl_order:
-                            logger.info("✅ Stop loss set successfully")
-                        else:
-                            logger.warning("⚠️ Failed to set stop loss")
+                        sl_price = plan["stop_loss"]
+                        logger.info(f"✅ {label} position opened with stop loss at {sl_price}")
 
                         logger.info("  Sending trade notification...")
                         notifier.trade_entry(
                             symbol=symbol,
-                            side="SHORT",
+                            side=label,
                             entry=price,
                             stoploss=sl_price,
                             timeframe=timeframe
@@ -470,8 +439,8 @@ def main(notifier):
                         consecutive_errors = 0
                         logger.info(f"✓ Consecutive errors reset to: {consecutive_errors}")
                     else:
-                        logger.error("❌ Failed to open SHORT position - order returned None/False")
-                        notifier.info("❌ Failed to open SHORT")
+                        logger.error(f"❌ Failed to open {label} position - order returned None/False")
+                        notifier.info(f"❌ Failed to open {label}")
                         consecutive_errors += 1
                         logger.warning(f"  Consecutive errors incremented to: {consecutive_errors}")
 
@@ -504,12 +473,27 @@ def main(notifier):
                     notifier.info("❌ Bot stopped due to repeated errors")
                     break
 
+            finally:
+                # Recorded on every exit from the cycle, including continue / break
+                observe_stage(stages, "total", cycle_start)
+                logger.info("cycle complete", extra={'latency_ms': stages})
+                recorder.write_json(metrics_file)
+
     except KeyboardInterrupt:
         logger.info("\n⛔ Bot stopped by user (KeyboardInterrupt)")
         notifier.info("⛔ Bot manually stopped")
 
     finally:
         logger.info("\nEntering cleanup phase...")
+        if not fetcher.flush_exports(timeout=30):
+            logger.warning("⚠ Background exports still pending at shutdown")
+        try:
+            recorder.write_json(metrics_file)
+            request_metrics.stop_periodic_dump()
+            request_metrics.dump(request_metrics_file)
+        except OSError as e:
+            logger.error(f"✗ Error writing latency metrics: {e}")
+        journal.close()
         logger.info("Performing final position check:")
         try:
             positions = bot.monitor_positions(symbol)
@@ -7,6 +7,7 @@ class Config:
     API_KEY = os.getenv("DELTA_API_KEY")
     API_SECRET = os.getenv("DELTA_API_SECRET")
     BASE_URL =  'https://api.india.delta.exchange'
+    WS_URL = 'wss://socket.india.delta.exchange'
     
     # Trading parameters
     DEFAULT_LEVERAGE = 1
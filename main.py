@@ -172,6 +172,7 @@ from Bot.trading_bot import TradingBot
 from utils.data_fetcher import DataFetcher
 from Indicators.SuperTrend.supertrend import calculate_supertrend, get_supertrend_signal
 from utils.telegramNotifier import TelegramNotifier
+from utils.structured_logging import setup_logging, bind_context
 
 import json
 import time
@@ -186,14 +187,11 @@ sys.stdout.reconfigure(encoding='utf-8')
 
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading_bot.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+# Configure logging (queued JSON-lines file + console, written off the trading thread)
+setup_logging(
+    os.getenv("LOG_FILE", "trading_bot.log"),
+    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+    json_console=os.getenv("LOG_FORMAT", "").lower() == "json",
 )
 
 logger = logging.getLogger(__name__)
@@ -334,6 +332,7 @@ def main(notifier):
     size = 1
     sl_pct = 0.02  # 2% fallback SL
     min_candles_required = 50  # Minimum candles needed for SuperTrend
+    bind_context(symbol=symbol)
 
     logger.info("=" * 80)
     logger.info("🚀 SUPERTREND BOT STARTED")
@@ -347,11 +346,14 @@ def main(notifier):
 
     consecutive_errors = 0
     max_consecutive_errors = 5
+    cycle_id = 0
 
     try:
         while True:
             logger.info("⏳ Waiting for next {timeframe} candle close...")
             wait_until_next_15m()
+            cycle_id += 1
+            bind_context(cycle_id=cycle_id)
 
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             logger.info(f"\n[{timestamp}] 🔍 Checking market...")
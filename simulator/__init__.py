@@ -0,0 +1,3 @@
+from simulator.exchange import DeltaExchangeSimulator, SimulatedDeltaAPI, SimulatedExchangeError
+
+__all__ = ['DeltaExchangeSimulator', 'SimulatedDeltaAPI', 'SimulatedExchangeError']
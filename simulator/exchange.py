@@ -0,0 +1,611 @@
+"""
+In-process simulated Delta Exchange
+Serves the REST endpoints used by the `api` package from recorded candle files
+"""
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from api import DeltaAPI
+from api.rate_limiter import RateLimiter
+
+RESOLUTION_NAMES = {
+    60: '1m', 180: '3m', 300: '5m', 900: '15m', 1800: '30m',
+    3600: '1h', 7200: '2h', 14400: '4h', 21600: '6h', 86400: '1d',
+}
+
+
+class SimulatedExchangeError(requests.exceptions.HTTPError):
+    """Injected or simulated API failure (behaves like a requests HTTP error)"""
+
+
+def error_response(error: SimulatedExchangeError) -> Tuple[int, Dict]:
+    """HTTP status and JSON body the live API would answer a failure with"""
+    message = str(error)
+    status = int(message[:3]) if message[:3].isdigit() else 500
+    return status, {'success': False, 'error': {'code': 'simulated', 'message': message}}
+
+
+class DeltaExchangeSimulator:
+    """
+    Deterministic exchange state machine
+
+    The simulated clock sits on a candle index. `step()` closes the next
+    candle of every loaded symbol, triggering resting limit and stop orders
+    against its high/low. Market orders fill at the current close.
+    """
+
+    def __init__(self, latency_sec: float = 0.0, jitter_sec: float = 0.0,
+                 failure_rate: float = 0.0, fail_endpoints: Optional[Dict[str, float]] = None,
+                 maker_fee: float = 0.0002, taker_fee: float = 0.0005,
+                 spread_pct: float = 0.0002, maker_fill_prob: float = 0.0, seed: int = 0):
+        """
+        Initialize DeltaExchangeSimulator
+
+        Args:
+            latency_sec: Fixed latency added to every request
+            jitter_sec: Uniform random latency added on top (seeded)
+            failure_rate: Probability that any request fails
+            fail_endpoints: Per-endpoint-prefix failure probability, e.g. {'/v2/orders': 0.1}
+            maker_fee: Maker commission rate reported by /v2/profile
+            taker_fee: Taker commission rate reported by /v2/profile
+            spread_pct: Synthetic bid/ask spread around the close
+            maker_fill_prob: Fill model for resting limit orders between candles:
+                             chance per request that an order at or through the
+                             touch is filled (0 = fill only on candle closes)
+            seed: RNG seed for jitter and failure injection
+        """
+        self.latency_sec = latency_sec
+        self.jitter_sec = jitter_sec
+        self.failure_rate = failure_rate
+        self.fail_endpoints = fail_endpoints or {}
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.spread_pct = spread_pct
+        self.maker_fill_prob = maker_fill_prob
+        self.rng = random.Random(seed)
+
+        self.products = {}      # symbol -> product dict
+        self.candles = {}       # symbol -> {resolution: [[t, o, h, l, c, v], ...]}
+        self.cursor = {}        # symbol -> index of the last closed candle
+        self.positions = {}     # product_id -> {'size', 'entry_price'}
+        self.orders = {}        # order id -> order dict (open orders only)
+        self.order_log = {}     # order id -> order dict (every order, any state)
+        self.fills = []
+        self.balance = 10000.0
+        self.request_count = 0
+        self._next_id = 1
+
+    # ==================== Data Loading ====================
+
+    def load_candles(self, symbol: str, candles, resolution: Optional[str] = None,
+                     start_index: Optional[int] = None):
+        """
+        Load candles for a symbol
+
+        Args:
+            symbol: Trading pair
+            candles: Path to a recorded JSON file (history endpoint format or
+                     list of [time, open, high, low, close, volume]) or the list itself
+            resolution: Resolution name; inferred from candle spacing if omitted
+            start_index: Candle index the clock starts on (default: last candle)
+        """
+        if isinstance(candles, (str, Path)):
+            with open(candles, "r") as f:
+                candles = json.load(f)
+        if isinstance(candles, dict):
+            candles = candles.get('result', [])
+
+        rows = []
+        for c in candles:
+            if isinstance(c, dict):
+                rows.append([int(c["time"]), float(c["open"]), float(c["high"]),
+                             float(c["low"]), float(c["close"]), float(c["volume"])])
+            else:
+                rows.append([int(c[0]), float(c[1]), float(c[2]),
+                             float(c[3]), float(c[4]), float(c[5])])
+        rows.sort(key=lambda x: x[0])
+
+        if resolution is None:
+            step = rows[1][0] - rows[0][0] if len(rows) > 1 else 60
+            resolution = RESOLUTION_NAMES.get(step, f"{step}s")
+
+        if symbol not in self.products:
+            product_id = len(self.products) + 1
+            self.products[symbol] = {
+                'id': product_id,
+                'symbol': symbol,
+                'contract_type': 'perpetual_futures',
+                'state': 'live',
+                'underlying_asset': {'symbol': symbol[:-3] if symbol.endswith('USD') else symbol},
+                'quoting_asset': {'symbol': 'USD'},
+                'maker_commission_rate': str(self.maker_fee),
+                'taker_commission_rate': str(self.taker_fee),
+                'tick_size': '0.0001',
+                'contract_value': '1',
+            }
+        self.candles.setdefault(symbol, {})[resolution] = rows
+        self.cursor[symbol] = len(rows) - 1 if start_index is None else start_index
+
+    def now(self, symbol: Optional[str] = None) -> int:
+        """Simulated time: open time of the last closed candle"""
+        symbol = symbol or next(iter(self.cursor))
+        return self._series(symbol)[self.cursor[symbol]][0]
+
+    def step(self, n: int = 1) -> bool:
+        """
+        Advance every symbol by n candles, matching resting orders
+
+        Returns:
+            False once any symbol has run out of recorded candles
+        """
+        for _ in range(n):
+            for symbol in self.cursor:
+                series = self._series(symbol)
+                if self.cursor[symbol] + 1 >= len(series):
+                    return False
+                self.cursor[symbol] += 1
+                self._match(symbol, series[self.cursor[symbol]])
+        return True
+
+    # ==================== Request Dispatch ====================
+
+    def latency(self) -> float:
+        """Draw one request's latency: latency_sec plus seeded jitter"""
+        delay = self.latency_sec
+        if self.jitter_sec:
+            delay += self.rng.uniform(0, self.jitter_sec)
+        return delay
+
+    def handle(self, method: str, endpoint: str, params: Dict = None,
+               data: Dict = None, delay: bool = True) -> Dict:
+        """
+        Serve one REST request the way Delta would
+
+        Args:
+            delay: Sleep for latency() first (callers that serialize access
+                   draw and sleep the latency outside their lock instead)
+
+        Raises:
+            SimulatedExchangeError on injected failures or bad requests
+        """
+        if delay:
+            pause = self.latency()
+            if pause > 0:
+                time.sleep(pause)
+
+        self.request_count += 1
+        params = params or {}
+        data = data or {}
+
+        fail_p = self.failure_rate
+        for prefix, p in self.fail_endpoints.items():
+            if endpoint.startswith(prefix):
+                fail_p = max(fail_p, p)
+        if fail_p and self.rng.random() < fail_p:
+            raise SimulatedExchangeError(f"503 Simulated failure for {method} {endpoint}")
+
+        if self.maker_fill_prob and self.orders:
+            self._touch_fills()
+
+        parts = endpoint.strip('/').split('/')
+        route = '/' + '/'.join(parts[:2])
+
+        if endpoint == '/v2/products':
+            return self._ok(list(self.products.values()))
+        if endpoint == '/v2/tickers':
+            return self._ok([self._ticker(s) for s in self.products])
+        if route == '/v2/tickers':
+            return self._ok(self._ticker(parts[2]))
+        if route == '/v2/l2orderbook':
+            return self._ok(self._orderbook(parts[2], int(params.get('depth', 20))))
+        if endpoint == '/v2/history/candles':
+            return self._ok(self._history(params))
+        if endpoint == '/v2/profile':
+            return self._ok({'maker_commission_rate': str(self.maker_fee),
+                             'taker_commission_rate': str(self.taker_fee)})
+        if endpoint == '/v2/wallet/balances':
+            return self._ok([{'asset_symbol': 'USD', 'balance': str(self.balance),
+                              'available_balance': str(self.balance)}])
+        if endpoint == '/v2/positions/margined':
+            return self._ok(self._positions(params))
+        if endpoint == '/v2/orders/bracket' and method == 'POST':
+            return self._ok(self._position_bracket(data))
+        if endpoint == '/v2/orders' and method == 'POST':
+            return self._ok(self._place_order(data))
+        if endpoint == '/v2/orders' and method == 'GET':
+            product_id = params.get('product_id')
+            return self._ok([o for o in self.orders.values()
+                             if product_id is None or o['product_id'] == int(product_id)])
+        if endpoint == '/v2/orders' and method == 'DELETE':
+            order = self.orders.pop(int(data.get('id', 0)), None)
+            if order is None:
+                raise SimulatedExchangeError("404 Order not found")
+            order['state'] = 'cancelled'
+            return self._ok(order)
+        if route == '/v2/orders' and len(parts) == 3 and parts[2].isdigit() and method == 'GET':
+            order = self.order_log.get(int(parts[2]))
+            if order is None:
+                raise SimulatedExchangeError("404 Order not found")
+            return self._ok(order)
+        if endpoint == '/v2/orders/all' and method == 'DELETE':
+            product_id = data.get('product_id')
+            for oid in [i for i, o in self.orders.items()
+                        if product_id is None or o['product_id'] == int(product_id)]:
+                self.orders.pop(oid)['state'] = 'cancelled'
+            return self._ok({})
+        if endpoint == '/v2/fills':
+            return self._ok(self.fills[-int(params.get('limit', 100)):])
+
+        raise SimulatedExchangeError(f"404 Unsupported endpoint {method} {endpoint}")
+
+    # ==================== Endpoint Handlers ====================
+
+    @staticmethod
+    def _ok(result) -> Dict:
+        return {'success': True, 'result': result}
+
+    def _series(self, symbol: str) -> List[list]:
+        series = self.candles.get(symbol)
+        if not series:
+            raise SimulatedExchangeError(f"400 Unknown symbol {symbol}")
+        return next(iter(series.values()))
+
+    def _last_price(self, symbol: str) -> float:
+        return self._series(symbol)[self.cursor[symbol]][4]
+
+    def _ticker(self, symbol: str) -> Dict:
+        series = self._series(symbol)
+        idx = self.cursor[symbol]
+        candle = series[idx]
+        close = candle[4]
+        day = series[max(0, idx - 287):idx + 1]
+        half_spread = close * self.spread_pct / 2
+        return {
+            'symbol': symbol,
+            'product_id': self.products[symbol]['id'],
+            'mark_price': str(close),
+            'close': close,
+            'open': day[0][1],
+            'high': max(c[2] for c in day),
+            'low': min(c[3] for c in day),
+            'volume': sum(c[5] for c in day),
+            'bid': close - half_spread,
+            'ask': close + half_spread,
+            'quotes': {'best_bid': str(close - half_spread), 'best_ask': str(close + half_spread)},
+            'timestamp': candle[0] * 1_000_000,
+        }
+
+    def _orderbook(self, symbol: str, depth: int) -> Dict:
+        close = self._last_price(symbol)
+        half_spread = close * self.spread_pct / 2
+        tick = close * self.spread_pct / 2
+        return {
+            'symbol': symbol,
+            'buy': [{'price': str(close - half_spread - i * tick), 'size': 100 * (i + 1)}
+                    for i in range(depth)],
+            'sell': [{'price': str(close + half_spread + i * tick), 'size': 100 * (i + 1)}
+                     for i in range(depth)],
+        }
+
+    def _history(self, params: Dict) -> List[Dict]:
+        symbol = params['symbol']
+        series = self.candles.get(symbol, {})
+        rows = series.get(params.get('resolution'))
+        if rows is None and len(series) == 1:
+            rows = next(iter(series.values()))
+        if not rows:
+            return []
+
+        now = rows[self.cursor[symbol]][0]
+        start = int(params.get('start', 0))
+        end = min(int(params.get('end', now)), now)
+        result = [
+            {'time': c[0], 'open': c[1], 'high': c[2], 'low': c[3], 'close': c[4], 'volume': c[5]}
+            for c in rows if start <= c[0] <= end
+        ]
+        result.reverse()  # newest first, like the live endpoint
+        return result
+
+    def _product_symbol(self, product_id: int) -> str:
+        for symbol, product in self.products.items():
+            if product['id'] == product_id:
+                return symbol
+        raise SimulatedExchangeError(f"400 Unknown product_id {product_id}")
+
+    def _position_row(self, product_id: int) -> Dict:
+        symbol = self._product_symbol(product_id)
+        pos = self.positions.get(product_id, {'size': 0, 'entry_price': None})
+        mark = self._last_price(symbol)
+        size = pos['size']
+        upnl = (mark - pos['entry_price']) * size if size else 0.0
+        return {
+            'product_id': product_id,
+            'product_symbol': symbol,
+            'size': size,
+            'entry_price': str(pos['entry_price']) if pos['entry_price'] else None,
+            'mark_price': str(mark),
+            'unrealized_pnl': str(upnl),
+            'realized_pnl': str(pos.get('realized_pnl', 0.0)),
+            'leverage': '1',
+        }
+
+    def _positions(self, params: Dict):
+        if params.get('product_id'):
+            return self._position_row(int(params['product_id']))
+
+        underlying = params.get('underlying_asset_symbol')
+        rows = []
+        for symbol, product in self.products.items():
+            if underlying and underlying not in (symbol, product['underlying_asset']['symbol']):
+                continue
+            if self.positions.get(product['id'], {}).get('size'):
+                rows.append(self._position_row(product['id']))
+        return rows
+
+    # ==================== Orders & Matching ====================
+
+    def _place_order(self, data: Dict) -> Dict:
+        product_id = int(data['product_id'])
+        symbol = self._product_symbol(product_id)
+        size = float(data['size'])
+        side = data['side']
+        if side not in ('buy', 'sell') or size <= 0:
+            raise SimulatedExchangeError("400 Invalid order")
+
+        order = {
+            'id': self._next_id,
+            'product_id': product_id,
+            'product_symbol': symbol,
+            'size': size,
+            'unfilled_size': size,
+            'side': side,
+            'order_type': data.get('order_type', 'market_order'),
+            'limit_price': data.get('limit_price'),
+            'stop_price': data.get('stop_price'),
+            'stop_order_type': data.get('stop_order_type'),
+            'post_only': data.get('post_only', False),
+            'reduce_only': data.get('reduce_only', False),
+            'bracket_stop_loss_price': data.get('bracket_stop_loss_price'),
+            'bracket_take_profit_price': data.get('bracket_take_profit_price'),
+            'state': 'open',
+            'created_at': self.now(symbol),
+        }
+        self._next_id += 1
+        self.order_log[order['id']] = order
+
+        if order['stop_order_type']:
+            order['state'] = 'pending'
+            self.orders[order['id']] = order
+            return order
+
+        price = self._last_price(symbol)
+        half_spread = price * self.spread_pct / 2
+
+        if order['order_type'] == 'market_order':
+            fill_price = price + half_spread if side == 'buy' else price - half_spread
+            self._fill(order, fill_price, self.taker_fee)
+            return order
+
+        limit = float(order['limit_price'])
+        crosses = (side == 'buy' and limit >= price + half_spread) or \
+                  (side == 'sell' and limit <= price - half_spread)
+        if crosses and order['post_only']:
+            order['state'] = 'cancelled'
+            order['cancellation_reason'] = 'post_only_would_cross'
+            return order
+        if crosses or data.get('time_in_force') in ('ioc', 'fok'):
+            if crosses:
+                self._fill(order, limit, self.taker_fee)
+            else:
+                order['state'] = 'cancelled'
+            return order
+
+        self.orders[order['id']] = order
+        return order
+
+    def _touch_fills(self):
+        """Fill model: resting limits at or through the touch fill with maker_fill_prob"""
+        for oid in list(self.orders):
+            order = self.orders[oid]
+            if order['stop_order_type']:
+                continue
+            price = self._last_price(order['product_symbol'])
+            half_spread = price * self.spread_pct / 2
+            limit = float(order['limit_price'])
+            at_touch = (limit >= price - half_spread) if order['side'] == 'buy' \
+                else (limit <= price + half_spread)
+            if at_touch and self.rng.random() < self.maker_fill_prob:
+                del self.orders[oid]
+                self._fill(order, limit, self.maker_fee)
+
+    def _match(self, symbol: str, candle: List):
+        """Trigger resting limit and stop orders against a newly closed candle"""
+        product_id = self.products[symbol]['id']
+        _, open_price, high, low, _, _ = candle
+
+        for oid in [i for i, o in self.orders.items() if o['product_id'] == product_id]:
+            order = self.orders.get(oid)
+            if order is None:
+                # Bracket leg cancelled by its sibling's fill
+                continue
+            side = order['side']
+
+            if order['stop_order_type'] == 'take_profit_order':
+                stop = float(order['stop_price'])
+                if (side == 'sell' and high >= stop) or (side == 'buy' and low <= stop):
+                    price = max(stop, open_price) if side == 'sell' else min(stop, open_price)
+                    del self.orders[oid]
+                    self._fill(order, price, self.taker_fee)
+            elif order['stop_order_type']:
+                stop = float(order['stop_price'])
+                if (side == 'sell' and low <= stop) or (side == 'buy' and high >= stop):
+                    price = min(stop, open_price) if side == 'sell' else max(stop, open_price)
+                    del self.orders[oid]
+                    self._fill(order, price, self.taker_fee)
+            else:
+                limit = float(order['limit_price'])
+                if (side == 'buy' and low < limit) or (side == 'sell' and high > limit):
+                    del self.orders[oid]
+                    self._fill(order, limit, self.maker_fee)
+
+    def _fill(self, order: Dict, price: float, fee_rate: float):
+        """Apply a fill to the position book"""
+        product_id = order['product_id']
+        pos = self.positions.setdefault(product_id, {'size': 0, 'entry_price': None,
+                                                     'realized_pnl': 0.0})
+        signed = order['size'] if order['side'] == 'buy' else -order['size']
+
+        if order['reduce_only']:
+            if pos['size'] == 0 or (pos['size'] > 0) == (signed > 0):
+                order['state'] = 'cancelled'
+                return
+            signed = max(-abs(pos['size']), min(abs(pos['size']), signed))
+
+        old = pos['size']
+        new = old + signed
+        if old == 0 or (old > 0) == (signed > 0):
+            # Opening or adding
+            total = abs(old) + abs(signed)
+            prev_entry = pos['entry_price'] or price
+            pos['entry_price'] = (prev_entry * abs(old) + price * abs(signed)) / total
+        else:
+            # Reducing, closing or flipping
+            closed = min(abs(old), abs(signed))
+            direction = 1 if old > 0 else -1
+            pos['realized_pnl'] += (price - pos['entry_price']) * closed * direction
+            if new == 0:
+                pos['entry_price'] = None
+            elif (new > 0) != (old > 0):
+                pos['entry_price'] = price
+            if new == 0 or (new > 0) != (old > 0):
+                # Bracket legs live and die with the position they protect
+                self._cancel_bracket_legs(product_id)
+        pos['size'] = new
+
+        fee = abs(signed) * price * fee_rate
+        self.balance -= fee
+        order['state'] = 'closed'
+        order['unfilled_size'] = 0
+        order['average_fill_price'] = str(price)
+        self.fills.append({
+            'order_id': order['id'],
+            'product_id': product_id,
+            'product_symbol': order['product_symbol'],
+            'side': order['side'],
+            'size': abs(signed),
+            'price': str(price),
+            'commission': str(fee),
+            'created_at': self.now(order['product_symbol']),
+        })
+        if order['bracket_stop_loss_price'] or order['bracket_take_profit_price']:
+            self._attach_bracket(product_id, order['bracket_stop_loss_price'],
+                                 order['bracket_take_profit_price'], parent_order_id=order['id'])
+
+    def _position_bracket(self, data: Dict) -> Dict:
+        """Attach stop loss / take profit legs to the open position (/v2/orders/bracket)"""
+        product_id = int(data['product_id'])
+        if not self.positions.get(product_id, {}).get('size'):
+            raise SimulatedExchangeError("400 No open position")
+        legs = self._attach_bracket(product_id,
+                                    (data.get('stop_loss_order') or {}).get('stop_price'),
+                                    (data.get('take_profit_order') or {}).get('stop_price'))
+        return {'product_id': product_id, 'orders': legs}
+
+    def _attach_bracket(self, product_id: int, stop_loss_price, take_profit_price,
+                        parent_order_id: Optional[int] = None) -> List[Dict]:
+        """Replace the position's bracket with reduce-only legs sized to the position"""
+        self._cancel_bracket_legs(product_id)
+        symbol = self._product_symbol(product_id)
+        size = self.positions[product_id]['size']
+        legs = []
+        for stop_order_type, stop_price in (('stop_loss_order', stop_loss_price),
+                                            ('take_profit_order', take_profit_price)):
+            if not stop_price:
+                continue
+            leg = {
+                'id': self._next_id,
+                'product_id': product_id,
+                'product_symbol': symbol,
+                'size': abs(size),
+                'unfilled_size': abs(size),
+                'side': 'sell' if size > 0 else 'buy',
+                'order_type': 'market_order',
+                'limit_price': None,
+                'stop_price': str(stop_price),
+                'stop_order_type': stop_order_type,
+                'post_only': False,
+                'reduce_only': True,
+                'bracket_stop_loss_price': None,
+                'bracket_take_profit_price': None,
+                'bracket_order': True,
+                'parent_order_id': parent_order_id,
+                'state': 'pending',
+                'created_at': self.now(symbol),
+            }
+            self._next_id += 1
+            self.order_log[leg['id']] = leg
+            self.orders[leg['id']] = leg
+            legs.append(leg)
+        return legs
+
+    def _cancel_bracket_legs(self, product_id: int):
+        for oid in [i for i, o in self.orders.items()
+                    if o['product_id'] == product_id and o.get('bracket_order')]:
+            self.orders.pop(oid)['state'] = 'cancelled'
+
+
+class SimulatedTransport:
+    """
+    HTTP transport for DeltaExchangeClient served by an in-process simulator
+
+    Stands in for the `requests` module (client `session`), so the client's
+    own signing, rate limiting, retries, spans, metrics and error handling
+    all run exactly as against the live API. Request and response bodies go
+    through JSON like on the wire.
+    """
+
+    def __init__(self, exchange: DeltaExchangeSimulator):
+        self.exchange = exchange
+
+    def request(self, method: str, url: str, headers: Dict = None, params: Dict = None,
+                data=None, timeout: float = None, **kwargs) -> requests.Response:
+        endpoint = urlsplit(url).path
+        query = {k: str(v) for k, v in (params or {}).items()}
+        body = json.loads(data) if data else None
+        try:
+            status, result = 200, self.exchange.handle(method, endpoint, query, body)
+        except SimulatedExchangeError as e:
+            status, result = error_response(e)
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = 'OK' if status == 200 else 'Simulated'
+        response.url = url
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps(result).encode('utf-8')
+        return response
+
+
+class SimulatedDeltaAPI(DeltaAPI):
+    """
+    DeltaAPI whose HTTP calls are served by an in-process DeltaExchangeSimulator
+
+    The simulated clock is not wall time, so by default requests are not
+    throttled; pass `limiter` / `order_limiter` to exercise rate limiting.
+    """
+
+    SIMULATED_URL = 'http://simulator.invalid'
+
+    def __init__(self, exchange: DeltaExchangeSimulator, **kwargs):
+        kwargs.setdefault('limiter', RateLimiter(rate=1e9, burst=10 ** 9))
+        kwargs.setdefault('order_limiter', RateLimiter(rate=1e9, burst=10 ** 9))
+        super().__init__(api_key='simulated', api_secret='simulated',
+                         base_url=self.SIMULATED_URL,
+                         session=SimulatedTransport(exchange), **kwargs)
+        self.exchange = exchange
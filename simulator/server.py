@@ -0,0 +1,127 @@
+"""
+Localhost HTTP front-end for the simulated Delta Exchange
+
+Usage:
+    python -m simulator.server btc_5m_data.json --symbol ETHUSD --port 8765
+
+Then point a real client at it:
+    DeltaAPI(api_key='x', api_secret='y', base_url='http://127.0.0.1:8765')
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from simulator.exchange import DeltaExchangeSimulator, SimulatedExchangeError, error_response
+
+
+def _make_handler(exchange: DeltaExchangeSimulator, lock: threading.Lock):
+    """Request handler class bound to one simulator instance"""
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def _dispatch(self, method: str):
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query))
+            length = int(self.headers.get('Content-Length') or 0)
+            data = json.loads(self.rfile.read(length)) if length else None
+
+            # Sleep the simulated latency outside the lock so requests overlap
+            with lock:
+                pause = exchange.latency()
+            if pause > 0:
+                time.sleep(pause)
+            try:
+                with lock:
+                    body = exchange.handle(method, url.path, params, data, delay=False)
+                status = 200
+            except SimulatedExchangeError as e:
+                status, body = error_response(e)
+
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_DELETE(self):
+            self._dispatch('DELETE')
+
+        def do_PUT(self):
+            self._dispatch('PUT')
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class SimulatorServer:
+    """Run a DeltaExchangeSimulator behind a localhost HTTP server"""
+
+    def __init__(self, exchange: DeltaExchangeSimulator, host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize SimulatorServer
+
+        Args:
+            exchange: Simulator instance to serve
+            host: Bind address
+            port: Bind port (0 picks a free port)
+        """
+        self.exchange = exchange
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(exchange, self.lock))
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve in a background thread and return the base URL"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        """Shut the server down"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated Delta Exchange HTTP server")
+    parser.add_argument("candles", help="Recorded candle JSON file")
+    parser.add_argument("--symbol", default="ETHUSD")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency per request (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sim = DeltaExchangeSimulator(latency_sec=args.latency, failure_rate=args.failure_rate,
+                                 seed=args.seed)
+    sim.load_candles(args.symbol, args.candles)
+    server = SimulatorServer(sim, port=args.port)
+    print(f"Simulated Delta Exchange on {server.base_url} ({args.symbol})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,32 @@
+"""
+Shared fixtures for the test suite
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from simulator.exchange import DeltaExchangeSimulator, SimulatedDeltaAPI  # noqa: E402
+
+
+@pytest.fixture
+def make_exchange():
+    """
+    Factory for a simulator with one symbol loaded
+
+    Returns:
+        fn(candles=None, maker_fill_prob=0.0, start_index=10) -> (sim, api)
+    """
+    def make(candles=None, maker_fill_prob: float = 0.0, start_index: int = 10,
+             symbol: str = 'ETHUSD'):
+        if candles is None:
+            candles = [[1_700_000_100 + i * 300, 100.0, 101.0, 99.0, 100.0, 10.0]
+                       for i in range(50)]
+        sim = DeltaExchangeSimulator(maker_fill_prob=maker_fill_prob, seed=1)
+        sim.load_candles(symbol, candles, start_index=start_index)
+        return sim, SimulatedDeltaAPI(sim)
+    return make
@@ -0,0 +1,94 @@
+"""
+SQLite analytics store round trips
+"""
+import pytest
+
+from api.candles import CandleColumns
+from benchmarks.common import synthetic_candles
+from Indicators.SuperTrend.supertrend import calculate_supertrend
+from utils.analytics_store import AnalyticsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    with AnalyticsStore(str(tmp_path / 'analytics.db')) as store:
+        yield store
+
+
+@pytest.fixture
+def candles():
+    return synthetic_candles(300, step=300, seed=5)
+
+
+def test_candles_round_trip_and_upsert(store, candles):
+    assert store.insert_candles('ETHUSD', '5m', candles) == 300
+    # Re-inserting an overlapping page replaces rows instead of duplicating them
+    store.insert_candles('ETHUSD', '5m', CandleColumns.from_result(
+        [{'time': c[0], 'open': c[1], 'high': c[2], 'low': c[3], 'close': c[4], 'volume': c[5]}
+         for c in candles[-10:]]))
+    store.insert_candles('BTCUSD', '5m', candles[:5])
+
+    columns = store.candle_columns('ETHUSD', '5m')
+    assert columns.to_rows() == [list(c) for c in candles]
+    window = store.candle_columns('ETHUSD', '5m', candles[10][0], candles[19][0])
+    assert list(window.time) == [c[0] for c in candles[10:20]]
+    assert len(store.candle_columns('ETHUSD', '1h')) == 0
+
+
+def test_supertrend_rows_round_trip(store, candles):
+    rows = calculate_supertrend(candles)
+    store.insert_candles('ETHUSD', '5m', candles)
+    stored = store.insert_supertrend('ETHUSD', '5m', rows)
+
+    expected = [r for r in rows if r['trend'] is not None]
+    assert stored == len(expected) < len(rows)
+    fields = ('time', 'open', 'high', 'low', 'close', 'atr', 'final_upper', 'final_lower',
+              'supertrend', 'trend')
+    assert store.supertrend_rows('ETHUSD', '5m') == [{k: r[k] for k in fields} for r in expected]
+
+    times, values = store.indicator_series('ETHUSD', '5m', 'trend', end=expected[4]['time'])
+    assert list(times) == [r['time'] for r in expected[:5]]
+    assert set(values) <= {1.0, -1.0}
+
+
+def test_signals(store):
+    store.insert_signals('ETHUSD', '5m', [{'time': 200, 'signal': 'sell', 'price': 99.0},
+                                          {'time': 100, 'signal': 'buy'}], source='live')
+    assert store.signals('ETHUSD', '5m') == [(100, 'buy', None), (200, 'sell', 99.0)]
+    assert store.signals('ETHUSD', '5m', start=150) == [(200, 'sell', 99.0)]
+
+
+def test_backtest_runs(store):
+    flip = [
+        {'side': 'long', 'entry_time': 0, 'exit_time': 10, 'entry': 100.0, 'exit': 110.0,
+         'afe': 12.0, 'mae': 1.0, 'candles': 3},
+        {'side': 'short', 'entry_time': 10, 'exit_time': 20, 'entry_price': 110.0,
+         'exit_price': 99.0, 'pnl': 11.0, 'exit_reason': 'TARGET'},
+    ]
+    sl = [{'side': 'long', 'entry_time': 0, 'exit_time': 5, 'entry': 100.0, 'exit': 95.0,
+           'pnl_pct': -5.0, 'exit_reason': 'SL'}]
+    first = store.save_backtest('flip', flip, symbol='ETHUSD', resolution='5m',
+                                params={'atr': 10}, metrics={'trades': 2})
+    second = store.save_backtest('sl', sl)
+
+    assert [r['run_id'] for r in store.runs()] == [second, first]
+    (run,) = store.runs('flip')
+    assert (run['params'], run['metrics'], run['symbol']) == ({'atr': 10}, {'trades': 2}, 'ETHUSD')
+
+    trades = store.trades(first)
+    # Missing pnl_pct is derived; unknown fields come back from `extra`
+    assert [t['pnl_pct'] for t in trades] == [10.0, 10.0]
+    assert trades[0]['candles'] == 3 and trades[0]['entry_price'] == 100.0
+    assert trades[1]['exit_reason'] == 'TARGET'
+    assert store.trades(first, start=5) == trades[1:]
+
+    assert store.trade_column([first, second]) == {first: pytest.approx([10.0, 10.0]),
+                                                   second: pytest.approx([-5.0])}
+    assert list(store.trade_column([first], side='short')[first]) == [10.0]
+    with pytest.raises(ValueError):
+        store.trade_column([first], field='side')
+
+    compared = store.compare_runs([first, second])
+    assert compared[first] == {'trades': 2, 'win_rate': 100.0, 'avg_pnl_pct': 10.0,
+                               'total_pnl_pct': 20.0}
+    assert compared[second]['win_rate'] == 0.0
@@ -0,0 +1,114 @@
+"""
+SupertrendBacktest reports and trade scans
+"""
+import pytest
+
+from backtest.costs import CostModel
+from backtest.segments import build_trend_segments, segment_trades
+from backtest.Supertrend_backtest import SupertrendBacktest
+from benchmarks.common import synthetic_candles
+from Indicators.SuperTrend.supertrend import calculate_supertrend
+
+
+@pytest.fixture
+def supertrend_rows():
+    return calculate_supertrend(synthetic_candles(2000, step=300, seed=7))
+
+
+@pytest.mark.parametrize('cost_model', [None, CostModel()])
+def test_summary_labels_line_up(supertrend_rows, capsys, cost_model):
+    bt = SupertrendBacktest(cost_model=cost_model)
+    bt.data = supertrend_rows
+    bt.supertrend_signal_flip_bt()
+    bt.summary()
+
+    rows = [line for line in capsys.readouterr().out.splitlines() if ' : ' in line]
+    assert len({line.index(' : ') for line in rows}) == 1
+    labels = [line.split(' : ')[0].strip() for line in rows]
+    if cost_model is None:
+        assert 'Win Rate' in labels and 'Net PnL' not in labels
+    else:
+        assert {'Win Rate (net)', 'Win Rate (gross)', 'Net PnL'} <= set(labels)
+
+
+def test_afe_percentiles_are_nearest_rank(supertrend_rows, capsys):
+    bt = SupertrendBacktest()
+    bt.data = supertrend_rows
+    bt.returns_supertrend()
+
+    afe = sorted(t['afe'] for t in bt.extract_local_maxima_local_minima_trend_range())
+    out = capsys.readouterr().out
+    assert f"95th percentile AFE: {afe[int(len(afe) * 0.95)]}" in out
+    assert f"Median AFE: {afe[len(afe) // 2]}" in out
+
+
+def _reference_afe_mae(data):
+    """Nested-scan AFE/MAE extraction the segment index replaced"""
+    trades = []
+    for i in range(len(data) - 1):
+        curr, nxt = data[i], data[i + 1]
+        if not ((curr["trend"] == "down" and nxt["trend"] == "up") or
+                (curr["trend"] == "up" and nxt["trend"] == "down")):
+            continue
+        trend = nxt["trend"]
+        entry = nxt["close"]
+        max_high = min_low = entry
+        candles = 0
+        j = i + 1
+        while j < len(data) and data[j]["trend"] == trend:
+            max_high = max(max_high, data[j]["high"])
+            min_low = min(min_low, data[j]["low"])
+            candles += 1
+            j += 1
+        last = data[j] if j < len(data) else data[-1]
+        up, down = (max_high - entry, entry - min_low) if trend == "up" else \
+            (entry - min_low, max_high - entry)
+        trades.append({
+            "side": "long" if trend == "up" else "short",
+            "entry_time": nxt["time"], "entry": entry,
+            "afe": round(up / entry * 100, 2), "mae": round(down / entry * 100, 2),
+            "exit": last["close"], "exit_time": last["time"],
+            "max_high_in_range": max_high, "min_low_in_range": min_low,
+            "candles": candles,
+        })
+    return trades
+
+
+def test_segment_trades_match_reference(supertrend_rows):
+    segments = build_trend_segments(supertrend_rows)
+    assert len(segments['start']) == len(segments['end']) == len(segments['side'])
+    assert segment_trades(supertrend_rows, segments) == _reference_afe_mae(supertrend_rows)
+
+    bt = SupertrendBacktest()
+    bt.data = supertrend_rows
+    assert bt.extract_local_maxima_local_minima_trend_range() == _reference_afe_mae(supertrend_rows)
+
+
+def test_segments_skip_warmup():
+    rows = [{"time": i, "high": 1.0, "low": 1.0, "close": 1.0, "trend": trend}
+            for i, trend in enumerate([None, None, "up", "up", "down", "down", "up"])]
+    segments = build_trend_segments(rows)
+    assert segments['start'] == [4, 6]
+    assert segments['end'] == [5, 6]
+    assert segments['side'] == ['short', 'long']
+
+
+def test_caches_follow_data(supertrend_rows):
+    bt = SupertrendBacktest()
+    bt.data = supertrend_rows
+    before = (bt.segments, bt.columns)
+    assert bt.segments is before[0] and bt.columns is before[1]
+
+    # Same length, different trends: assigning data rebuilds the caches
+    flipped = [dict(row, trend={"up": "down", "down": "up"}.get(row["trend"]))
+               for row in supertrend_rows]
+    bt.data = flipped
+    assert bt.segments['side'] == [{"long": "short", "short": "long"}[s]
+                                   for s in before[0]['side']]
+    assert list(bt.columns[4]) == [-c for c in before[1][4]]
+
+    # In-place edits need an explicit invalidate()
+    for row in flipped:
+        row["trend"] = {"up": "down", "down": "up"}.get(row["trend"])
+    bt.invalidate()
+    assert bt.segments == before[0]
@@ -0,0 +1,63 @@
+"""
+Columnar candle decoding and page merging
+"""
+from api.candles import CandleColumns, merge_candle_rows, parse_candle_rows
+from benchmarks.common import synthetic_candles
+
+
+def _result(rows):
+    """History endpoint payload: newest first, prices as strings"""
+    return [{'time': t, 'open': str(o), 'high': str(h), 'low': str(l),
+             'close': str(c), 'volume': str(v)} for t, o, h, l, c, v in reversed(rows)]
+
+
+def _rows(n, start=0):
+    return [[start + i * 60, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i, 10.0 * i] for i in range(n)]
+
+
+def test_from_result_matches_parse():
+    rows = _rows(5)
+    columns = CandleColumns.from_result(_result(rows))
+    assert columns.to_rows() == parse_candle_rows(_result(rows)) == rows
+    assert columns.time.typecode == 'q' and columns.close.typecode == 'd'
+    assert columns.nbytes == 5 * 6 * 8
+
+    # Oldest-first pages and single rows come out in the same order
+    oldest_first = list(reversed(_result(rows)))
+    assert CandleColumns.from_result(oldest_first).to_rows() == rows
+    assert CandleColumns.from_result(_result(rows[:1])).to_rows() == rows[:1]
+    assert len(CandleColumns.from_result([])) == 0
+
+
+def test_rows_view():
+    columns = CandleColumns.from_result(_result(_rows(4)))
+    assert columns[-1] == (180, 4.0, 5.0, 3.5, 4.5, 30.0)
+    assert columns[1:3].to_rows() == _rows(4)[1:3]
+    assert list(columns)[0] == tuple(_rows(1)[0])
+
+
+def test_pages_merge_at_boundaries():
+    rows = _rows(10)
+    # Newest page first with a one-row overlap, plus an empty page
+    pages = [rows[6:], rows[3:7], [], rows[:4]]
+    assert merge_candle_rows(pages) == rows
+    merged = CandleColumns.concat(CandleColumns.from_result(_result(p)) for p in pages)
+    assert merged.to_rows() == rows
+
+    # A page entirely covered by an earlier one is skipped
+    assert merge_candle_rows([rows[:5], rows[1:3]]) == rows[:5]
+    covered = [CandleColumns.from_result(_result(p)) for p in (rows[:5], rows[1:3])]
+    assert CandleColumns.concat(covered).to_rows() == rows[:5]
+
+
+def test_batched_history_paths_agree(make_exchange):
+    candles = synthetic_candles(1300, step=300, seed=3)
+    sim, api = make_exchange(candles=candles, start_index=1250)
+    start, end = candles[0][0], candles[1250][0]
+
+    rows = api.get_candles_in_batches('ETHUSD', '5m', start, end, sleep_sec=0)
+    columns = api.get_candle_columns_in_batches('ETHUSD', '5m', start, end, sleep_sec=0)
+    assert len(rows) > 1000
+    assert [r[0] for r in rows] == list(columns.time)
+    assert all(b - a == 300 for a, b in zip(columns.time, columns.time[1:]))
+    assert [r[4] for r in rows] == list(columns.close)
@@ -0,0 +1,64 @@
+"""
+Fee, funding and slippage costs on backtest trades
+"""
+import pytest
+
+from backtest.costs import CostModel
+
+
+def test_funding_between_sums_settlements_in_window():
+    model = CostModel(funding_times=[300, 100, 200], funding_rates=[0.3, 0.1, 0.2])
+    assert model.funding_times == [100, 200, 300]
+    assert model.funding_between(0, 1000) == pytest.approx(0.6)
+    # (start, end]: a settlement at the entry time is not paid, one at the exit is
+    assert model.funding_between(100, 200) == pytest.approx(0.2)
+    assert model.funding_between(150, 250) == pytest.approx(0.2)
+    assert model.funding_between(300, 400) == 0.0
+    assert CostModel().funding_between(0, 10 ** 10) == 0.0
+
+
+def test_apply_long_and_short():
+    model = CostModel(maker_fee=0.001, taker_fee=0.002, slippage_pct=0.0005,
+                      funding_times=[150], funding_rates=[0.01])
+    trades = [
+        {'side': 'long', 'entry_time': 100, 'exit_time': 200,
+         'entry_price': 100.0, 'exit_price': 110.0, 'pnl': 10.0},
+        {'side': 'short', 'entry_time': 100, 'exit_time': 200,
+         'entry': 100.0, 'exit': 90.0, 'pnl_pct': 10.0, 'exit_reason': 'TARGET'},
+    ]
+    assert model.apply(trades) is trades
+
+    long_trade, short_trade = trades
+    assert long_trade['fees'] == pytest.approx(100 * 0.002 + 110 * 0.002)
+    assert long_trade['slippage'] == pytest.approx(210 * 0.0005)
+    assert long_trade['funding'] == pytest.approx(1.0)
+    assert long_trade['net_pnl'] == pytest.approx(10 - 0.42 - 0.105 - 1.0)
+    assert long_trade['pnl'] == 10.0
+
+    # Target exits rest as limits (maker); shorts receive positive funding
+    assert short_trade['fees'] == pytest.approx(100 * 0.002 + 90 * 0.001)
+    assert short_trade['funding'] == pytest.approx(-1.0)
+    assert short_trade['net_pnl'] == pytest.approx(10 - 0.29 - 0.095 + 1.0)
+    assert short_trade['net_pnl_pct'] == round(short_trade['net_pnl'], 2)
+
+
+def test_apply_empty():
+    assert CostModel().apply([]) == []
+
+
+def test_builders_read_exchange_payloads():
+    model = CostModel()
+    model.set_fees_from_response({'result': {'maker_commission_rate': '0.0001',
+                                             'taker_commission_rate': '0.0004'}})
+    assert (model.maker_fee, model.taker_fee) == (0.0001, 0.0004)
+
+    model.set_funding_from_response({'result': [{'time': 200, 'close': '0.01'},
+                                                {'time': 100, 'funding_rate': '-0.02'}]})
+    assert model.funding_times == [100, 200]
+    assert model.funding_between(0, 300) == pytest.approx(-0.0001)
+
+    model.set_slippage_from_orderbook({'result': {'buy': [{'price': '99'}, {'price': '99.5'}],
+                                                  'sell': [{'price': '100.5'}]}})
+    assert model.slippage_pct == pytest.approx(0.5 / 100)
+    model.set_slippage_from_orderbook({'result': {'buy': [], 'sell': []}})
+    assert model.slippage_pct == pytest.approx(0.5 / 100)
@@ -0,0 +1,112 @@
+"""
+Request metrics, signing and opt-in retries of DeltaExchangeClient
+"""
+import hashlib
+import hmac
+
+import pytest
+
+import api.delta_client as delta_client
+from api.delta_client import DeltaExchangeClient
+from api.rate_limiter import RateLimiter
+from api.request_metrics import RequestMetrics, endpoint_route
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'{"success": true, "result": 1}'):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Serves queued status codes; sleeping moves the clock 40s"""
+
+    def __init__(self, monkeypatch):
+        self.now = 1000.0
+        self.statuses = []
+        self.requests = []
+        monkeypatch.setattr(delta_client.time, 'time', lambda: self.now)
+        monkeypatch.setattr(delta_client.time, 'sleep', self.sleep)
+
+    def sleep(self, sec):
+        self.now += 40
+
+    def request(self, **kwargs):
+        self.requests.append(kwargs)
+        return FakeResponse(self.statuses.pop(0))
+
+
+@pytest.fixture
+def session(monkeypatch):
+    return FakeSession(monkeypatch)
+
+
+def _client(session, **kwargs):
+    limiter = RateLimiter(rate=1e9, burst=10 ** 9)
+    return DeltaExchangeClient('key', 'secret', base_url='https://example.test',
+                               metrics=RequestMetrics(slow_threshold_sec=10.0),
+                               limiter=limiter, order_limiter=limiter,
+                               session=session, retry_backoff_sec=0, **kwargs)
+
+
+def test_requests_are_recorded_per_route(session):
+    client = _client(session)
+    session.statuses = [200, 200, 200]
+    client._request('GET', '/v2/tickers/ETHUSD')
+    client._request('GET', '/v2/tickers/BTCUSD')
+    client._request('POST', '/v2/orders', data={'size': 1})
+
+    stats = client.metrics.endpoint_stats()
+    assert set(stats) == {'GET /v2/tickers/{symbol}', 'POST /v2/orders'}
+    assert stats['GET /v2/tickers/{symbol}']['count'] == 2
+    assert stats['POST /v2/orders']['status'] == {'200': 1}
+    assert client.metrics.slow_calls() == []
+
+
+def test_retries_are_opt_in(session):
+    session.statuses = [503]
+    _client(session)._request('GET', '/v2/tickers')
+    assert len(session.requests) == 1
+
+
+def test_retry_is_signed_with_a_fresh_timestamp(session):
+    client = _client(session, max_retries=2)
+    session.statuses = [503, 200]
+    assert client._request('GET', '/v2/tickers', params={'b': 2, 'a': 1}) == {
+        'success': True, 'result': 1}
+
+    first, second = (r['headers'] for r in session.requests)
+    assert (first['timestamp'], second['timestamp']) == ('1000', '1040')
+    expected = hmac.new(b'secret', b'GET1040/v2/tickers?a=1&b=2', hashlib.sha256).hexdigest()
+    assert second['signature'] == expected
+    assert client.metrics.endpoint_stats()['GET /v2/tickers']['retries'] == 1
+
+
+def test_orders_are_not_retried(session):
+    session.statuses = [503]
+    _client(session, max_retries=2)._request('POST', '/v2/orders', data={'size': 1})
+    assert len(session.requests) == 1
+
+
+def test_unauthenticated_requests_are_not_signed(session):
+    session.statuses = [200]
+    _client(session)._request('GET', '/v2/products', auth=False)
+    assert 'signature' not in session.requests[0]['headers']
+
+
+def test_slow_calls_and_errors():
+    metrics = RequestMetrics(slow_threshold_sec=0.5, slow_log_size=2)
+    metrics.record('GET', '/v2/tickers/ETHUSD', 200, 0.1)
+    metrics.record('GET', '/v2/tickers/ETHUSD', 'error', 0.6, request_id='a')
+    metrics.record('POST', '/v2/orders', 429, 0.7, request_id='b')
+    metrics.record('DELETE', '/v2/orders/42', 200, 0.8, request_id='c')
+
+    assert [c['request_id'] for c in metrics.slow_calls()] == ['b', 'c']
+    assert metrics.endpoint_stats('/v2/tickers/BTCUSD')['GET /v2/tickers/{symbol}']['errors'] == 1
+    assert metrics.endpoint_stats(method='POST')['POST /v2/orders']['errors'] == 1
+    assert endpoint_route('/v2/orders/42') == '/v2/orders/{id}'
+    assert endpoint_route('/v2/orders/bracket') == '/v2/orders/bracket'
@@ -0,0 +1,128 @@
+"""
+Event-driven replay of the live Supertrend cycle
+"""
+import pytest
+
+from backtest.event_backtest import EventBacktester, SimulatedBroker
+from Bot.strategy import SupertrendStrategy
+from benchmarks.common import synthetic_candles
+from Indicators.SuperTrend.supertrend import calculate_supertrend
+
+
+@pytest.fixture
+def candles():
+    return synthetic_candles(3000, step=300, seed=11)
+
+
+def _candle(t, open_price, high, low, close):
+    return [t, open_price, high, low, close, 1.0]
+
+
+# ==================== Broker ====================
+
+def test_stop_fills_at_stop_or_gap_open():
+    broker = SimulatedBroker()
+    broker.market_order("buy", 5, 100.0, now=0, stop_price=95.0)
+    assert broker.position() == ("long", 5)
+    broker.on_candle(_candle(300, 99.0, 101.0, 96.0, 97.0))
+    assert broker.side == "long"
+    broker.on_candle(_candle(600, 97.0, 98.0, 94.0, 95.5))
+    assert broker.trades[-1]["exit"] == 95.0 and broker.trades[-1]["exit_reason"] == "SL"
+
+    broker.market_order("sell", 5, 100.0, now=900, stop_price=105.0)
+    broker.on_candle(_candle(1200, 108.0, 109.0, 107.0, 108.0))
+    assert broker.trades[-1]["exit"] == 108.0
+    assert broker.trades[-1]["pnl_pct"] == -8.0
+    assert broker.position() == (None, 0)
+
+
+def test_latency_fills_at_next_open():
+    broker = SimulatedBroker(latency_sec=1)
+    broker.market_order("buy", 1, 100.0, now=0)
+    assert broker.position() == (None, 0)
+    broker.on_candle(_candle(300, 101.0, 102.0, 100.0, 101.5))
+    assert broker.position() == ("long", 1) and broker.entry == 101.0
+
+
+def test_reduce_only_never_opens_and_slippage_is_adverse():
+    broker = SimulatedBroker(slippage_pct=0.01)
+    broker.market_order("sell", 1, 100.0, now=0, reduce_only=True)
+    assert broker.position() == (None, 0)
+    broker.market_order("buy", 1, 100.0, now=0)
+    broker.market_order("sell", 1, 110.0, now=300, reduce_only=True)
+    trade = broker.trades[-1]
+    assert (trade["entry"], trade["exit"], trade["exit_reason"]) == (101.0, 108.9, "TREND_FLIP")
+
+
+# ==================== Replay ====================
+
+def test_replay_follows_supertrend_flips(candles):
+    rows = calculate_supertrend(candles)
+    by_time = {row["time"]: (i, row) for i, row in enumerate(rows)}
+    trades = EventBacktester(size=5).run(candles)
+    assert len(trades) > 10
+
+    last_exit = None
+    for trade in trades:
+        i, entry_row = by_time[trade["entry_time"]]
+        # Entries happen on the flip candle, at its close
+        assert entry_row["trend"] == ("up" if trade["side"] == "long" else "down")
+        assert rows[i - 1]["trend"] != entry_row["trend"]
+        assert trade["entry"] == round(entry_row["close"], 5)
+        assert trade["size"] == 5
+        assert last_exit is None or trade["entry_time"] >= last_exit
+        last_exit = trade["exit_time"]
+
+        _, exit_row = by_time[trade["exit_time"]]
+        if trade["exit_reason"] == "TREND_FLIP":
+            assert exit_row["trend"] != entry_row["trend"]
+            assert trade["exit"] == round(exit_row["close"], 5)
+        else:
+            assert trade["exit_reason"] == "SL"
+            # Filled at the stop, or at the open when the candle gapped through it
+            low, high = (exit_row["low"], exit_row["open"]) if trade["side"] == "long" \
+                else (exit_row["open"], exit_row["high"])
+            assert low - 1e-5 <= trade["exit"] <= high + 1e-5
+
+
+def test_latency_delays_fills_to_next_open(candles):
+    instant = EventBacktester().run(candles)
+    delayed = EventBacktester(latency_sec=1).run(candles)
+    opens = {c[0]: c[1] for c in candles}
+    assert delayed
+    assert delayed[0]["entry_time"] == instant[0]["entry_time"] + 300
+    assert all(t["entry"] == round(opens[t["entry_time"]], 5) for t in delayed)
+
+
+def test_take_profit_fills_at_target_or_gap_open():
+    broker = SimulatedBroker()
+    broker.market_order("buy", 5, 100.0, now=0, stop_price=95.0, take_profit=110.0)
+    broker.on_candle(_candle(300, 101.0, 109.0, 99.0, 108.0))
+    assert broker.side == "long"
+    broker.on_candle(_candle(600, 108.0, 111.0, 107.0, 110.5))
+    assert (broker.trades[-1]["exit"], broker.trades[-1]["exit_reason"]) == (110.0, "TARGET")
+    assert broker.position() == (None, 0) and broker.target is None
+
+    broker.market_order("sell", 5, 100.0, now=900, stop_price=105.0, take_profit=90.0)
+    broker.on_candle(_candle(1200, 88.0, 89.0, 87.0, 88.5))
+    assert (broker.trades[-1]["exit"], broker.trades[-1]["pnl_pct"]) == (88.0, 12.0)
+
+
+def test_stop_wins_when_one_candle_reaches_both():
+    broker = SimulatedBroker(latency_sec=1)
+    broker.market_order("buy", 1, 100.0, now=0, stop_price=95.0, take_profit=105.0)
+    broker.on_candle(_candle(300, 100.0, 106.0, 94.0, 100.0))
+    assert [t["exit_reason"] for t in broker.trades] == ["SL"]
+
+
+def test_replay_passes_the_take_profit(candles):
+    rows = {row["time"]: row for row in calculate_supertrend(candles)}
+    trades = EventBacktester(SupertrendStrategy(target_atr=1.0)).run(candles)
+    targets = [t for t in trades if t["exit_reason"] == "TARGET"]
+    assert targets
+    for trade in targets:
+        offset = rows[trade["entry_time"]]["atr"] * (1 if trade["side"] == "long" else -1)
+        target = round(trade["entry"] + offset, 5)
+        # Filled at the target, or better when the candle gapped through it
+        assert (trade["exit"] >= target - 1e-5) if trade["side"] == "long" \
+            else (trade["exit"] <= target + 1e-5)
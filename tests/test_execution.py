@@ -0,0 +1,170 @@
+"""
+ExecutionEngine against the in-process exchange simulator
+"""
+import pytest
+
+from Bot.execution import ExecutionEngine
+from Bot.trading_bot import TradingBot
+
+
+class FakeClock:
+    """Simulated monotonic clock; sleep() advances it and calls on_sleep(t)"""
+
+    def __init__(self):
+        self.t = 0.0
+        self.on_sleep = None
+
+    def __call__(self) -> float:
+        return self.t
+
+    def sleep(self, seconds: float):
+        self.t = round(self.t + seconds, 9)
+        if self.on_sleep is not None:
+            self.on_sleep(self.t)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def engine(clock):
+    def make(api, **kwargs):
+        return ExecutionEngine(api, clock=clock, sleep=clock.sleep, **kwargs)
+    return make
+
+
+def _rising(n=80, step=1.0):
+    return [[1_700_000_100 + i * 300, 100 + i * step, 100 + i * step, 100 + i * step,
+             100 + i * step, 10.0] for i in range(n)]
+
+
+def test_passive_fill(make_exchange, engine):
+    sim, api = make_exchange(maker_fill_prob=0.3)
+    report = engine(api).execute('ETHUSD', 1, 'buy', 5)
+
+    assert report['filled_size'] == 5
+    assert report['maker_size'] == 5 and report['taker_size'] == 0
+    assert not report['market_fallback']
+    bid = api.get_order_book('ETHUSD', depth=1).best_bid
+    assert report['avg_price'] == pytest.approx(bid)
+    assert report['slippage_bps'] < 0
+    assert sim.positions[1]['size'] == 5
+    assert sim.orders == {}
+    assert [o['state'] for o in report['orders']] == ['closed']
+
+
+def test_market_fallback_at_deadline(make_exchange, engine, clock):
+    sim, api = make_exchange()
+    report = engine(api, deadline_sec=20).execute('ETHUSD', 1, 'buy', 5)
+
+    assert report['market_fallback']
+    assert report['filled_size'] == 5
+    assert report['maker_size'] == 0 and report['taker_size'] == 5
+    assert report['avg_price'] == pytest.approx(api.get_order_book('ETHUSD', 1).best_ask)
+    assert report['elapsed_sec'] == 20
+    assert sim.positions[1]['size'] == 5
+    # The resting limit was cancelled before the fallback went out
+    assert sim.orders == {}
+    assert [o['order_type'] for o in sim.order_log.values()] == ['limit_order', 'market_order']
+
+
+def test_reprices_when_touch_moves(make_exchange, engine, clock):
+    sim, api = make_exchange(_rising())
+    clock.on_sleep = lambda t: sim.step() if t % 3 < 1e-9 else None
+    report = engine(api, reprice_sec=2, deadline_sec=20).execute('ETHUSD', 1, 'buy', 5)
+
+    assert report['reprices'] > 0
+    assert report['filled_size'] == 5
+    limits = [o for o in sim.order_log.values() if o['order_type'] == 'limit_order']
+    assert len(limits) == report['reprices'] + 1
+    assert [float(o['limit_price']) for o in limits] == sorted(float(o['limit_price'])
+                                                              for o in limits)
+    assert all(o['state'] == 'cancelled' for o in limits)
+    assert sim.orders == {}
+    assert sim.positions[1]['size'] == 5
+
+
+def test_pending_market_fallback_is_settled(make_exchange, engine):
+    sim, api = make_exchange()
+    place_market_order = api.place_market_order
+
+    def pending(*args, **kwargs):
+        # The exchange acknowledges before the fill is reported
+        response = place_market_order(*args, **kwargs)
+        order = dict(response['result'], state='open', unfilled_size=response['result']['size'])
+        order.pop('average_fill_price')
+        return {'result': order}
+
+    api.place_market_order = pending
+    report = engine(api, deadline_sec=1).execute('ETHUSD', 1, 'buy', 5)
+
+    assert report['market_fallback']
+    assert report['filled_size'] == 5
+    assert report['avg_price'] == pytest.approx(100.01)
+    assert report['orders'][-1]['state'] == 'closed'
+
+
+def test_unfilled_market_fallback_is_reported(make_exchange, engine, clock):
+    sim, api = make_exchange()
+    api.place_market_order = lambda *a, **k: {'result': {'id': 999, 'size': 5,
+                                                         'unfilled_size': 5, 'state': 'open'}}
+    api.get_order_by_id = lambda order_id: (
+        {'result': {'id': 999, 'size': 5, 'unfilled_size': 5, 'state': 'open'}}
+        if order_id == 999 else sim.handle('GET', f'/v2/orders/{order_id}'))
+    report = engine(api, deadline_sec=1, settle_sec=3).execute('ETHUSD', 1, 'buy', 5)
+
+    assert report['market_fallback']
+    assert report['filled_size'] == 0
+    assert report['avg_price'] is None
+    assert clock.t == pytest.approx(4.0)
+
+
+def test_uncancellable_order_aborts_without_fallback(make_exchange, engine):
+    sim, api = make_exchange()
+    attempts = []
+
+    def cancel_order(order_id, product_id):
+        attempts.append(order_id)
+        raise ConnectionError("cancel timed out")
+
+    api.cancel_order = cancel_order
+    report = engine(api, deadline_sec=5, cancel_retries=3).execute('ETHUSD', 1, 'buy', 5)
+
+    assert len(attempts) == 3
+    assert not report['market_fallback']
+    assert report['filled_size'] == 0 and report['orders'] == []
+    assert report['open_order']['state'] == 'open'
+    # Nothing was placed on top of the order still resting on the book
+    assert [o['order_type'] for o in sim.order_log.values()] == ['limit_order']
+    assert list(sim.orders) == [report['open_order']['id']]
+
+
+def test_failed_cancel_trusts_order_status(make_exchange, engine):
+    sim, api = make_exchange()
+    cancel_order = api.cancel_order
+
+    def cancel_then_fail(order_id, product_id):
+        # The cancel lands but the response is lost
+        cancel_order(order_id, product_id)
+        raise ConnectionError("connection reset")
+
+    api.cancel_order = cancel_then_fail
+    report = engine(api, deadline_sec=5).execute('ETHUSD', 1, 'buy', 5)
+
+    assert report['open_order'] is None
+    assert report['market_fallback'] and report['filled_size'] == 5
+    assert sim.orders == {}
+
+
+def test_reduce_only_exit_through_bot(make_exchange, engine):
+    sim, api = make_exchange(maker_fill_prob=0.3)
+    bot = TradingBot(client=api, execution=engine(api))
+    assert bot.execute_simple_trade('ETHUSD', 'sell', 5)['filled_size'] == 5
+    assert sim.positions[1]['size'] == -5
+
+    report = bot.exit_position('ETHUSD')
+    assert report['filled_size'] == 5
+    assert sim.positions[1]['size'] == 0
+    assert all(o['reduce_only'] for o in report['orders'])
@@ -0,0 +1,64 @@
+"""
+EMA and Wilder RSI: batch values, incremental trackers and their equivalence
+"""
+import pytest
+
+from api.candles import CandleColumns
+from benchmarks.common import synthetic_candles
+from Indicators import (EMATracker, RSITracker, calculate_ema, calculate_rsi, ema_values,
+                        rsi_values)
+
+
+@pytest.fixture
+def candles():
+    return synthetic_candles(1500, step=300, seed=13)
+
+
+def _columns(candles):
+    return CandleColumns.from_result(
+        [{'time': c[0], 'open': c[1], 'high': c[2], 'low': c[3], 'close': c[4], 'volume': c[5]}
+         for c in reversed(candles)])
+
+
+@pytest.mark.parametrize('span', [1, 5, 21])
+def test_ema_tracker_matches_batch(candles, span):
+    batch = calculate_ema(candles, span)
+    tracker = EMATracker(span)
+    assert [tracker.update(c) for c in candles] == batch
+    assert calculate_ema(_columns(candles), span) == batch
+
+
+@pytest.mark.parametrize('period', [2, 14])
+def test_rsi_tracker_matches_batch(candles, period):
+    batch = calculate_rsi(candles, period)
+    tracker = RSITracker(period)
+    assert [tracker.update(c) for c in candles] == batch
+    assert calculate_rsi(_columns(candles), period) == batch
+
+
+def test_seed_then_update_continues_the_series(candles):
+    ema, rsi = EMATracker(9), RSITracker(14)
+    assert ema.seed(candles[:1000]) == calculate_ema(candles[:1000], 9)[-1]
+    assert rsi.seed(candles[:1000]) == calculate_rsi(candles[:1000], 14)[-1]
+    for c in candles[1000:]:
+        ema.update(c)
+        rsi.update(c)
+    assert (ema.value, rsi.value) == (calculate_ema(candles, 9)[-1], calculate_rsi(candles, 14)[-1])
+
+    ema.reset()
+    assert ema.value is None and ema.update(candles[0]) is None
+
+
+def test_ema_seeds_with_sma():
+    assert ema_values([1.0, 2.0, 3.0, 6.0], span=3) == [None, None, 2.0, 4.0]
+    assert ema_values([1.0, 2.0], span=3) == [None, None]
+
+
+def test_rsi_known_values():
+    assert rsi_values([1.0, 2.0, 3.0], period=2) == [None, None, 100.0]
+    assert rsi_values([1.0, 1.0, 1.0, 1.0], period=2) == [None, None, 50.0, 50.0]
+    # Gains 2, losses 1 over the seed window; then a loss of 1 with Wilder smoothing
+    values = rsi_values([10.0, 12.0, 11.0, 10.0], period=2)
+    assert values[2] == pytest.approx(100 - 100 / (1 + 2.0))
+    assert values[3] == pytest.approx(100 - 100 / (1 + (1.0 / 2) / ((0.5 + 1) / 2)))
+    assert rsi_values([1.0, 2.0], period=2) == [None, None]
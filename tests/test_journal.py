@@ -0,0 +1,99 @@
+"""
+Trade journal replay and crash recovery
+"""
+import json
+import os
+
+import pytest
+
+from Bot.journal import TradeJournal
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'journal.jsonl')
+
+
+def _open_long(journal, symbol='ETHUSD'):
+    journal.append('signal', symbol, signal='buy', price=100.0)
+    journal.append('order', symbol, sync=True, order_id=1, side='buy', size=5)
+    journal.append('fill', symbol, sync=True, order_id=1, side='buy', size=5, price=100.0)
+    journal.append('stop_loss', symbol, sync=True, side='sell', size=5,
+                   stop_price=95.0, take_profit=110.0)
+
+
+def test_replay_rebuilds_state(path):
+    with TradeJournal(path) as journal:
+        _open_long(journal)
+        journal.append('fill', 'ETHUSD', sync=True, order_id=2, side='sell', size=5, price=104.0)
+        expected_trades = list(journal.state.trades)
+
+    with TradeJournal(path) as journal:
+        state = journal.state
+        assert state.side('ETHUSD') == (None, 0)
+        assert state.trades == expected_trades
+        assert state.trades[0]['pnl'] == 4.0
+        assert state.last_signal['ETHUSD']['signal'] == 'buy'
+        assert state.last_seq == 5
+        assert journal.append('signal', 'ETHUSD', signal='sell')['seq'] == 6
+
+
+@pytest.mark.parametrize('tail', [b'{"seq": 6, "ts": 17', b'not json\n'])
+def test_torn_tail_is_truncated(path, tail):
+    with TradeJournal(path) as journal:
+        _open_long(journal)
+    good_size = os.path.getsize(path)
+    with open(path, 'ab') as f:
+        f.write(tail)
+
+    with TradeJournal(path) as journal:
+        assert os.path.getsize(path) == good_size
+        pos = journal.state.position('ETHUSD')
+        assert journal.state.side('ETHUSD') == ('long', 5.0)
+        assert (pos['entry_price'], pos['stop_loss'], pos['take_profit']) == (100.0, 95.0, 110.0)
+        journal.append('fill', 'ETHUSD', sync=True, order_id=2, side='sell', size=5, price=95.0)
+
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line)['seq'] for line in lines] == [1, 2, 3, 4, 5]
+    with TradeJournal(path) as journal:
+        assert journal.state.side('ETHUSD') == (None, 0)
+        assert journal.state.trades[0]['exit_price'] == 95.0
+
+
+def test_position_sync_books_exchange_exit(path):
+    with TradeJournal(path) as journal:
+        _open_long(journal)
+        journal.sync_position('ETHUSD', 5.0, 101.0)
+        assert journal.state.trades == []
+        # The stop filled on the exchange: booked at the recorded stop, not the market
+        journal.sync_position('ETHUSD', 0.0, 94.0)
+        assert journal.state.side('ETHUSD') == (None, 0)
+        assert journal.state.trades[0]['exit_price'] == 95.0
+        trades = list(journal.state.trades)
+
+    with TradeJournal(path) as journal:
+        assert journal.state.trades == trades
+        assert journal.state.position('ETHUSD')['stop_loss'] is None
+
+
+def test_query_by_symbol(path):
+    with TradeJournal(path) as journal:
+        _open_long(journal, 'ETHUSD')
+        _open_long(journal, 'BTCUSD')
+    with TradeJournal(path) as journal:
+        events = journal.query('BTCUSD')
+        assert [e['type'] for e in events] == ['signal', 'order', 'fill', 'stop_loss']
+        assert {e['symbol'] for e in events} == {'BTCUSD'}
+        fills = journal.query(types=('fill',))
+        assert [e['symbol'] for e in fills] == ['ETHUSD', 'BTCUSD']
+        assert journal.query(start=fills[-1]['ts'] + 60) == []
+
+
+def test_metrics_from_closed_trades(path):
+    with TradeJournal(path) as journal:
+        _open_long(journal)
+        journal.append('fill', 'ETHUSD', sync=True, order_id=2, side='sell', size=5, price=110.0)
+        report = journal.metrics('ETHUSD', capital=1000)
+        assert (report['trades'], report['wins']) == (1, 1)
+        assert journal.metrics('BTCUSD') == {'trades': 0}
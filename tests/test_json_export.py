@@ -0,0 +1,105 @@
+"""
+Serializers, atomic snapshots, JSON-lines appends and the export thread
+"""
+import json
+import threading
+
+import pytest
+
+from utils import json_export
+from utils.json_export import BackgroundExporter, JsonlAppender, write_json_atomic
+
+
+@pytest.fixture(params=sorted(json_export._SERIALIZERS))
+def serializer(request, monkeypatch):
+    monkeypatch.setattr(json_export, '_dumps', json_export._dumps)
+    json_export.set_serializer(request.param)
+    return request.param
+
+
+def test_serializers_agree_and_write_null_for_non_finite(serializer):
+    row = {'time': 1, 'close': 1.5, 'st': float('nan'), 'up': [float('inf'), 2.0],
+           'pair': (1, -float('inf')), 3: 'x'}
+    out = json_export.dumps(row)
+    assert b' ' not in out
+    assert json.loads(out) == {'time': 1, 'close': 1.5, 'st': None, 'up': [None, 2.0],
+                               'pair': [1, None], '3': 'x'}
+    assert json.loads(json_export.dumps(row, indent=True)) == json.loads(out)
+
+
+def test_unknown_serializer():
+    with pytest.raises(ValueError):
+        json_export.set_serializer('simdjson')
+
+
+def test_atomic_write_replaces_and_cleans_up(tmp_path):
+    path = tmp_path / 'st.json'
+    write_json_atomic([{'time': 1}], str(path))
+    write_json_atomic([{'time': 2}], str(path), indent=True, fsync=True)
+    assert json.loads(path.read_text()) == [{'time': 2}]
+    assert [p.name for p in tmp_path.iterdir()] == ['st.json']
+
+
+@pytest.fixture
+def failing_dumps(monkeypatch):
+    def dumps(obj, indent=False):
+        raise TypeError("not serializable")
+    monkeypatch.setattr(json_export, '_dumps', dumps)
+
+
+def test_atomic_write_failure_keeps_previous(tmp_path, failing_dumps):
+    path = tmp_path / 'st.json'
+    path.write_text('[]')
+    with pytest.raises(TypeError):
+        write_json_atomic([1], str(path))
+    # The previous file stays and no temp file is left behind
+    assert path.read_text() == '[]'
+    assert [p.name for p in tmp_path.iterdir()] == ['st.json']
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_bytes().splitlines()]
+
+
+def test_appender_writes_only_new_rows(tmp_path):
+    path = tmp_path / 'st.jsonl'
+    rows = [{'time': t, 'close': float(t)} for t in range(5)]
+    appender = JsonlAppender()
+    assert appender.append(rows[:3], str(path)) == 3
+    assert appender.append(rows[:3], str(path)) == 0
+    assert appender.append(rows, str(path)) == 2
+
+    # A new appender (restart) recovers the last key from the file
+    assert JsonlAppender().append(rows + [{'time': 5, 'close': 5.0}], str(path)) == 1
+    assert [r['time'] for r in _read(path)] == list(range(6))
+
+
+def test_appender_truncates_torn_line(tmp_path):
+    path = tmp_path / 'st.jsonl'
+    path.write_bytes(b'{"time":0}\n{"time":1}\n{"time":2,"clo')
+    rows = [{'time': t} for t in range(4)]
+    assert JsonlAppender().append(rows, str(path)) == 2
+    assert _read(path) == rows
+
+    # A torn first line leaves nothing to resume from
+    path.write_bytes(b'{"ti')
+    assert JsonlAppender().append(rows[:1], str(path)) == 1
+    assert _read(path) == rows[:1]
+
+
+def test_exporter_coalesces_per_file():
+    exporter = BackgroundExporter()
+    started, gate = threading.Event(), threading.Event()
+    written = []
+
+    exporter.submit('a', lambda: (started.set(), gate.wait(5), written.append('a1')))
+    assert started.wait(5)
+    # Queued while 'a1' is running: only the newest job per file is kept
+    exporter.submit('b', lambda: written.append('b1'))
+    exporter.submit('a', lambda: written.append('a2'))
+    exporter.submit('a', lambda: written.append('a3'))
+    exporter.submit('c', lambda: 1 / 0)
+    assert not exporter.flush(timeout=0.05)
+    gate.set()
+    assert exporter.flush(timeout=5)
+    assert written == ['a1', 'b1', 'a3']
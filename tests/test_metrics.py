@@ -0,0 +1,85 @@
+"""
+Backtest performance report
+"""
+import pytest
+
+from backtest.metrics import compute_metrics, distribution, percentile, trade_returns_pct
+
+
+def _trade(side, entry, exit_price, entry_time, exit_time):
+    sign = 1 if side == 'long' else -1
+    return {'side': side, 'entry_time': entry_time, 'exit_time': exit_time,
+            'entry_price': entry, 'exit_price': exit_price,
+            'pnl': round((exit_price - entry) * sign, 5)}
+
+
+@pytest.fixture
+def trades():
+    return [
+        _trade('long', 100.0, 110.0, 0, 100),     # +10%
+        _trade('short', 100.0, 105.0, 100, 200),  # -5%
+        _trade('long', 100.0, 90.0, 200, 300),    # -10%
+        _trade('short', 100.0, 80.0, 300, 400),   # +20%
+    ]
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 95) == pytest.approx(4.8)
+    assert percentile(values, 100) == 5.0
+    assert percentile([], 50) is None
+    assert distribution([]) == {}
+    assert distribution([3.0, 1.0, 2.0])['median'] == 2.0
+
+
+def test_trade_returns_prefer_net_then_pct():
+    trades = [
+        {'side': 'long', 'pnl': 1.0, 'entry_price': 10.0, 'net_pnl_pct': 7.5, 'pnl_pct': 10.0},
+        {'side': 'long', 'entry': 10.0, 'exit': 11.0, 'pnl_pct': 10.0},
+        {'side': 'short', 'entry_price': 10.0, 'pnl': -2.0},
+        {'side': 'short', 'entry': 10.0, 'exit': 9.0},
+    ]
+    assert trade_returns_pct(trades) == [7.5, 10.0, -20.0, 10.0]
+
+
+def test_report(trades):
+    report = compute_metrics(trades, capital=1000)
+
+    assert (report['trades'], report['wins'], report['losses']) == (4, 2, 2)
+    assert report['win_rate'] == 50.0
+    assert report['total_pnl'] == 150.0
+    assert report['total_return_pct'] == 15.0
+    assert report['equity_curve'] == [1100.0, 1050.0, 950.0, 1150.0]
+    # Peak 1100 -> trough 950
+    assert report['max_drawdown'] == 150.0
+    assert report['max_drawdown_pct'] == pytest.approx(13.64, abs=0.01)
+    assert report['profit_factor'] == pytest.approx(300 / 150)
+    assert report['exposure_pct'] == 100.0
+    assert report['long'] == {'trades': 2, 'win_rate': 50.0, 'total_pnl': 0.0,
+                              'avg_return_pct': 0.0}
+    assert report['short']['total_pnl'] == 150.0
+    assert report['sharpe'] > 0 and report['sortino'] > 0
+    assert 'mfe' not in report
+
+
+def test_exposure_uses_backtest_window(trades):
+    assert compute_metrics(trades[:1], start_time=0, end_time=400)['exposure_pct'] == 25.0
+
+
+def test_annualized_ratios_scale(trades):
+    per_trade = compute_metrics(trades)
+    annual = compute_metrics(trades, periods_per_year=100)
+    assert annual['sharpe'] == pytest.approx(per_trade['sharpe'] * 10, abs=1e-3)
+
+
+def test_excursion_distributions():
+    trades = [dict(_trade('long', 100.0, 101.0, 0, 10), afe=a, mae=-a) for a in (1.0, 2.0, 3.0)]
+    report = compute_metrics(trades)
+    assert report['mfe']['max'] == 3.0
+    assert report['mae']['min'] == -3.0
+
+
+def test_empty():
+    assert compute_metrics([]) == {'trades': 0}
@@ -0,0 +1,192 @@
+"""
+L2 order book: snapshots, incremental updates and sequence-gap resync
+"""
+import json
+import random
+import threading
+
+import pytest
+
+import api.orderbook as orderbook
+from api.orderbook import OrderBook, OrderBookFeed
+
+
+def _message(action, bids=(), asks=(), sequence=None, symbol='BTCUSD'):
+    return {'type': 'l2_updates', 'symbol': symbol, 'action': action,
+            'bids': [[str(p), str(s)] for p, s in bids],
+            'asks': [[str(p), str(s)] for p, s in asks],
+            'sequence_no': sequence}
+
+
+@pytest.fixture(params=['sorted', 'bisect'])
+def backend(request, monkeypatch):
+    """Book sides on sortedcontainers.SortedList and on the bisect list fallback"""
+    if request.param == 'sorted':
+        if orderbook.SortedList is None:
+            pytest.skip("sortedcontainers not installed")
+    else:
+        monkeypatch.setattr(orderbook, 'SortedList', None)
+    return request.param
+
+
+@pytest.fixture
+def book(backend):
+    book = OrderBook('BTCUSD')
+    book.apply_snapshot([['100.0', '5'], ['99.5', '3'], ['99.0', '8']],
+                        [['100.5', '2'], ['101.0', '4'], ['101.5', '6']], sequence=1)
+    return book
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, text):
+        self.sent.append(json.loads(text))
+
+
+def test_snapshot(book):
+    assert (book.best_bid, book.best_ask) == (100.0, 100.5)
+    assert book.mid == 100.25
+    assert book.spread == 0.5
+    assert book.bids.levels() == [(100.0, 5.0), (99.5, 3.0), (99.0, 8.0)]
+    assert book.asks.levels(2) == [(100.5, 2.0), (101.0, 4.0)]
+    assert book.depth_at(101.0) == 4.0
+    assert book.bids.depth_through(99.5) == 8.0
+    assert book.asks.depth_through(101.2) == 6.0
+
+
+def test_snapshot_replaces_book(book):
+    book.apply_snapshot([['90', '1']], [['91', '1']], sequence=7)
+    assert book.bids.levels() == [(90.0, 1.0)]
+    assert book.asks.levels() == [(91.0, 1.0)]
+    assert book.sequence == 7
+
+
+def test_update_sets_and_deletes_levels(book):
+    assert book.apply_update([['100.0', '0'], ['99.8', '7']], [['100.5', '9']], sequence=2)
+    assert book.best_bid == 99.8
+    assert book.bids.levels() == [(99.8, 7.0), (99.5, 3.0), (99.0, 8.0)]
+    assert book.asks.best() == (100.5, 9.0)
+    assert book.sequence == 2
+    # Deleting a level that is not there is a no-op
+    assert book.apply_update([['42', '0']], [], sequence=3)
+    assert len(book.bids) == 3
+
+
+def test_sequence_gap_is_rejected(book):
+    before = (book.bids.levels(), book.asks.levels())
+    assert book.apply_update([['100.2', '1']], [], sequence=3) is False
+    assert (book.bids.levels(), book.asks.levels()) == before
+    assert book.sequence == 1
+
+
+def test_vwap_and_slippage(book):
+    price, filled = book.vwap('buy', 4)
+    assert filled == 4
+    assert price == pytest.approx((2 * 100.5 + 2 * 101.0) / 4)
+    assert book.vwap('sell', 100)[1] == 16.0
+    assert book.slippage('buy', 100) is None
+    assert book.slippage('sell', 5) == pytest.approx((100.25 - 100.0) / 100.25)
+
+
+def test_updates_match_reference(book):
+    rng = random.Random(3)
+    ref_bids = dict(book.bids.levels())
+    ref_asks = dict(book.asks.levels())
+    for seq in range(2, 2000):
+        bid = rng.random() < 0.5
+        price = round(rng.uniform(90, 100.4) if bid else rng.uniform(100.6, 110), 1)
+        size = rng.choice([0, 0, rng.randint(1, 50)])
+        ref = ref_bids if bid else ref_asks
+        if size:
+            ref[price] = float(size)
+        else:
+            ref.pop(price, None)
+        level = [[str(price), str(size)]]
+        assert book.apply_update(level if bid else [], [] if bid else level, sequence=seq)
+    assert book.bids.levels() == sorted(ref_bids.items(), reverse=True)
+    assert book.asks.levels() == sorted(ref_asks.items())
+
+
+def test_feed_applies_messages_and_ignores_others():
+    feed = OrderBookFeed('BTCUSD')
+    assert not feed.wait_ready(0)
+    # Updates before the first snapshot are dropped
+    assert feed.handle_message(_message('update', bids=[(1, 1)], sequence=1))
+    assert feed.best_bid() is None
+
+    feed.handle_message(json.dumps(_message('snapshot', [(100, 1)], [(101, 1)], sequence=10)))
+    assert feed.wait_ready(0)
+    assert feed.handle_message(_message('update', bids=[(100.5, 2)], sequence=11))
+    assert feed.handle_message(_message('snapshot', [(1, 1)], [(2, 1)], symbol='ETHUSD'))
+    assert (feed.best_bid(), feed.best_ask(), feed.mid()) == (100.5, 101.0, 100.75)
+
+
+def test_feed_resubscribes_on_sequence_gap():
+    feed = OrderBookFeed('BTCUSD')
+    feed._ws = FakeSocket()
+    feed.handle_message(_message('snapshot', [(100, 1)], [(101, 1)], sequence=10))
+
+    assert feed.handle_message(_message('update', bids=[(100.5, 2)], sequence=12)) is False
+    assert feed.resyncs == 1
+    assert not feed.wait_ready(0)
+    # The old subscription is dropped before subscribing again
+    assert [m['type'] for m in feed._ws.sent] == ['unsubscribe', 'subscribe']
+    assert feed._ws.sent[0]['payload'] == feed._ws.sent[1]['payload']
+    assert feed.best_bid() == 100.0
+    # Updates are ignored until the fresh snapshot arrives
+    assert feed.handle_message(_message('update', bids=[(100.7, 2)], sequence=13))
+    assert feed.best_bid() == 100.0
+
+    feed.handle_message(_message('snapshot', [(99, 1)], [(100, 1)], sequence=20))
+    assert feed.wait_ready(0)
+    assert feed.handle_message(_message('update', asks=[(100, 0)], sequence=21))
+    assert feed.best_ask() is None
+
+
+def test_feed_snapshot_is_independent(backend):
+    feed = OrderBookFeed('BTCUSD')
+    feed.handle_message(_message('snapshot', [(100, 1)], [(101, 1)], sequence=1))
+    snapshot = feed.snapshot()
+    feed.handle_message(_message('update', bids=[(100, 0), (99, 3)], sequence=2))
+    assert snapshot.bids.levels() == [(100.0, 1.0)]
+    assert feed.snapshot().bids.levels() == [(99.0, 3.0)]
+
+
+def test_feed_reads_while_updating():
+    feed = OrderBookFeed('BTCUSD')
+    feed.handle_message(_message('snapshot', [(100, 1)], [(101, 1)], sequence=1))
+    errors = []
+    done = threading.Event()
+
+    def reader():
+        try:
+            while not done.is_set():
+                feed.mid()
+                feed.vwap('buy', 5)
+                snapshot = feed.snapshot()
+                snapshot.bids.levels()
+        except Exception as e:  # pragma: no cover - failure path
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    rng = random.Random(5)
+    for seq in range(2, 5000):
+        price = rng.randint(90, 100)
+        feed.handle_message(_message('update', bids=[(price, rng.choice([0, 1, 2]))],
+                                     asks=[(price + 11, rng.choice([0, 1]))], sequence=seq))
+    done.set()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_rest_snapshot(make_exchange):
+    sim, api = make_exchange()
+    book = api.get_order_book('ETHUSD', depth=5)
+    assert len(book.bids) == len(book.asks) == 5
+    assert book.best_bid < 100.0 < book.best_ask
+    assert book.mid == pytest.approx(100.0)
@@ -0,0 +1,53 @@
+"""
+Indicator pipeline: shared intermediates, batch and streaming evaluation
+"""
+import pytest
+
+from benchmarks.common import synthetic_candles
+from Indicators import calculate_ema, calculate_rsi, calculate_supertrend
+from Indicators.pipeline import IndicatorPipeline, atr, ema, hl2, rsi, source, supertrend
+
+
+@pytest.fixture
+def candles():
+    return synthetic_candles(1200, step=300, seed=17)
+
+
+def test_graph_shares_intermediates():
+    pipe = IndicatorPipeline(supertrend(10, 3), atr(10), ema(5), ema(5), rsi(14))
+    assert pipe.outputs == ['supertrend_10_3', 'atr_10', 'ema_close_5', 'rsi_close_14']
+    keys = list(pipe.nodes)
+    assert keys.count('tr') == keys.count('atr_10') == keys.count('hl2') == 1
+    # Inputs come before the nodes that read them
+    assert keys.index('tr') < keys.index('atr_10') < keys.index('supertrend_10_3')
+
+
+def test_batch_matches_standalone_indicators(candles):
+    series = IndicatorPipeline(supertrend(10, 3), ema(5), rsi(14)).run(candles)
+    assert series['supertrend_10_3'] == calculate_supertrend(candles)
+    assert series['ema_close_5'] == calculate_ema(candles, 5)
+    assert series['rsi_close_14'] == calculate_rsi(candles, 14)
+
+
+def test_stream_matches_batch(candles):
+    pipe = IndicatorPipeline(supertrend(10, 3), ema(9, src=hl2()), ema(3, src=rsi(14)))
+    batch = pipe.run(candles)
+
+    stream = pipe.stream()
+    assert stream.seed(candles[:600]) == {key: batch[key][599] for key in pipe.outputs}
+    for i in range(600, len(candles)):
+        assert stream.update(candles[i]) == {key: batch[key][i] for key in pipe.outputs}
+
+    # Streams over one graph keep separate state
+    other = pipe.stream()
+    assert other.update(candles[0])['ema_rsi_close_14_3'] is None
+    stream.reset()
+    assert stream.values == {}
+
+
+def test_run_selects_keys_and_handles_empty(candles):
+    pipe = IndicatorPipeline(supertrend(10, 3))
+    assert set(pipe.run(candles, keys=['atr_10', 'hl2'])) == {'atr_10', 'hl2'}
+    assert pipe.run([]) == {'supertrend_10_3': []}
+    with pytest.raises(ValueError):
+        source('vwap')
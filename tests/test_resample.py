@@ -0,0 +1,103 @@
+"""
+Higher-timeframe bars built from base candles
+"""
+import pytest
+
+from api.candles import CandleColumns
+from api.resample import MultiTimeframeResampler, Resampler, resample_candles
+from benchmarks.common import synthetic_candles
+
+# 1_700_000_040 is a multiple of 60; the hour starts at 1_700_002_800
+HOUR = 1_700_002_800
+
+
+def _naive(rows, tf_sec):
+    """Group by bucket; only buckets starting on their first candle and fully closed"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[0] // tf_sec * tf_sec, []).append(row)
+    out = []
+    for b, group in sorted(groups.items()):
+        if group[0][0] != b or group[-1][0] + 60 < b + tf_sec:
+            continue
+        out.append((b, group[0][1], max(r[2] for r in group), min(r[3] for r in group),
+                    group[-1][4], sum(r[5] for r in group)))
+    return out
+
+
+@pytest.fixture
+def minutes():
+    return synthetic_candles(600, step=60, start=1_700_000_040)
+
+
+@pytest.mark.parametrize('resolution,tf_sec', [('5m', 300), ('15m', 900), ('1h', 3600)])
+def test_batch_matches_naive(minutes, resolution, tf_sec):
+    expected = _naive(minutes, tf_sec)
+    assert [tuple(r) for r in resample_candles(minutes, resolution, '1m')] == expected
+    columns = CandleColumns(*map(list, zip(*minutes)))
+    assert [tuple(r) for r in resample_candles(columns, resolution, '1m').to_rows()] == expected
+
+
+def test_partial_leading_bucket_is_dropped(minutes):
+    out = resample_candles(minutes, '1h', '1m')
+    assert out[0][0] == HOUR
+    assert all(r[0] % 3600 == 0 for r in out)
+
+
+def test_include_partial_keeps_last_bar(minutes):
+    closed = resample_candles(minutes, '1h', '1m')
+    with_partial = resample_candles(minutes, '1h', '1m', include_partial=True)
+    assert with_partial[:-1] == closed
+    assert with_partial[-1][0] == minutes[-1][0] // 3600 * 3600
+
+
+def test_incremental_matches_batch(minutes):
+    resampler = Resampler('1h', '1m')
+    bars = [bar for c in minutes for bar in resampler.update(c)]
+    assert bars == [tuple(r) for r in resample_candles(minutes, '1h', '1m')]
+    assert resampler.partial[0] == minutes[-1][0] // 3600 * 3600
+
+
+def test_multi_timeframe(minutes):
+    mtf = MultiTimeframeResampler('1m', ['5m', '15m'])
+    out = {'5m': [], '15m': []}
+    for candle in minutes:
+        for resolution, bar in mtf.update(candle):
+            out[resolution].append(bar)
+    for resolution in out:
+        assert out[resolution] == [tuple(r) for r in resample_candles(minutes, resolution, '1m')]
+
+
+def test_rejects_incompatible_timeframes():
+    with pytest.raises(ValueError):
+        resample_candles([], '5m', '15m')
+    with pytest.raises(ValueError):
+        Resampler('5m', '3m')
+
+
+def test_multiple_timeframes_from_one_feed(make_exchange, monkeypatch):
+    from utils import data_fetcher
+
+    candles = synthetic_candles(800, step=300, start=HOUR - 3600 * 20)
+    sim, api = make_exchange(candles=candles, start_index=700)
+    # Two minutes into the candle after the last closed one
+    monkeypatch.setattr(data_fetcher.time, 'time', lambda: sim.now() + 420)
+    monkeypatch.setattr(data_fetcher.time, 'sleep', lambda sec: None)
+    fetcher = data_fetcher.DataFetcher(client=api)
+
+    before = sim.request_count
+    data = fetcher.get_multiple_timeframes('ETHUSD', ['5m', '15m', '1h'], hours_back=6,
+                                           columns=True)
+    assert sim.request_count - before == 1
+    assert data['5m'].time[-1] == sim.now()
+    visible = [c for c in candles[:701] if c[0] >= data['1h'].time[0]]
+    for resolution in ('15m', '1h'):
+        assert data[resolution].to_rows() == resample_candles(visible, resolution, '5m')
+    assert data['1h'].time[0] % 3600 == 0 and len(data['1h']) == 6
+
+    pd = pytest.importorskip('pandas')
+    frames = fetcher.get_multiple_timeframes('ETHUSD', ['5m', '1h'], hours_back=6)
+    assert isinstance(frames['1h'], pd.DataFrame)
+    # The DataFrame view keeps the bar still forming, like per-timeframe fetches did
+    assert len(frames['1h']) == 7
+    assert list(frames['1h'].columns) == ['open', 'high', 'low', 'close', 'volume']
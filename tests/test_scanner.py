@@ -0,0 +1,139 @@
+"""
+MarketScanner: seeded from history, fed real closed candles at every boundary
+"""
+import pytest
+
+from api.rate_limiter import RateLimiter, is_order_endpoint
+from benchmarks.common import synthetic_candles
+from Bot.scanner import MarketScanner
+from Indicators import calculate_supertrend
+from simulator.exchange import DeltaExchangeSimulator, SimulatedDeltaAPI
+from utils.analytics_store import AnalyticsStore
+from utils.data_fetcher import DataFetcher
+
+SYMBOLS = [f'S{s}USD' for s in range(20)]
+START = 400
+
+
+@pytest.fixture
+def sim():
+    sim = DeltaExchangeSimulator()
+    for s, symbol in enumerate(SYMBOLS):
+        sim.load_candles(symbol, synthetic_candles(600, seed=s, price=50.0 + s,
+                                                   start=1_700_000_100),
+                         resolution='5m', start_index=START)
+    return sim
+
+
+def _scanner(sim, **kwargs):
+    scanner = MarketScanner(DataFetcher(SimulatedDeltaAPI(sim, **kwargs.pop('client', {}))),
+                            history_candles=200, workers=1, **kwargs)
+    scanner.refresh_universe(SYMBOLS)
+    return scanner
+
+
+@pytest.fixture
+def scanner(sim):
+    return _scanner(sim)
+
+
+def _expected(sim, s, last):
+    return calculate_supertrend(sim.candles[SYMBOLS[s]]['5m'][START - 199:last + 1])[-1]
+
+
+def test_seed_matches_calculate_supertrend(sim, scanner):
+    before = sim.request_count
+    scanner.update(sim.now() + 301)
+    assert sim.request_count - before == len(SYMBOLS) + 1
+
+    for s in range(len(SYMBOLS)):
+        expected = _expected(sim, s, START)
+        assert scanner.last_time == expected['time']
+        assert float(scanner.tracker.supertrend[s]) == pytest.approx(expected['supertrend'])
+        assert scanner.close[s] == expected['close']
+
+
+def test_boundaries_feed_real_closed_candles(sim, scanner):
+    scanner.update(sim.now() + 301)
+    for _ in range(30):
+        sim.step()
+        before = sim.request_count
+        # Mid-candle samples only touch the forming bar
+        scanner.update(sim.now() + 150)
+        assert sim.request_count - before == 1
+        assert scanner.last_time == sim.now() - 300
+        # After the boundary: one history request per symbol plus the tickers sample
+        before = sim.request_count
+        scanner.update(sim.now() + 301)
+        assert sim.request_count - before == len(SYMBOLS) + 1
+        assert scanner.last_time == sim.now()
+
+    for s in (0, 3, 19):
+        expected = _expected(sim, s, START + 30)
+        assert float(scanner.tracker.supertrend[s]) == pytest.approx(expected['supertrend'])
+        assert scanner.close[s] == expected['close']
+    forming = scanner.forming()[SYMBOLS[3]]
+    assert forming['time'] == sim.now() + 300
+    assert forming['low'] <= forming['close'] <= forming['high']
+
+
+def test_missed_boundaries_are_caught_up(sim, scanner):
+    scanner.update(sim.now() + 301)
+    sim.step(5)
+    assert scanner.close_candles(sim.now() + 301) == 5
+    assert scanner.close_candles(sim.now() + 301) == 0
+    expected = _expected(sim, 7, START + 5)
+    assert float(scanner.tracker.supertrend[7]) == pytest.approx(expected['supertrend'])
+
+
+def test_store_answers_before_rest(sim, tmp_path):
+    with AnalyticsStore(str(tmp_path / 'analytics.db')) as store:
+        first = _scanner(sim, store=store)
+        first.update(sim.now() + 301)
+        sim.step()
+        first.update(sim.now() + 301)
+
+        # A second scanner over the same store needs no history requests
+        second = _scanner(sim, store=store)
+        before = sim.request_count
+        second.update(sim.now() + 301)
+        assert sim.request_count - before == 1
+
+    fetched = _scanner(sim)
+    fetched.update(sim.now() + 301)
+    assert list(second.tracker.supertrend) == list(fetched.tracker.supertrend)
+
+
+def test_ranked_flips_are_fresh(sim, scanner):
+    scanner.fresh_bars = 1
+    scanner.update(sim.now() + 301)
+    seen = 0
+    for _ in range(40):
+        sim.step()
+        for flip in scanner.update(sim.now() + 301):
+            seen += 1
+            assert flip['bars_since_flip'] == 0
+            assert flip['flip_time'] == scanner.last_time
+            assert flip['signal'] in ('buy', 'sell')
+            assert flip['strength'] >= 0
+    assert seen > 0
+
+
+# ==================== Rate-limit buckets ====================
+
+def test_scans_leave_order_tokens_alone(sim):
+    order_limiter = RateLimiter(rate=1e-6, burst=1)
+    scanner = _scanner(sim, client={'order_limiter': order_limiter})
+    scanner.update(sim.now() + 301)
+    sim.step()
+    scanner.update(sim.now() + 301)
+    assert order_limiter.try_acquire()
+
+
+@pytest.mark.parametrize('endpoint,expected', [
+    ('/v2/orders', True), ('/v2/orders/bracket', True), ('/v2/positions/margined', True),
+    ('/v2/wallet/balances', True), ('/v2/fills', True),
+    ('/v2/tickers', False), ('/v2/history/candles', False), ('/v2/l2orderbook/BTCUSD', False),
+])
+def test_is_order_endpoint(endpoint, expected):
+    assert is_order_endpoint(endpoint) is expected
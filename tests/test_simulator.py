@@ -0,0 +1,158 @@
+"""
+Order matching and bracket legs of the exchange simulator, and the
+transports that put the real API client in front of it
+"""
+import threading
+import time
+
+import pytest
+import requests
+
+from api.rate_limiter import RateLimiter
+from api.request_metrics import RequestMetrics
+from simulator.exchange import DeltaExchangeSimulator, SimulatedDeltaAPI
+from simulator.server import SimulatorServer
+from api import DeltaAPI
+
+
+def _candles(moves=None, n=40):
+    """Flat candles at 100; moves maps index -> (high, low, close)"""
+    rows = []
+    for i in range(n):
+        high, low, close = (moves or {}).get(i, (100.5, 99.5, 100.0))
+        rows.append([1_700_000_100 + i * 300, 100.0, high, low, close, 10.0])
+    return rows
+
+
+def _legs(sim):
+    return {o['stop_order_type']: o for o in sim.order_log.values() if o.get('bracket_order')}
+
+
+def test_market_order_fills_across_the_spread(make_exchange):
+    sim, api = make_exchange(_candles())
+    order = api.place_market_order(1, 2, 'buy')['result']
+    assert order['state'] == 'closed'
+    assert float(order['average_fill_price']) == pytest.approx(100.01)
+    assert sim.positions[1]['size'] == 2
+    assert api.get_position(1)['result']['size'] == 2
+
+
+def test_resting_limit_fills_on_candle_close(make_exchange):
+    sim, api = make_exchange(_candles({11: (100.5, 98.0, 99.0)}))
+    order = api.place_limit_order(1, 1, 'buy', 99.0)['result']
+    assert order['state'] == 'open'
+    sim.step()
+    assert sim.order_log[order['id']]['state'] == 'closed'
+    assert sim.positions[1] == {'size': 1.0, 'entry_price': 99.0, 'realized_pnl': 0.0}
+
+
+def test_bracket_stop_loss_cancels_take_profit(make_exchange):
+    sim, api = make_exchange(_candles({15: (100.5, 94.0, 95.0)}))
+    api.place_bracket_order(1, 5, 'buy', stop_loss_price=96.0, take_profit_price=110.0)
+    legs = _legs(sim)
+    assert {k: (o['side'], o['size'], o['state']) for k, o in legs.items()} == {
+        'stop_loss_order': ('sell', 5.0, 'pending'),
+        'take_profit_order': ('sell', 5.0, 'pending'),
+    }
+
+    sim.step(5)
+    assert legs['stop_loss_order']['state'] == 'closed'
+    assert legs['take_profit_order']['state'] == 'cancelled'
+    assert sim.positions[1]['size'] == 0
+    assert sim.positions[1]['realized_pnl'] == pytest.approx((96.0 - 100.01) * 5)
+    assert sim.orders == {}
+
+
+def test_take_profit_gap_fills_at_open(make_exchange):
+    candles = _candles()
+    candles[15] = [candles[15][0], 112.0, 113.0, 111.0, 112.0, 10.0]
+    sim, api = make_exchange(candles)
+    api.place_bracket_order(1, 5, 'buy', stop_loss_price=96.0, take_profit_price=110.0)
+    sim.step(5)
+    legs = _legs(sim)
+    assert float(legs['take_profit_order']['average_fill_price']) == 112.0
+    assert legs['stop_loss_order']['state'] == 'cancelled'
+
+
+def test_closing_the_position_cancels_its_bracket(make_exchange):
+    sim, api = make_exchange(_candles())
+    api.place_market_order(1, 3, 'sell')
+    api.place_position_bracket(1, stop_loss_price=104.0, take_profit_price=95.0)
+    assert {o['side'] for o in _legs(sim).values()} == {'buy'}
+    assert len(sim.orders) == 2
+
+    api.place_market_order(1, 3, 'buy', reduce_only=True)
+    assert sim.positions[1]['size'] == 0
+    assert sim.orders == {}
+
+
+def test_position_bracket_needs_a_position(make_exchange):
+    sim, api = make_exchange(_candles())
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        api.place_position_bracket(1, stop_loss_price=90.0)
+    assert error.value.response.status_code == 400
+
+
+def test_reduce_only_never_opens(make_exchange):
+    sim, api = make_exchange(_candles())
+    order = api.place_market_order(1, 1, 'sell', reduce_only=True)['result']
+    assert order['state'] == 'cancelled'
+    assert sim.positions[1]['size'] == 0
+
+
+def test_history_serves_only_closed_candles(make_exchange):
+    sim, api = make_exchange(_candles())
+    now = sim.now()
+    rows = sim.handle('GET', '/v2/history/candles',
+                      params={'symbol': 'ETHUSD', 'resolution': '5m',
+                              'start': now - 3000, 'end': now + 3000})['result']
+    assert rows[0]['time'] == now
+    assert len(rows) == 11
+
+
+# ==================== Transports ====================
+
+class CountingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(rate=1e9, burst=10 ** 9)
+        self.calls = 0
+
+    def acquire(self, cost=1.0, timeout=None):
+        self.calls += 1
+        return super().acquire(cost, timeout)
+
+
+def test_client_request_path_runs_against_the_simulator():
+    sim = DeltaExchangeSimulator(fail_endpoints={'/v2/tickers': 1.0})
+    sim.load_candles('ETHUSD', _candles())
+    metrics = RequestMetrics()
+    api = SimulatedDeltaAPI(sim, metrics=metrics, limiter=CountingLimiter(),
+                            order_limiter=CountingLimiter(), max_retries=2,
+                            retry_backoff_sec=0)
+
+    api.get_products()
+    api.place_market_order(1, 1, 'buy')
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        api.get_ticker('ETHUSD')
+    assert error.value.response.status_code == 503
+
+    # The failing GET went through the client's retries, each taking a token
+    assert (api.limiter.calls, api.order_limiter.calls) == (4, 1)
+    tickers = metrics.snapshot()['endpoints']['GET /v2/tickers/{symbol}']
+    assert (tickers['errors'], tickers['retries']) == (1, 2)
+
+
+def test_server_latency_overlaps_concurrent_requests():
+    sim = DeltaExchangeSimulator(latency_sec=0.3)
+    sim.load_candles('ETHUSD', _candles())
+    with SimulatorServer(sim) as server:
+        api = DeltaAPI(api_key='x', api_secret='y', base_url=server.base_url)
+        threads = [threading.Thread(target=api.get_products) for _ in range(4)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    assert sim.request_count == 4
+    assert elapsed < 0.3 * 3
@@ -0,0 +1,133 @@
+"""
+Supertrend decisions, order plans and their submission
+"""
+import pytest
+
+from Bot.journal import TradeJournal
+from Bot.strategy import SupertrendStrategy, build_order_plan
+from Bot.trading_bot import TradingBot
+
+
+def _row(trend, close=100.0, supertrend=95.0, atr=2.0):
+    return {'trend': trend, 'close': close, 'supertrend': supertrend, 'atr': atr}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    with TradeJournal(str(tmp_path / 'journal.jsonl')) as journal:
+        yield journal
+
+
+# ==================== Order plans ====================
+
+def test_build_order_plan_long():
+    plan = build_order_plan('long', 5, 100.0, 95.0, 110.0)
+    assert (plan['entry_side'], plan['size'], plan['risk_reward_ratio']) == ('buy', 5, 2.0)
+    assert [(leg['role'], leg['side'], leg['reduce_only']) for leg in plan['legs']] == [
+        ('entry', 'buy', False), ('stop_loss', 'sell', True), ('take_profit', 'sell', True)]
+    assert [leg.get('stop_price') for leg in plan['legs']] == [None, 95.0, 110.0]
+
+
+def test_build_order_plan_short_without_target():
+    plan = build_order_plan('short', 3, 100.0, 104.0)
+    assert plan['entry_side'] == 'sell'
+    assert plan['take_profit'] is None and plan['risk_reward_ratio'] is None
+    assert [(leg['role'], leg['side']) for leg in plan['legs']] == [('entry', 'sell'),
+                                                                    ('stop_loss', 'buy')]
+    # No risk, no ratio
+    assert build_order_plan('long', 1, 100.0, 100.0, 110.0)['risk_reward_ratio'] is None
+
+
+# ==================== Decisions ====================
+
+@pytest.mark.parametrize('prev,curr,side,target', [
+    ('down', _row('up', supertrend=95.0), 'long', 103.0),
+    ('up', _row('down', supertrend=105.0), 'short', 97.0),
+])
+def test_decide_enters_with_atr_target(prev, curr, side, target):
+    decision = SupertrendStrategy(size=5, target_atr=1.5).decide(_row(prev), curr, None)
+    assert (decision['action'], decision['side']) == ('enter', side)
+    assert decision['stop_loss'] == curr['supertrend']
+    assert decision['take_profit'] == pytest.approx(target)
+    plan = decision['plan']
+    assert (plan['take_profit'], plan['stop_loss'], plan['size']) == \
+        (decision['take_profit'], decision['stop_loss'], 5)
+    assert plan['legs'][-1]['role'] == 'take_profit'
+
+
+def test_decide_without_target_or_atr():
+    flip = (_row('down'), _row('up'))
+    assert SupertrendStrategy(size=5).decide(*flip, None)['take_profit'] is None
+    no_atr = dict(flip[1], atr=None)
+    decision = SupertrendStrategy(target_atr=2).decide(flip[0], no_atr, None)
+    assert decision['action'] == 'enter'
+    assert decision['take_profit'] is None and decision['plan'] is None
+
+
+def test_decide_exits_and_holds():
+    strategy = SupertrendStrategy(size=5, target_atr=2)
+    exit_ = strategy.decide(_row('up'), _row('down', supertrend=105.0), 'long')
+    assert (exit_['action'], exit_['take_profit'], exit_['plan']) == ('exit', None, None)
+    assert strategy.decide(_row('up'), _row('up'), 'long')['action'] == 'hold'
+
+
+# ==================== Submission ====================
+
+def _plan(side='long'):
+    return SupertrendStrategy(size=5, target_atr=5).decide(
+        _row('down' if side == 'long' else 'up'),
+        _row('up' if side == 'long' else 'down', supertrend=95.0 if side == 'long' else 105.0),
+        None)['plan']
+
+
+def _brackets(sim):
+    return sorted((o['stop_order_type'], o['side'], o['size'], float(o['stop_price']))
+                  for o in sim.orders.values() if o.get('bracket_order'))
+
+
+def test_submit_plan_as_bracket_order(make_exchange, journal):
+    sim, api = make_exchange()
+    order = TradingBot(client=api, journal=journal).submit_plan('ETHUSD', _plan())
+
+    assert order['result']['bracket_stop_loss_price'] is not None
+    assert sim.positions[1]['size'] == 5
+    assert _brackets(sim) == [('stop_loss_order', 'sell', 5, 95.0),
+                              ('take_profit_order', 'sell', 5, 110.0)]
+    (stop,) = journal.query('ETHUSD', types=('stop_loss',))
+    assert (stop['side'], stop['size'], stop['stop_price'], stop['take_profit']) == \
+        ('sell', 5, 95.0, 110.0)
+
+
+class PartialExecution:
+    """Execution engine stand-in that fills `filled` contracts with one market order"""
+
+    def __init__(self, api, filled):
+        self.api = api
+        self.filled = filled
+
+    def execute(self, symbol, product_id, side, size, reduce_only=False):
+        order = self.api.place_market_order(product_id, self.filled, side,
+                                            reduce_only=reduce_only)['result']
+        return {'filled_size': self.filled, 'orders': [order]}
+
+
+def test_submit_plan_with_smart_entry(make_exchange, journal):
+    sim, api = make_exchange()
+    bot = TradingBot(client=api, journal=journal, execution=PartialExecution(api, 3))
+    report = bot.submit_plan('ETHUSD', _plan('short'))
+
+    assert report['filled_size'] == 3
+    assert sim.positions[1]['size'] == -3
+    # Exit legs are attached to the position after the entry
+    assert _brackets(sim) == [('stop_loss_order', 'buy', 3, 105.0),
+                              ('take_profit_order', 'buy', 3, 90.0)]
+    (stop,) = journal.query('ETHUSD', types=('stop_loss',))
+    assert (stop['side'], stop['size'], stop['stop_price']) == ('buy', 3, 105.0)
+
+
+def test_submit_plan_unfilled_smart_entry_attaches_nothing(make_exchange, journal):
+    sim, api = make_exchange()
+    bot = TradingBot(client=api, journal=journal, execution=PartialExecution(api, 0))
+    assert bot.submit_plan('ETHUSD', _plan()) is None
+    assert _brackets(sim) == []
+    assert journal.query('ETHUSD', types=('stop_loss',)) == []
@@ -0,0 +1,70 @@
+"""
+Queued JSON-lines logging with bound context
+"""
+import json
+import logging
+
+import pytest
+
+from utils.structured_logging import (JsonFormatter, bind_context, clear_context, log_context,
+                                      setup_logging, shutdown_logging)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """setup_logging into a temp file; the root logger is restored afterwards"""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    path = tmp_path / 'bot.log'
+    setup_logging(str(path), level=logging.DEBUG, console=False)
+    yield path
+    shutdown_logging()
+    clear_context()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def _lines(path):
+    shutdown_logging()
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_records_carry_context_and_extra(log_file):
+    logger = logging.getLogger('bot.test')
+    bind_context(cycle_id=3, symbol='ETHUSD')
+    logger.info("  order placed ", extra={'latency_ms': 41.2, 'order_id': 7})
+    with log_context(symbol='BTCUSD', stage='exit'):
+        logger.warning("closing %s", 'long')
+    logger.debug("after block")
+
+    placed, closing, after = _lines(log_file)
+    assert placed['msg'] == 'order placed' and placed['logger'] == 'bot.test'
+    assert (placed['cycle_id'], placed['symbol'], placed['latency_ms'], placed['order_id']) == \
+        (3, 'ETHUSD', 41.2, 7)
+    assert (closing['level'], closing['msg'], closing['symbol'], closing['stage']) == \
+        ('WARNING', 'closing long', 'BTCUSD', 'exit')
+    assert after['symbol'] == 'ETHUSD' and 'stage' not in after
+
+
+def test_exceptions_are_formatted_before_enqueue(log_file):
+    try:
+        raise ValueError("bad tick")
+    except ValueError:
+        logging.getLogger('bot.test').error("cycle failed", exc_info=True)
+    (entry,) = _lines(log_file)
+    assert 'ValueError: bad tick' in entry['exc']
+
+
+def test_setup_is_idempotent(log_file):
+    assert setup_logging(str(log_file)) is setup_logging(None)
+
+
+def test_formatter_falls_back_to_str():
+    record = logging.LogRecord('x', logging.INFO, __file__, 1, "msg", None, None)
+    record.when = object()
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['when'].startswith('<object object')
+    assert set(entry) == {'ts', 'level', 'logger', 'msg', 'when'}
@@ -0,0 +1,140 @@
+"""
+Every SuperTrend implementation must reproduce calculate_supertrend's
+pure-Python recursion exactly
+"""
+import math
+
+import pytest
+
+import Indicators.SuperTrend.kernels as kernels
+import Indicators.SuperTrend.supertrend as supertrend
+from api.candles import CandleColumns
+from backtest.Supertrend_backtest import SupertrendBacktest
+from benchmarks.common import synthetic_candles
+from Indicators.SuperTrend.supertrend import SupertrendTracker, calculate_supertrend
+
+FIELDS = ('atr', 'final_upper', 'final_lower', 'supertrend')
+
+
+@pytest.fixture
+def candles():
+    return synthetic_candles(2000, step=300, seed=7)
+
+
+@pytest.fixture
+def reference(monkeypatch):
+    """calculate_supertrend on its pure-Python path"""
+    def run(data, period=10, multiplier=3):
+        with monkeypatch.context() as m:
+            m.setattr(supertrend, 'HAVE_NUMBA', False)
+            return calculate_supertrend(data, period, multiplier)
+    return run
+
+
+@pytest.fixture(params=['compiled', 'python'])
+def kernel_backend(request, monkeypatch):
+    """Run the kernels compiled (numba) and as plain Python over array buffers"""
+    if request.param == 'compiled':
+        if not kernels.HAVE_NUMBA:
+            pytest.skip("numba not installed")
+        return request.param
+    if kernels.HAVE_NUMBA:
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', False)
+        monkeypatch.setattr(kernels, 'supertrend_kernel', kernels.supertrend_kernel.py_func)
+        monkeypatch.setattr(kernels, 'sl_target_kernel', kernels.sl_target_kernel.py_func)
+    return request.param
+
+
+def _same(a, b):
+    if a is None or (isinstance(a, float) and math.isnan(a)):
+        return b is None or (isinstance(b, float) and math.isnan(b))
+    return a == b
+
+
+def _reference_sl_target(data, sl_pct, target_pct):
+    """Row-based SL/target scan the kernel replaced"""
+    trades = []
+    side = entry = entry_time = None
+    for curr, nxt in zip(data, data[1:]):
+        if side is None:
+            if curr["trend"] == "down" and nxt["trend"] == "up":
+                side = "long"
+            elif curr["trend"] == "up" and nxt["trend"] == "down":
+                side = "short"
+            else:
+                continue
+            entry, entry_time = nxt["close"], nxt["time"]
+            continue
+
+        exit_price = reason = None
+        exit_time = curr["time"]
+        if side == "long":
+            stop, target = entry * (1 - sl_pct / 100), entry * (1 + target_pct / 100)
+            if curr["low"] <= stop:
+                exit_price, reason = stop, "SL"
+            elif curr["high"] >= target:
+                exit_price, reason = target, "TARGET"
+        else:
+            stop, target = entry * (1 + sl_pct / 100), entry * (1 - target_pct / 100)
+            if curr["high"] >= stop:
+                exit_price, reason = stop, "SL"
+            elif curr["low"] <= target:
+                exit_price, reason = target, "TARGET"
+        if exit_price is None and (
+                (side == "long" and curr["trend"] == "up" and nxt["trend"] == "down") or
+                (side == "short" and curr["trend"] == "down" and nxt["trend"] == "up")):
+            exit_price, reason, exit_time = nxt["close"], "TREND_FLIP", nxt["time"]
+        if exit_price is None:
+            continue
+
+        pnl = exit_price - entry if side == "long" else entry - exit_price
+        trades.append({"side": side, "entry_time": entry_time, "exit_time": exit_time,
+                       "entry": round(entry, 5), "exit": round(exit_price, 5),
+                       "pnl_pct": round(pnl / entry * 100, 2), "exit_reason": reason})
+        side = entry = entry_time = None
+    return trades
+
+
+# ==================== Single symbol ====================
+
+@pytest.mark.parametrize('period,multiplier', [(10, 3), (7, 2.5)])
+def test_kernel_rows_match_reference(candles, reference, kernel_backend, monkeypatch,
+                                     period, multiplier):
+    monkeypatch.setattr(supertrend, 'HAVE_NUMBA', True)
+    expected = reference(candles, period, multiplier)
+    assert calculate_supertrend(candles, period, multiplier) == expected
+    assert calculate_supertrend(CandleColumns(*map(list, zip(*candles))),
+                                period, multiplier) == expected
+
+
+def test_kernel_arrays_match_reference(candles, reference, kernel_backend):
+    expected = reference(candles)
+    out = kernels.supertrend_arrays(candles)
+    assert list(out['time']) == [row['time'] for row in expected]
+    for name in FIELDS:
+        assert all(_same(row[name], float(v)) for row, v in zip(expected, out[name]))
+    assert [int(c) for c in out['trend']] == kernels.trend_codes(expected)
+
+
+def test_short_history_is_empty(reference):
+    rows = synthetic_candles(10)
+    assert reference(rows) == []
+    assert calculate_supertrend(rows) == []
+    assert len(kernels.supertrend_arrays(rows)['atr']) == 0
+
+
+def test_tracker_matches_reference(candles, reference):
+    tracker = SupertrendTracker(10, 3)
+    assert [tracker.update(c) for c in candles] == reference(candles)
+
+
+# ==================== Backtest ====================
+
+@pytest.mark.parametrize('sl_pct,target_pct', [(12, 3), (0.5, 0.8), (1, 100)])
+def test_sl_target_backtest_matches_reference(candles, reference, kernel_backend,
+                                              sl_pct, target_pct):
+    bt = SupertrendBacktest()
+    bt.data = reference(candles)
+    trades = bt.backtest_sl_target(sl_pct, target_pct)
+    assert trades
+    assert trades == _reference_sl_target(bt.data, sl_pct, target_pct)
@@ -0,0 +1,76 @@
+"""
+Batched multi-symbol SuperTrend must match the single-symbol recursion
+"""
+import math
+
+import pytest
+
+import Indicators.SuperTrend.batch as batch
+import Indicators.SuperTrend.kernels as kernels
+import Indicators.SuperTrend.supertrend as supertrend
+from benchmarks.common import synthetic_candles
+from Indicators.SuperTrend.supertrend import calculate_supertrend
+
+FIELDS = ('atr', 'final_upper', 'final_lower', 'supertrend')
+
+
+@pytest.fixture
+def reference(monkeypatch):
+    """calculate_supertrend on its pure-Python path"""
+    def run(data, period=10, multiplier=3):
+        with monkeypatch.context() as m:
+            m.setattr(supertrend, 'HAVE_NUMBA', False)
+            return calculate_supertrend(data, period, multiplier)
+    return run
+
+
+def _same(a, b):
+    if a is None or (isinstance(a, float) and math.isnan(a)):
+        return b is None or (isinstance(b, float) and math.isnan(b))
+    return a == b
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def batch_backend(request, monkeypatch):
+    if request.param == 'numpy':
+        if not batch.HAVE_NUMPY:
+            pytest.skip("numpy not installed")
+    else:
+        monkeypatch.setattr(batch, 'HAVE_NUMPY', False)
+    return request.param
+
+
+@pytest.fixture
+def universe():
+    return [synthetic_candles(300, seed=s, price=50.0 + 10 * s) for s in range(12)]
+
+
+def _columns(universe, k):
+    return [[c[k] for c in rows] for rows in universe]
+
+
+def test_batch_matches_reference(universe, reference, batch_backend):
+    out = batch.supertrend_batch(_columns(universe, 2), _columns(universe, 3),
+                                 _columns(universe, 4))
+    for s, rows in enumerate(universe):
+        expected = reference(rows)
+        for t, row in enumerate(expected):
+            for name in FIELDS:
+                assert _same(row[name], float(out[name][s][t]))
+            assert int(out['trend'][s][t]) == kernels.TREND_CODES.get(row['trend'], 0)
+
+
+def test_batch_tracker_signals_match_reference(universe, reference, batch_backend):
+    high, low, close = (_columns(universe, k) for k in (2, 3, 4))
+    tracker = batch.SupertrendBatchTracker(len(universe))
+    expected = [reference(rows) for rows in universe]
+    for t in range(len(close[0])):
+        tracker.update([h[t] for h in high], [l[t] for l in low], [c[t] for c in close])
+        flips = []
+        for s, rows in enumerate(expected):
+            prev = rows[t - 1]['trend'] if t else None
+            if prev == 'down' and rows[t]['trend'] == 'up':
+                flips.append((s, 'buy'))
+            elif prev == 'up' and rows[t]['trend'] == 'down':
+                flips.append((s, 'sell'))
+        assert tracker.signals() == flips
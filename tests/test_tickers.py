@@ -0,0 +1,75 @@
+"""
+All-tickers snapshot and its TTL cache
+"""
+import pytest
+
+from api.tickers import TickerTable
+from utils.data_fetcher import DataFetcher
+
+SYMBOLS = ('ETHUSD', 'BTCUSD', 'SOLUSD')
+
+
+@pytest.fixture
+def exchange(make_exchange):
+    sim, api = make_exchange()
+    for symbol in SYMBOLS[1:]:
+        sim.load_candles(symbol, [[1_700_000_100 + i * 300, 50.0, 51.0, 49.0, 50.5, 3.0]
+                                  for i in range(50)], start_index=10)
+    return sim, DataFetcher(client=api)
+
+
+def test_from_result_parses_columns():
+    table = TickerTable.from_result([
+        {'symbol': 'ETHUSD', 'mark_price': '100.5', 'close': 100.0, 'volume': '12',
+         'quotes': {'best_bid': '99.5', 'best_ask': '100.5'}, 'timestamp': 1700000000},
+        {'symbol': 'BTCUSD', 'mark_price': '', 'close': None, 'bid': '1', 'ask': '3'},
+        {'mark_price': '1'},
+    ])
+    assert len(table) == 2 and 'ETHUSD' in table and 'XRPUSD' not in table
+    assert table.price('ETHUSD') == 100.5
+    assert table.price('ETHUSD', 'last_price') == 100.0
+    assert table.price('XRPUSD') is None
+    eth = table.get('ETHUSD')
+    assert (eth['bid'], eth['ask'], eth['spread'], eth['volume_24h']) == (99.5, 100.5, 1.0, 12.0)
+    assert eth['timestamp'] == 1700000000
+    btc = table.get('BTCUSD')
+    assert (btc['mark_price'], btc['last_price'], btc['spread'], btc['timestamp']) == \
+        (0.0, 0.0, 2.0, 0)
+    assert table.get('XRPUSD') is None
+
+
+def test_batch_matches_single_symbol_prices(exchange):
+    sim, fetcher = exchange
+    before = sim.request_count
+    prices = fetcher.get_live_prices_batch(list(SYMBOLS) + ['XRPUSD'])
+    assert sim.request_count - before == 1
+    assert prices['XRPUSD'] is None
+
+    for symbol in SYMBOLS:
+        single = fetcher.get_live_price(symbol)
+        single['timestamp'] = int(single['timestamp'] or 0)
+        assert prices[symbol] == single
+
+
+def test_snapshot_is_shared_for_max_age(exchange):
+    sim, fetcher = exchange
+    before = sim.request_count
+    table = fetcher.get_ticker_table(max_age=60)
+    assert fetcher.get_ticker_table(max_age=60) is table
+    assert fetcher.get_live_prices_batch(['ETHUSD'], max_age=60)['ETHUSD'] == table.get('ETHUSD')
+    assert sim.request_count - before == 1
+
+    # Expired, or max_age=0: refreshed
+    table.fetched_at -= 61
+    assert fetcher.get_ticker_table(max_age=60) is not table
+    fetcher.get_ticker_table(max_age=0)
+    assert sim.request_count - before == 3
+
+
+def test_request_failure_prices_none(exchange, monkeypatch):
+    _, fetcher = exchange
+
+    def fail(contract_types=None):
+        raise ConnectionError("down")
+    monkeypatch.setattr(fetcher.client, 'get_ticker_table', fail)
+    assert fetcher.get_live_prices_batch(['ETHUSD', 'BTCUSD']) == {'ETHUSD': None, 'BTCUSD': None}
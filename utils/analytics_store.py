@@ -0,0 +1,349 @@
+"""
+SQLite analytics store for candles, indicators, signals, backtest runs and trades
+
+One WAL-mode database file replaces ad-hoc JSON dumps for analysis. Range
+queries hit the (symbol, resolution, time) primary keys, which are
+clustered (WITHOUT ROWID) and therefore covering; helpers return typed
+arrays rather than lists of dicts.
+
+Usage:
+    store = AnalyticsStore("analytics.db")
+    store.insert_candles("ETHUSD", "5m", candles)
+    store.insert_supertrend("ETHUSD", "5m", supertrend_data)
+    run_id = store.save_backtest("sl_target", trades, symbol="ETHUSD", resolution="5m")
+    closes = store.candle_columns("ETHUSD", "5m", start, end).close
+"""
+import json
+import sqlite3
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from api.candles import CandleColumns
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    symbol      TEXT    NOT NULL,
+    resolution  TEXT    NOT NULL,
+    time        INTEGER NOT NULL,
+    open        REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, resolution, time)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS indicators (
+    symbol      TEXT    NOT NULL,
+    resolution  TEXT    NOT NULL,
+    name        TEXT    NOT NULL,
+    time        INTEGER NOT NULL,
+    value       REAL,
+    PRIMARY KEY (symbol, resolution, name, time)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS signals (
+    id          INTEGER PRIMARY KEY,
+    symbol      TEXT    NOT NULL,
+    resolution  TEXT    NOT NULL,
+    time        INTEGER NOT NULL,
+    signal      TEXT    NOT NULL,
+    price       REAL,
+    source      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_signals_symbol_time
+    ON signals (symbol, resolution, time, signal, price);
+
+CREATE TABLE IF NOT EXISTS backtest_runs (
+    run_id      INTEGER PRIMARY KEY,
+    name        TEXT    NOT NULL,
+    symbol      TEXT,
+    resolution  TEXT,
+    created_at  INTEGER NOT NULL,
+    params      TEXT,
+    metrics     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_name ON backtest_runs (name, created_at);
+
+CREATE TABLE IF NOT EXISTS trades (
+    run_id      INTEGER NOT NULL REFERENCES backtest_runs(run_id) ON DELETE CASCADE,
+    seq         INTEGER NOT NULL,
+    side        TEXT    NOT NULL,
+    entry_time  INTEGER,
+    exit_time   INTEGER,
+    entry_price REAL,
+    exit_price  REAL,
+    pnl         REAL,
+    pnl_pct     REAL,
+    exit_reason TEXT,
+    afe         REAL,
+    mae         REAL,
+    extra       TEXT,
+    PRIMARY KEY (run_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_trades_run_time
+    ON trades (run_id, entry_time, side, pnl_pct);
+"""
+
+# Supertrend row fields stored as indicator series; trend is encoded as +1/-1
+SUPERTREND_SERIES = ('atr', 'final_upper', 'final_lower', 'supertrend', 'trend')
+_TREND_CODE = {'up': 1.0, 'down': -1.0}
+
+_TRADE_COLUMNS = ('side', 'entry_time', 'exit_time', 'entry_price', 'exit_price',
+                  'pnl', 'pnl_pct', 'exit_reason', 'afe', 'mae')
+_TRADE_KNOWN = set(_TRADE_COLUMNS) | {'entry', 'exit'}
+
+
+def _range_clause(start: Optional[int], end: Optional[int], column: str = 'time') -> Tuple[str, list]:
+    clause, args = '', []
+    if start is not None:
+        clause += f' AND {column} >= ?'
+        args.append(start)
+    if end is not None:
+        clause += f' AND {column} <= ?'
+        args.append(end)
+    return clause, args
+
+
+class AnalyticsStore:
+    """Embedded SQLite store (WAL mode) for market data and backtest analytics"""
+
+    def __init__(self, path: str = 'analytics.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ==================== Bulk inserts ====================
+
+    def insert_candles(self, symbol: str, resolution: str, candles: Iterable[Sequence]) -> int:
+        """
+        Upsert candles given as [time, open, high, low, close, volume] rows or CandleColumns
+
+        Returns:
+            Number of rows written
+        """
+        rows = [(symbol, resolution, int(c[0]), c[1], c[2], c[3], c[4], c[5]) for c in candles]
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def insert_indicator(self, symbol: str, resolution: str, name: str,
+                         times: Sequence[int], values: Sequence[float]) -> int:
+        """Upsert one indicator series"""
+        rows = [(symbol, resolution, name, int(t), v) for t, v in zip(times, values)]
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO indicators VALUES (?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def insert_supertrend(self, symbol: str, resolution: str, rows: List[Dict]) -> int:
+        """Store calculate_supertrend output as indicator series (warm-up rows skipped)"""
+        rows = [r for r in rows if r.get('trend') is not None]
+        with self.conn:
+            for name in SUPERTREND_SERIES:
+                if name == 'trend':
+                    data = [(symbol, resolution, name, r['time'], _TREND_CODE[r['trend']]) for r in rows]
+                else:
+                    data = [(symbol, resolution, name, r['time'], r[name]) for r in rows]
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO indicators VALUES (?, ?, ?, ?, ?)', data)
+        return len(rows)
+
+    def insert_signals(self, symbol: str, resolution: str, signals: Iterable[Dict],
+                       source: Optional[str] = None) -> int:
+        """Append signals given as {'time', 'signal', 'price'} dicts"""
+        rows = [(symbol, resolution, int(s['time']), s['signal'], s.get('price'), source)
+                for s in signals]
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO signals (symbol, resolution, time, signal, price, source) '
+                'VALUES (?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def save_backtest(self, name: str, trades: List[Dict], symbol: Optional[str] = None,
+                      resolution: Optional[str] = None, params: Optional[Dict] = None,
+                      metrics: Optional[Dict] = None) -> int:
+        """
+        Store one backtest run and its trades
+
+        Accepts every SupertrendBacktest trade layout (entry_price/exit_price
+        or entry/exit); pnl_pct is derived when missing and unknown fields
+        are kept as JSON in `extra`.
+
+        Returns:
+            run_id
+        """
+        from backtest.metrics import trade_returns_pct
+
+        rows = []
+        for seq, (t, return_pct) in enumerate(zip(trades, trade_returns_pct(trades))):
+            extra = {k: v for k, v in t.items() if k not in _TRADE_KNOWN}
+            rows.append((
+                seq, t['side'], t.get('entry_time'), t.get('exit_time'),
+                t.get('entry_price', t.get('entry')), t.get('exit_price', t.get('exit')),
+                t.get('pnl'), t.get('pnl_pct', return_pct), t.get('exit_reason'),
+                t.get('afe'), t.get('mae'),
+                json.dumps(extra) if extra else None,
+            ))
+
+        with self.conn:
+            cur = self.conn.execute(
+                'INSERT INTO backtest_runs (name, symbol, resolution, created_at, params, metrics) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (name, symbol, resolution, int(time.time()),
+                 json.dumps(params) if params else None,
+                 json.dumps(metrics, default=str) if metrics else None))
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                'INSERT INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(run_id,) + row for row in rows])
+        return run_id
+
+    # ==================== Queries ====================
+
+    def candle_columns(self, symbol: str, resolution: str, start: Optional[int] = None,
+                       end: Optional[int] = None) -> CandleColumns:
+        """Candles in [start, end] as typed columns, oldest → newest"""
+        clause, args = _range_clause(start, end)
+        cur = self.conn.execute(
+            'SELECT time, open, high, low, close, volume FROM candles '
+            f'WHERE symbol = ? AND resolution = ?{clause} ORDER BY time',
+            [symbol, resolution] + args)
+        columns = CandleColumns()
+        t, o, h, l, c, v = columns.columns()
+        for row in cur:
+            t.append(row[0])
+            o.append(row[1])
+            h.append(row[2])
+            l.append(row[3])
+            c.append(row[4])
+            v.append(row[5])
+        return columns
+
+    def indicator_series(self, symbol: str, resolution: str, name: str,
+                         start: Optional[int] = None, end: Optional[int] = None) -> Tuple[array, array]:
+        """
+        Returns:
+            (times as array('q'), values as array('d'))
+        """
+        clause, args = _range_clause(start, end)
+        cur = self.conn.execute(
+            'SELECT time, value FROM indicators '
+            f'WHERE symbol = ? AND resolution = ? AND name = ?{clause} ORDER BY time',
+            [symbol, resolution, name] + args)
+        times, values = array('q'), array('d')
+        for t, v in cur:
+            times.append(t)
+            values.append(v)
+        return times, values
+
+    def supertrend_rows(self, symbol: str, resolution: str, start: Optional[int] = None,
+                        end: Optional[int] = None) -> List[Dict]:
+        """
+        Rebuild calculate_supertrend-style rows (for SupertrendBacktest.data)
+
+        Only candles with stored Supertrend values are returned.
+        """
+        candles = self.candle_columns(symbol, resolution, start, end)
+        series = {name: self.indicator_series(symbol, resolution, name, start, end)
+                  for name in SUPERTREND_SERIES}
+        index = {t: i for i, t in enumerate(series['supertrend'][0])}
+
+        rows = []
+        for t, o, h, l, c, _ in candles:
+            i = index.get(t)
+            if i is None:
+                continue
+            rows.append({
+                'time': t, 'open': o, 'high': h, 'low': l, 'close': c,
+                'atr': series['atr'][1][i],
+                'final_upper': series['final_upper'][1][i],
+                'final_lower': series['final_lower'][1][i],
+                'supertrend': series['supertrend'][1][i],
+                'trend': 'up' if series['trend'][1][i] > 0 else 'down',
+            })
+        return rows
+
+    def signals(self, symbol: str, resolution: str, start: Optional[int] = None,
+                end: Optional[int] = None) -> List[Tuple]:
+        """(time, signal, price) tuples, answered from the covering index"""
+        clause, args = _range_clause(start, end)
+        return self.conn.execute(
+            'SELECT time, signal, price FROM signals '
+            f'WHERE symbol = ? AND resolution = ?{clause} ORDER BY time',
+            [symbol, resolution] + args).fetchall()
+
+    def runs(self, name: Optional[str] = None) -> List[Dict]:
+        """Backtest runs, newest first"""
+        sql = 'SELECT run_id, name, symbol, resolution, created_at, params, metrics FROM backtest_runs'
+        args = []
+        if name is not None:
+            sql += ' WHERE name = ?'
+            args.append(name)
+        sql += ' ORDER BY run_id DESC'
+        out = []
+        for run_id, run_name, symbol, resolution, created_at, params, metrics in self.conn.execute(sql, args):
+            out.append({
+                'run_id': run_id, 'name': run_name, 'symbol': symbol, 'resolution': resolution,
+                'created_at': created_at,
+                'params': json.loads(params) if params else None,
+                'metrics': json.loads(metrics) if metrics else None,
+            })
+        return out
+
+    def trades(self, run_id: int, start: Optional[int] = None,
+               end: Optional[int] = None) -> List[Dict]:
+        """Trades of one run (entry_time in [start, end]) as dicts"""
+        clause, args = _range_clause(start, end, 'entry_time')
+        cur = self.conn.execute(
+            f'SELECT {", ".join(_TRADE_COLUMNS)}, extra FROM trades '
+            f'WHERE run_id = ?{clause} ORDER BY seq', [run_id] + args)
+        out = []
+        for row in cur:
+            trade = {k: v for k, v in zip(_TRADE_COLUMNS, row) if v is not None}
+            if row[-1]:
+                trade.update(json.loads(row[-1]))
+            out.append(trade)
+        return out
+
+    def trade_column(self, run_ids: Sequence[int], field: str = 'pnl_pct',
+                     side: Optional[str] = None) -> Dict[int, array]:
+        """
+        One numeric trade field per run, for cross-run comparison
+
+        Returns:
+            {run_id: array('d')}
+        """
+        if field not in _TRADE_COLUMNS or field in ('side', 'exit_reason'):
+            raise ValueError(f"Not a numeric trade field: {field}")
+        out = {run_id: array('d') for run_id in run_ids}
+        side_clause = ' AND side = ?' if side else ''
+        for run_id in run_ids:
+            values = out[run_id]
+            args = [run_id] + ([side] if side else [])
+            for (value,) in self.conn.execute(
+                    f'SELECT {field} FROM trades WHERE run_id = ?{side_clause} '
+                    f'AND {field} IS NOT NULL ORDER BY seq', args):
+                values.append(value)
+        return out
+
+    def compare_runs(self, run_ids: Sequence[int]) -> Dict[int, Dict]:
+        """Trade count, win rate and average/total pnl_pct per run, computed in SQL"""
+        placeholders = ','.join('?' * len(run_ids))
+        cur = self.conn.execute(
+            'SELECT run_id, COUNT(*), AVG(pnl_pct > 0) * 100, AVG(pnl_pct), SUM(pnl_pct) '
+            f'FROM trades WHERE run_id IN ({placeholders}) GROUP BY run_id', list(run_ids))
+        return {
+            run_id: {'trades': n, 'win_rate': win_rate, 'avg_pnl_pct': avg, 'total_pnl_pct': total}
+            for run_id, n, win_rate, avg, total in cur
+        }
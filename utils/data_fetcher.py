@@ -3,26 +3,48 @@ Data fetching utilities for Delta Exchange
 Pure data retrieval without indicator calculations
 """
 import json
+import logging
 from pathlib import Path
 
 # import pandas as pd
-from api import DeltaAPI
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, TYPE_CHECKING
+import threading
 import time
 
+if TYPE_CHECKING:
+    from api import DeltaAPI
+
+logger = logging.getLogger(__name__)
+
 
 class DataFetcher:
     """Helper class for fetching market data from Delta Exchange"""
     
-    def __init__(self, client: Optional[DeltaAPI] = None):
+    def __init__(self, client: Optional["DeltaAPI"] = None):
         """
         Initialize DataFetcher
         
         Args:
-            client: DeltaAPI client instance (optional)
+            client: DeltaAPI client instance (optional). When omitted, a
+                    DeltaAPI is created on first use, so export helpers and
+                    offline code never need API credentials.
         """
-        self.client = client or DeltaAPI()
+        self._client = client
+        self._ticker_cache: Dict = {}
+        self._ticker_lock = threading.Lock()
+
+    @property
+    def client(self) -> "DeltaAPI":
+        """DeltaAPI client, created lazily on first access"""
+        if self._client is None:
+            from api import DeltaAPI
+            self._client = DeltaAPI()
+        return self._client
+
+    @client.setter
+    def client(self, client: "DeltaAPI"):
+        self._client = client
     
     # ==================== Candlestick Data Methods ====================
     
@@ -59,6 +81,16 @@ class DataFetcher:
             Raw API response with candle data
         """
         return self.client.get_candles_in_batches(symbol, resolution, start, end)
+
+    def get_candle_columns_in_batches(self, symbol: str, resolution: str = '5m',
+                                      start: Optional[int] = None, end: Optional[int] = None):
+        """
+        Get candlestick data as typed columns (api.candles.CandleColumns)
+
+        Cheaper than get_candles_in_batches when the caller only needs to run
+        indicators over the history: no per-candle lists are built.
+        """
+        return self.client.get_candle_columns_in_batches(symbol, resolution, start, end)
         
     
     def get_candles_dataframe(self, symbol: str, resolution: str = '5m',
@@ -129,31 +161,72 @@ class DataFetcher:
     
     def get_multiple_timeframes(self, symbol: str, 
                                timeframes: List[str] = ['5m', '15m', '1h'],
-                               hours_back: int = 24) -> Dict:
+                               hours_back: int = 24,
+                               base_resolution: Optional[str] = None,
+                               columns: bool = False) -> Dict:
         """
         Fetch data for multiple timeframes at once
         
+        One base feed is fetched and every timeframe is resampled from it
+        (api.resample), so there is no extra request or rate-limit sleep per
+        timeframe.
+        
         Args:
             symbol: Trading pair
-            timeframes: List of timeframes to fetch
+            timeframes: List of timeframes to build
             hours_back: Hours of historical data for each timeframe
+            base_resolution: Feed to resample from (default: smallest timeframe)
+            columns: Return CandleColumns of closed bars only, without pandas
         
         Returns:
-            Dict with timeframe as key and DataFrame as value
+            Dict with timeframe as key and DataFrame as value (the last row is
+            the bar still forming), or CandleColumns when columns=True
         """
+        from api.resample import bucket_start, resample_candles, resolution_seconds
+
+        base = base_resolution or min(timeframes, key=resolution_seconds)
+        base_sec = resolution_seconds(base)
+        end_time = int(time.time())
+        # Start on a bucket boundary of the largest timeframe so no first bar is partial
+        start_time = bucket_start(end_time - (hours_back * 3600),
+                                  max(resolution_seconds(tf) for tf in timeframes))
+        if columns:
+            # Stop before the forming base candle so only closed bars are built
+            end_time = bucket_start(end_time, base_sec) - 1
+
+        logger.info(f"Fetching {base} data for {symbol} ({', '.join(timeframes)})...")
+        try:
+            base_columns = self.get_candle_columns_in_batches(symbol, base, start_time, end_time)
+        except Exception as e:
+            logger.error(f"Error fetching {base} data: {e}")
+            return {tf: None for tf in timeframes}
+
         data = {}
-        
         for tf in timeframes:
-            print(f"Fetching {tf} data for {symbol}...")
             try:
-                df = self.get_recent_candles(symbol, tf, hours_back)
-                data[tf] = df
-                time.sleep(0.2)  # Rate limiting to avoid API throttling
-            except Exception as e:
-                print(f"Error fetching {tf} data: {e}")
+                bars = resample_candles(base_columns, tf, base, include_partial=not columns)
+            except ValueError as e:
+                logger.error(f"Error building {tf} data: {e}")
                 data[tf] = None
+                continue
+            data[tf] = bars if columns else self._candles_to_dataframe(bars)
         
         return data
+
+    @staticmethod
+    def _candles_to_dataframe(candles):
+        """CandleColumns → DataFrame indexed by timestamp with OHLCV columns"""
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is required. Install with: pip install pandas")
+
+        df = pd.DataFrame({name: list(col) for name, col in
+                           zip(('timestamp', 'open', 'high', 'low', 'close', 'volume'),
+                               candles.columns())})
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+        df.set_index('timestamp', inplace=True)
+        return df
     
     # ==================== Real-time Market Data Methods ====================
     
@@ -346,37 +419,58 @@ class DataFetcher:
         data = {}
         
         for symbol in symbols:
-            print(f"Fetching data for {symbol}...")
+            logger.info(f"Fetching data for {symbol}...")
             try:
                 df = self.get_recent_candles(symbol, resolution, hours_back)
                 data[symbol] = df
                 time.sleep(0.2)  # Rate limiting
             except Exception as e:
-                print(f"Error fetching {symbol} data: {e}")
+                logger.error(f"Error fetching {symbol} data: {e}")
                 data[symbol] = None
         
         return data
     
-    def get_live_prices_batch(self, symbols: List[str]) -> Dict[str, Dict]:
+    def get_ticker_table(self, max_age: float = 1.0, contract_types: Optional[str] = None):
         """
-        Get live prices for multiple symbols
+        Snapshot of all tickers (api.tickers.TickerTable), shared for max_age seconds
+
+        Several consumers in one cycle get the same snapshot and the exchange
+        sees a single /v2/tickers request.
+        
+        Args:
+            max_age: Reuse a cached snapshot younger than this (0 forces a refresh)
+            contract_types: Optional product filter passed to the endpoint
+        """
+        with self._ticker_lock:
+            cached = self._ticker_cache.get(contract_types)
+            if cached is not None and cached.age < max_age:
+                return cached
+            table = self.client.get_ticker_table(contract_types)
+            self._ticker_cache[contract_types] = table
+            return table
+
+    def get_live_prices_batch(self, symbols: List[str], max_age: float = 1.0) -> Dict[str, Dict]:
+        """
+        Get live prices for multiple symbols from one all-tickers request
         
         Args:
             symbols: List of trading pairs
+            max_age: Accept a cached ticker snapshot up to this many seconds old
         
         Returns:
-            Dict with symbol as key and price data as value
+            Dict with symbol as key and price data (get_live_price layout) as value;
+            None for symbols missing from the listing or on request failure
         """
-        prices = {}
-        
-        for symbol in symbols:
-            try:
-                prices[symbol] = self.get_live_price(symbol)
-                time.sleep(0.1)  # Rate limiting
-            except Exception as e:
-                print(f"Error fetching price for {symbol}: {e}")
-                prices[symbol] = None
-        
+        try:
+            table = self.get_ticker_table(max_age)
+        except Exception as e:
+            logger.error(f"Error fetching tickers: {e}")
+            return {symbol: None for symbol in symbols}
+
+        prices = {symbol: table.get(symbol) for symbol in symbols}
+        missing = [s for s, p in prices.items() if p is None]
+        if missing:
+            logger.warning(f"⚠ No ticker for {', '.join(missing)}")
         return prices
     
     # ==================== Data Export Methods ====================
@@ -391,26 +485,48 @@ class DataFetcher:
         """
         try:
             df.to_csv(filename)
-            print(f"✓ Data exported to {filename}")
+            logger.info(f"✓ Data exported to {filename}")
         except Exception as e:
-            print(f"✗ Error exporting data: {e}")
+            logger.error(f"✗ Error exporting data: {e}")
     
-    def export_to_json(self, data: Dict, filename: str):
+    def export_to_json(self, data: Dict, filename: str, indent: bool = False,
+                       append: bool = False, key: str = 'time', background: bool = False):
         """
         Export data to JSON file
         
         Args:
             data: Dictionary or data structure
             filename: Output filename (e.g., 'market_data.json')
-        """
-        import json
-        
+            indent: Pretty-print instead of compact output
+            append: Append only rows newer than the last export as JSON lines
+                    (data must be a list of dicts ordered by `key`)
+            key: Row key used to find new rows in append mode
+            background: Write from the export thread and return immediately;
+                        data must not be mutated afterwards
+        """
+        from utils import json_export
+
+        def write():
+            if append:
+                written = json_export.appender.append(data, filename, key)
+                logger.info(f"✓ {written} new rows appended to {filename}")
+            else:
+                json_export.write_json_atomic(data, filename, indent=indent)
+                logger.info(f"✓ Data exported to {filename}")
+
+        if background:
+            json_export.exporter.submit(filename, write)
+            return
+
         try:
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
-            print(f"✓ Data exported to {filename}")
+            write()
         except Exception as e:
-            print(f"✗ Error exporting data: {e}")
+            logger.error(f"✗ Error exporting data: {e}")
+
+    def flush_exports(self, timeout: Optional[float] = None) -> bool:
+        """Wait for background exports to finish"""
+        from utils import json_export
+        return json_export.exporter.flush(timeout)
     
     
     # def export_to_json(
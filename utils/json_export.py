@@ -0,0 +1,248 @@
+"""
+Fast JSON export: pluggable serializer, atomic snapshots, append-only
+JSON lines and a background writer
+"""
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ==================== Serializers ====================
+
+def _orjson_dumps(obj, indent: bool = False) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=str, option=option)
+
+
+def _finite(obj):
+    """Copy of obj with NaN/Inf floats replaced by None"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+    try:
+        text = json.dumps(obj, default=str, allow_nan=False, **kwargs)
+    except ValueError:
+        # NaN/Inf: write null like orjson does, instead of invalid JSON
+        text = json.dumps(_finite(obj), default=str, allow_nan=False, **kwargs)
+    return text.encode('utf-8')
+
+
+_SERIALIZERS: Dict[str, Callable] = {'json': _json_dumps}
+if orjson is not None:
+    _SERIALIZERS['orjson'] = _orjson_dumps
+
+_dumps = _SERIALIZERS.get('orjson', _json_dumps)
+
+
+def set_serializer(name_or_fn):
+    """
+    Select the serializer used for exports
+
+    Args:
+        name_or_fn: 'orjson', 'json', or a callable (obj, indent) -> bytes
+    """
+    global _dumps
+    if callable(name_or_fn):
+        _dumps = name_or_fn
+    elif name_or_fn in _SERIALIZERS:
+        _dumps = _SERIALIZERS[name_or_fn]
+    else:
+        raise ValueError(f"Unknown serializer: {name_or_fn} (available: {', '.join(_SERIALIZERS)})")
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Serialize with the active serializer (compact unless indent)"""
+    return _dumps(obj, indent)
+
+
+# ==================== Writers ====================
+
+def write_json_atomic(data, filename: str, indent: bool = False, fsync: bool = False):
+    """
+    Write data as JSON via a temp file and os.replace
+
+    Readers see either the previous file or the complete new one. The temp
+    file is unique, so concurrent writers of the same file do not collide.
+    """
+    directory, name = os.path.split(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dumps(data, indent))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, filename)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _truncate_torn_tail(filename: str) -> bool:
+    """
+    Cut a JSON-lines file back to its last newline
+
+    An interrupted append leaves a partial last line; the next append would
+    otherwise be glued onto it.
+
+    Returns:
+        True if the file was truncated
+    """
+    try:
+        f = open(filename, 'r+b')
+    except FileNotFoundError:
+        return False
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return False
+        f.seek(end - 1)
+        if f.read(1) == b'\n':
+            return False
+        # Walk back block by block to the last complete line
+        pos = end
+        good = 0
+        while pos > 0:
+            block = min(pos, 65536)
+            pos -= block
+            f.seek(pos)
+            idx = f.read(block).rfind(b'\n')
+            if idx >= 0:
+                good = pos + idx + 1
+                break
+        logger.warning(f"⚠ {filename}: truncating torn tail at byte {good}")
+        f.truncate(good)
+        return True
+
+
+def _last_jsonl_key(filename: str, key: str):
+    """Key of the last complete line of a JSON-lines file, or None"""
+    try:
+        with open(filename, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            block = min(size, 65536)
+            f.seek(size - block)
+            tail = f.read(block)
+    except FileNotFoundError:
+        return None
+    for line in reversed(tail.splitlines()):
+        try:
+            return json.loads(line).get(key)
+        except ValueError:
+            continue
+    return None
+
+
+class JsonlAppender:
+    """
+    Append only rows newer than the last exported one
+
+    The last key per file is remembered in memory and recovered from the
+    file tail on first use, so restarts do not duplicate rows. A torn last
+    line left by an interrupted write is truncated at that point.
+    """
+
+    def __init__(self):
+        self._last: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def append(self, rows: List[Dict], filename: str, key: str = 'time') -> int:
+        """
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            if filename not in self._last:
+                _truncate_torn_tail(filename)
+                self._last[filename] = _last_jsonl_key(filename, key)
+            last = self._last[filename]
+
+            # Rows are time ordered: walk back from the end to the first new one
+            start = len(rows)
+            while start > 0 and (last is None or rows[start - 1][key] > last):
+                start -= 1
+            new = rows[start:]
+            if not new:
+                return 0
+            payload = b'\n'.join(dumps(row) for row in new) + b'\n'
+            with open(filename, 'ab') as f:
+                f.write(payload)
+            self._last[filename] = new[-1][key]
+            return len(new)
+
+
+class BackgroundExporter:
+    """
+    Single writer thread for exports
+
+    Jobs are keyed by filename and coalesced: if a newer export for the
+    same file arrives before the previous one ran, only the newer is written.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, Callable] = {}
+        self._order = []
+        self._cond = threading.Condition()
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, filename: str, job: Callable):
+        with self._cond:
+            if filename not in self._pending:
+                self._order.append(filename)
+            self._pending[filename] = job
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='json-export', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._order:
+                    self._cond.wait()
+                filename = self._order.pop(0)
+                job = self._pending.pop(filename)
+                self._busy = True
+            try:
+                job()
+            except Exception as e:
+                logger.error(f"✗ Background export of {filename} failed: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all submitted exports are written"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._order and not self._busy, timeout)
+
+
+exporter = BackgroundExporter()
+appender = JsonlAppender()
@@ -0,0 +1,190 @@
+"""
+Lightweight latency spans and histograms for the trading cycle
+
+Usage:
+    from utils.latency import span, timed, recorder
+
+    with span("cycle.fetch"):
+        ...
+
+    @timed("indicator.supertrend")
+    def calculate_supertrend(...):
+        ...
+
+    recorder.write_json("latency_metrics.json")
+    recorder.serve_prometheus(9108)
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+# Upper bounds in seconds (Prometheus style, +Inf implied)
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile (upper bound of the bucket holding it)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else None,
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts)),
+        }
+
+
+class LatencyRecorder:
+    """Thread-safe collection of named latency histograms"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.enabled = True
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one duration for `name` with optional labels"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict:
+        """All histograms as {'name{label=value}': stats}"""
+        with self._lock:
+            items = list(self._histograms.items())
+        out = {}
+        for (name, labels), hist in items:
+            label_text = ','.join(f"{k}={v}" for k, v in labels)
+            out[f"{name}{{{label_text}}}" if labels else name] = hist.to_dict()
+        return out
+
+    # ==================== Export ====================
+
+    def write_json(self, filename: str):
+        """Write the snapshot to a local metrics file (atomic replace)"""
+        tmp = f"{filename}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'time': int(time.time()), 'latency': self.snapshot()}, f)
+        os.replace(tmp, filename)
+
+    def prometheus_text(self) -> str:
+        """Render all histograms in the Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+
+        lines = []
+        declared = set()
+        for (name, labels), hist in items:
+            metric = name.replace('.', '_').replace('-', '_') + '_seconds'
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} histogram")
+                declared.add(metric)
+            base = [f'{k}="{v}"' for k, v in labels]
+            cumulative = 0
+            for bound, c in zip(list(hist.buckets) + ['+Inf'], hist.counts):
+                cumulative += c
+                label_text = ','.join(base + [f'le="{bound}"'])
+                lines.append(f"{metric}_bucket{{{label_text}}} {cumulative}")
+            label_text = '{' + ','.join(base) + '}' if base else ''
+            lines.append(f"{metric}_sum{label_text} {hist.total}")
+            lines.append(f"{metric}_count{label_text} {hist.count}")
+        return '\n'.join(lines) + '\n'
+
+    def serve_prometheus(self, port: int, host: str = '0.0.0.0'):
+        """Serve /metrics in a daemon thread and return the server"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = recorder.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+recorder = LatencyRecorder()
+
+
+@contextmanager
+def span(name: str, **labels):
+    """Time the enclosed block into the global recorder"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.observe(name, time.perf_counter() - start, **labels)
+
+
+def timed(name: str):
+    """Decorator timing every call of a function into the global recorder"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                recorder.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
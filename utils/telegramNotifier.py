@@ -1,6 +1,11 @@
+import logging
 import requests
 from datetime import datetime
 
+from utils.latency import span
+
+logger = logging.getLogger(__name__)
+
 
 class TelegramNotifier:
     def __init__(self, bot_token: str, chat_id: str):
@@ -15,9 +20,10 @@ class TelegramNotifier:
             "parse_mode": "HTML"
         }
         try:
-            requests.post(self.base_url, data=payload, timeout=5)
+            with span("notify.telegram"):
+                requests.post(self.base_url, data=payload, timeout=5)
         except Exception as e:
-            print("❌ Telegram error:", e)
+            logger.error(f"❌ Telegram error: {e}")
 
     def trade_entry(self, symbol, side, entry, stoploss, timeframe="1H"):
         msg = (